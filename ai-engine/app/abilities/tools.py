@@ -1,44 +1,133 @@
-from langchain_core.tools import tool
-from typing import List, Dict
+from langchain_core.tools import StructuredTool, tool
+from typing import List, Dict, Optional
 
-from app.memory.vector.client import VectorDatabase
-from app.memory.graph.client import Neo4jClient
-from app.processing.aggregator import GlobalAggregator
+from app.memory.vector.client import get_vector_db
+from app.memory.graph.client import get_graph_db
+from app.processing.theme_report import get_theme_report_store
+from app.processing.embedder import get_embedding_service
+from app.telemetry import traced
 
-# Initialize Singletons
-vector_db = VectorDatabase()
-graph_db = Neo4jClient()
-aggregator = GlobalAggregator()
-def get_embedding_model():
-    import torch
-    from sentence_transformers import SentenceTransformer
-    global _embedding_model
-    if '_embedding_model' not in globals():
-        print("⏳ Loading embedding model into memory (tools)...")
-        torch.set_num_threads(1)
-        _embedding_model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-    return _embedding_model
+def _format_search_results(results) -> str:
+    if not results:
+        return "No relevant documents found in vector memory."
+    return str([r['content'] for r in results])
 
-@tool
-def search_vector_memory(query: str) -> str:
+def _search_filters(**filters) -> Dict:
+    # The LLM fills unused optional arguments with None or "" - drop those
+    return {key: value for key, value in filters.items() if value not in (None, "", [])}
+
+@traced("tool.search_vector_memory")
+def _search_vector_memory(
+    query: str,
+    source: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    doc_type: Optional[str] = None,
+) -> str:
     """
     Search for raw feedback chunks using semantic similarity.
     Use this to find specific quotes, evidence, or detailed user stories.
+    Optional filters narrow the search before ranking:
+    source (e.g. 'amazon', 'reddit', 'app_store'), min_rating / max_rating (1-5),
+    since / until (ISO date like '2024-03-01', or a look-back like '24h', '7d', '2w'),
+    doc_type ('chunk' for raw feedback, 'rlm_summary' for RLM summaries).
+    Example: 1-star Amazon reviews from last week -> source='amazon', max_rating=1, since='7d'.
     """
+    filters = _search_filters(source=source, min_rating=min_rating, max_rating=max_rating,
+                              since=since, until=until, doc_type=doc_type)
     # 1. Convert text to vector
-    model = get_embedding_model()
-    query_vector = model.encode([query])[0].tolist()
-    
-    # 2. Search Qdrant
-    results = vector_db.search(query_vector, limit=5)
+    query_vector = get_embedding_service().encode([query])[0].tolist()
     
-    if not results:
-        return "No relevant documents found in vector memory."
-        
-    return str([r['content'] for r in results])
+    # 2. Search Qdrant (filters are applied inside the index traversal)
+    try:
+        results = get_vector_db().search(query_vector, limit=5, filters=filters)
+    except ValueError as e:
+        return f"Invalid search filter: {e}"
+    return _format_search_results(results)
 
-@tool
-def query_graph_memory(cypher_query: str) -> str:
+@traced("tool.search_vector_memory")
+async def _asearch_vector_memory(
+    query: str,
+    source: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    doc_type: Optional[str] = None,
+) -> str:
+    filters = _search_filters(source=source, min_rating=min_rating, max_rating=max_rating,
+                              since=since, until=until, doc_type=doc_type)
+    # Encoding runs on the embedding service's executor; the search on AsyncQdrantClient
+    query_vector = (await get_embedding_service().aencode([query]))[0].tolist()
+    try:
+        results = await get_vector_db().asearch(query_vector, limit=5, filters=filters)
+    except ValueError as e:
+        return f"Invalid search filter: {e}"
+    return _format_search_results(results)
+
+def _format_batch_results(queries: List[str], results) -> str:
+    return "\n\n".join(
+        f"Query: {query}\n{_format_search_results(hits)}" for query, hits in zip(queries, results)
+    )
+
+@traced("tool.search_vector_memory_batch")
+def _search_vector_memory_batch(
+    queries: List[str],
+    source: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    doc_type: Optional[str] = None,
+) -> str:
+    """
+    Semantic search for several sub-questions at once (e.g. one per product or issue).
+    Prefer this over repeated search_vector_memory calls: all queries are embedded
+    together and sent to the vector store in a single request.
+    Returns the matching feedback grouped under each query.
+    Takes the same optional filters as search_vector_memory, applied to every query.
+    """
+    if not queries:
+        return "No queries given."
+    filters = _search_filters(source=source, min_rating=min_rating, max_rating=max_rating,
+                              since=since, until=until, doc_type=doc_type)
+    query_vectors = get_embedding_service().encode(list(queries)).tolist()
+    try:
+        results = get_vector_db().search_batch(query_vectors, limit=5, filters=filters)
+    except ValueError as e:
+        return f"Invalid search filter: {e}"
+    return _format_batch_results(queries, results)
+
+@traced("tool.search_vector_memory_batch")
+async def _asearch_vector_memory_batch(
+    queries: List[str],
+    source: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    doc_type: Optional[str] = None,
+) -> str:
+    if not queries:
+        return "No queries given."
+    filters = _search_filters(source=source, min_rating=min_rating, max_rating=max_rating,
+                              since=since, until=until, doc_type=doc_type)
+    query_vectors = (await get_embedding_service().aencode(list(queries))).tolist()
+    try:
+        results = await get_vector_db().asearch_batch(query_vectors, limit=5, filters=filters)
+    except ValueError as e:
+        return f"Invalid search filter: {e}"
+    return _format_batch_results(queries, results)
+
+def _format_graph_results(data) -> str:
+    if not data:
+        return "No results found for this graph query."
+    return str(data)
+
+@traced("tool.query_graph_memory")
+def _query_graph_memory(cypher_query: str) -> str:
     """
     Execute a Cypher query on the Graph Database.
     Use this to find relationships between Users, Summaries, and Entities.
@@ -47,6 +136,7 @@ def query_graph_memory(cypher_query: str) -> str:
     Properties: Node has 'name'. Relationship 'MENTIONS' has 'sentiment'.
     Example: MATCH (s:Summary)-[r:MENTIONS]->(i:Issue) RETURN i.name, r.sentiment, count(i)
     """
+    graph_db = get_graph_db()
     if not graph_db.driver:
         return "Graph DB not connected"
     
@@ -54,20 +144,44 @@ def query_graph_memory(cypher_query: str) -> str:
         with graph_db.driver.session() as session:
             result = session.run(cypher_query)
             data = [dict(record) for record in result]
-            
-            if not data:
-                return "No results found for this graph query."
-                
-            return str(data)
+            return _format_graph_results(data)
+    except Exception as e:
+        return f"Graph Query Error: {str(e)}"
+
+@traced("tool.query_graph_memory")
+async def _aquery_graph_memory(cypher_query: str) -> str:
+    graph_db = get_graph_db()
+    if not graph_db.driver:
+        return "Graph DB not connected"
+
+    try:
+        return _format_graph_results(await graph_db.arun_query(cypher_query))
     except Exception as e:
         return f"Graph Query Error: {str(e)}"
 
+# Each tool has a blocking and a native async implementation; the graph picks
+# the one matching how it was invoked (invoke/stream vs ainvoke/astream_events).
+search_vector_memory = StructuredTool.from_function(
+    func=_search_vector_memory, coroutine=_asearch_vector_memory, name="search_vector_memory"
+)
+search_vector_memory_batch = StructuredTool.from_function(
+    func=_search_vector_memory_batch, coroutine=_asearch_vector_memory_batch, name="search_vector_memory_batch"
+)
+query_graph_memory = StructuredTool.from_function(
+    func=_query_graph_memory, coroutine=_aquery_graph_memory, name="query_graph_memory"
+)
+
 @tool
+@traced("tool.fetch_global_themes")
 def fetch_global_themes() -> str:
     """
     Retrieve the high-level Global Theme Report generated by RLM.
     Use this to get a broad overview of top issues and trends before diving deep.
     """
-    # For now, we run the aggregator on demand. 
-    # In prod, this would fetch a pre-computed report from DB.
-    return aggregator.run_aggregation()
+    # Pre-computed report; refreshed in the background as new summaries arrive
+    cached = get_theme_report_store().get()
+    if not cached["report"]:
+        return "The Global Theme Report is still being generated. Use vector or graph search for now."
+    age_minutes = cached["age_seconds"] / 60
+    note = " A refresh is in progress." if cached["refreshing"] else ""
+    return f"[Global Theme Report v{cached['version']}, generated {age_minutes:.0f} min ago.{note}]\n{cached['report']}"
@@ -0,0 +1,33 @@
+import time
+
+from fastapi import Request
+
+from app.telemetry import HTTP_REQUESTS, HTTP_SECONDS, span
+
+# Scrapes would otherwise dominate the request metrics
+UNTRACED_PATHS = {"/metrics"}
+
+
+async def trace_requests(request: Request, call_next):
+    """
+    Opens a root span per request (continuing an incoming `traceparent`), records
+    the span and request metrics by route template, and returns the trace ID as
+    `X-Trace-Id`.
+    """
+    if request.url.path in UNTRACED_PATHS:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    status = 500
+    # Named once routing has matched; raw paths (job IDs, scanner probes) would each add a series
+    with span(f"{request.method} unmatched", headers=dict(request.headers)) as root:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            root.rename(f"{request.method} {route}")
+            HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
+            HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route)
+    response.headers["X-Trace-Id"] = root.trace_id
+    return response
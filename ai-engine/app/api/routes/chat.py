@@ -1,19 +1,38 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.api.schemas import ChatRequest
-from app.orchestration.graph import app as agent_app
+from app.orchestration.answer_cache import get_answer_cache
+from app.orchestration.streaming import format_sse, stream_agent_events, summarize_result
+from app.telemetry import current_trace_id
 from langchain_core.messages import HumanMessage
+import asyncio
 import traceback
 
 router = APIRouter()
+answer_cache = get_answer_cache()
+
+def get_agent():
+    """The compiled agent graph; LangGraph, Groq and dspy are imported on first use, not at startup."""
+    from app.orchestration.graph import app as agent_app
+    return agent_app
 
 @router.post("/chat")
-def chat_with_agent(request: ChatRequest):
+async def chat_with_agent(request: ChatRequest):
     """
     Ask the AI Agent a question.
+    Near-duplicates of recently answered questions are served from the answer cache.
+    Runs on the event loop end to end (ainvoke + async tools), so a slow Groq,
+    Qdrant or Neo4j call doesn't hold a threadpool thread.
     """
     try:
-        # Initialize full AgentState to avoid missing key errors in LangGraph
         content = request.question
+        if request.use_cache:
+            hit, vector, generation = await answer_cache.alookup(content)
+            if hit is not None:
+                print(f"⚡ Answer cache hit ({hit['similarity']}) for: {content[:50]}...")
+                return {"answer": hit["answer"], "trace": hit["trace"], "cached": True, "cache": hit, "trace_id": current_trace_id()}
+
+        # Initialize full AgentState to avoid missing key errors in LangGraph
         inputs = {
             "messages": [HumanMessage(content=content)],
             "question": content,
@@ -21,17 +40,22 @@ def chat_with_agent(request: ChatRequest):
         }
         
         print(f"🤖 Agent invoking for question: {content[:50]}...")
-        result = agent_app.invoke(inputs)
+        agent = await asyncio.to_thread(get_agent)  # May still be importing on a warmup thread
+        result = await agent.ainvoke(inputs)
         
         # Guard against empty messages or unexpected return structure
         if not result or 'messages' not in result or not result['messages']:
             print(f"⚠️ Unexpected agent result: {result}")
-            return {"answer": "I'm sorry, I couldn't process that. The analysis engine returned an empty result.", "trace": []}
+            return {"answer": "I'm sorry, I couldn't process that. The analysis engine returned an empty result.", "trace": [], "cached": False, "trace_id": current_trace_id()}
 
-        last_msg = result['messages'][-1]
+        answer, trace = summarize_result(result)
+        if request.use_cache and answer:
+            answer_cache.store(content, vector, answer, trace, generation)
         return {
-            "answer": last_msg.content, 
-            "trace": [m.content for m in result['messages'] if getattr(m, 'type', '') == 'ai']
+            "answer": answer, 
+            "trace": trace,
+            "cached": False,
+            "trace_id": current_trace_id()
         }
     except Exception as e:
         error_msg = str(e)
@@ -41,3 +65,57 @@ def chat_with_agent(request: ChatRequest):
         if "429" in error_msg or "Rate limit" in error_msg or "rate_limit" in error_msg:
              raise HTTPException(status_code=429, detail=error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Ask the AI Agent a question and receive Server-Sent Events as it works:
+    `tool_call` / `tool_result` for each tool invocation, `token` for LLM output,
+    then one `final` event with the answer and trace (or an `error` event).
+    """
+    content = request.question
+    hit = vector = generation = None
+    if request.use_cache:
+        hit, vector, generation = await answer_cache.alookup(content)
+
+    trace_id = current_trace_id()
+
+    async def events():
+        if hit is not None:
+            yield format_sse("final", {"answer": hit["answer"], "trace": hit["trace"], "cached": True, "cache": hit, "trace_id": trace_id})
+            return
+
+        inputs = {
+            "messages": [HumanMessage(content=content)],
+            "question": content,
+            "steps": []
+        }
+        print(f"🤖 Agent streaming for question: {content[:50]}...")
+        try:
+            agent = await asyncio.to_thread(get_agent)
+            async for event, data in stream_agent_events(agent, inputs):
+                if event == "final":
+                    data["cached"] = False
+                    data["trace_id"] = trace_id
+                    if request.use_cache and data["answer"]:
+                        answer_cache.store(content, vector, data["answer"], data["trace"], generation)
+                yield format_sse(event, data)
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            error_msg = str(e)
+            print(f"❌ Chat Stream Error: {error_msg}")
+            status = 429 if ("429" in error_msg or "Rate limit" in error_msg or "rate_limit" in error_msg) else 500
+            yield format_sse("error", {"detail": error_msg, "status": status, "trace_id": trace_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/chat/cache/stats")
+def chat_cache_stats():
+    """
+    Hit rate and size of the semantic answer cache.
+    """
+    return answer_cache.stats()
@@ -1,20 +1,83 @@
 from fastapi import APIRouter, HTTPException
-from app.processing.aggregator import GlobalAggregator
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.processing.theme_report import get_theme_report_store
+from app.processing.embedder import get_embedding_service
+from app.processing.completion_cache import get_completion_cache
+from app.startup import get_warmup
+from app.telemetry import render_metrics
 
 router = APIRouter()
-aggregator = GlobalAggregator()
 
 @router.get("/")
 def read_root():
     return {"status": "AI Engine Online", "layers_active": [1, 2, 3, 4, 5]}
 
+@router.get("/health")
+def health():
+    """
+    Service health: per-component warmup state, plus Neo4j constraint/index state
+    once the graph client is up. Never waits for a component to load.
+    """
+    warmup = get_warmup()
+    graph_db = warmup.value("graph_db")
+    if graph_db is None:
+        graph = {"connected": None, "state": warmup.status()["components"]["graph_db"]["state"]}
+    else:
+        try:
+            graph = graph_db.schema_status()
+        except Exception as e:
+            graph = {"connected": bool(graph_db.driver), "error": str(e)}
+    return {"status": "ok", "warmup": warmup.status(), "neo4j": graph}
+
+@router.get("/health/live")
+def liveness():
+    """
+    Liveness probe: the process is up and serving. Answers as soon as uvicorn binds.
+    """
+    return {"status": "ok"}
+
+@router.get("/health/ready")
+def readiness():
+    """
+    Readiness probe: 200 once every required component is warm, 503 (with the
+    per-component state) until then.
+    """
+    status = get_warmup().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 @router.get("/global-themes")
-def get_global_themes():
+def get_global_themes(refresh: bool = False):
     """
-    Trigger RLM Level 2 Aggregation to get high-level insights.
+    Latest materialized RLM Level 2 report (with its version and age).
+    Pass refresh=true to rebuild it synchronously first.
     """
     try:
-        report = aggregator.run_aggregation()
-        return {"report": report}
+        store = get_theme_report_store()
+        if refresh:
+            store.refresh()
+        return store.get()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/embeddings/stats")
+def get_embedding_stats():
+    """
+    Throughput and queue depth of the shared embedding service.
+    """
+    return get_embedding_service().stats()
+
+@router.get("/llm/stats")
+def get_llm_stats():
+    """
+    Groq gateway state: remaining request/token budget, queue depth, and per-lane
+    wait times, throttled calls and retries, plus completion cache hit rate.
+    """
+    from app.processing.llm_gateway import get_llm_gateway  # Imports dspy/Groq; only needed here
+    return {**get_llm_gateway().stats(), "cache": get_completion_cache().stats()}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint: span, HTTP, LLM gateway and RLM histograms/counters.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,48 +1,173 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Query
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
+from functools import partial
+from typing import Optional
+import os
+import threading
+from pydantic import TypeAdapter, ValidationError
 from app.api.schemas import IngestRequest, NormalizedFeedback
-from app.processing.ingestor import IngestionService
+from app.memory.graph.client import GraphWriteBuffer
+from app.processing.jobs import IngestJobQueue, JobQueueFullError
+from app.processing.streaming import iter_lines, iter_ndjson_records, iter_csv_records, iter_feedback_windows
 
 router = APIRouter()
-ingestor = IngestionService()
 
-@router.post("/ingest")
+def get_ingestor():
+    """The shared IngestionService, imported and built on first use (or by the startup warmup)."""
+    from app.processing.ingestor import get_ingestion_service
+    return get_ingestion_service()
+
+def ingest_batch(items, **kwargs):
+    return get_ingestor().ingest(items, **kwargs)
+
+_job_queue: Optional[IngestJobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> IngestJobQueue:
+    """
+    The process-wide ingest job queue. Opening it creates the jobs database and
+    starts the worker threads (resuming unfinished jobs), so it happens on first
+    use or in the app lifespan, not when this module is imported.
+    """
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = IngestJobQueue(ingest_batch)
+    return _job_queue
+
+_timestamp_adapter = TypeAdapter(datetime)
+
+def client_timestamp(value) -> Optional[datetime]:
+    """The item's own timestamp, or None when it is missing or does not parse."""
+    if value in (None, ""):
+        return None
+    try:
+        return _timestamp_adapter.validate_python(value)
+    except ValidationError:
+        return None
+
+def normalize_items(items):
+    # The client's timestamp is kept: it identifies the feedback and drives time-range filters.
+    # Only a missing or unparseable one falls back to the ingest time.
+    normalized = []
+    for item in items:
+        timestamp = client_timestamp(item.get("timestamp"))
+        normalized.append(NormalizedFeedback(
+            source=item.get("source", "api_upload"),
+            content=item.get("content", ""),
+            rating=item.get("rating", 3.0),
+            timestamp=timestamp or datetime.now(),
+            timestamp_inferred=timestamp is None,
+            metadata=item.get("metadata", {})
+        ))
+    return normalized
+
+def format_ingest_result(result: dict) -> dict:
+    """Shapes an IngestionService result for frontend display."""
+    return {
+        "message": "✅ RLM Analysis Complete!",
+        "processed_chunks": result.get("chunk_count", 0),
+        "skipped_items": result.get("skipped_items", 0),
+        "rlm_analysis": {
+            "themes": result.get("themes", []),
+            "critical_issues": result.get("critical_issues", []),
+            "summary": result.get("hierarchical_summary", ""),
+            "entities_stored": result.get("entities_count", 0)
+        },
+        "status": "success"
+    }
+
+@router.post("/ingest", status_code=202)
 def ingest_feedback(request: IngestRequest):
     """
-    Ingest a batch of feedback. 
+    Queue a batch of feedback for background ingestion.
     Triggers: Chunking -> Vector Embed -> RLM Summarization -> Graph Extraction.
+    Poll GET /ingest/jobs/{job_id} for progress and results.
     """
     try:
-        norm_items = []
-        for item in request.items:
-            norm_items.append(
-                NormalizedFeedback(
-                    source=item.get("source", "api_upload"),
-                    content=item.get("content", ""),
-                    rating=item.get("rating", 3.0),
-                    timestamp=datetime.now(),
-                    metadata=item.get("metadata", {})
-                )
-            )
-        
-        result = ingestor.ingest(norm_items)
-        
-        # Return detailed status for frontend display
-        return {
-            "message": "✅ RLM Analysis Complete!",
-            "processed_chunks": result.get("chunk_count", 0),
-            "rlm_analysis": {
-                "themes": result.get("themes", []),
-                "critical_issues": result.get("critical_issues", []),
-                "summary": result.get("hierarchical_summary", ""),
-                "entities_stored": result.get("entities_count", 0)
-            },
-            "status": "success"
-        }
-    
+        # Plain def handler: submit encodes the batch and takes the queue lock, so it runs in the threadpool
+        job_id = get_job_queue().submit(normalize_items(request.items))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        error_msg = str(e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/ingest/jobs/{job_id}"
+    }
+
+STREAM_WINDOW_SIZE = int(os.getenv("INGEST_STREAM_WINDOW", "64"))
+
+@router.post("/ingest/stream")
+async def ingest_stream(
+    request: Request,
+    format: str = Query(None, description="'ndjson' or 'csv'. Defaults to the Content-Type."),
+    window_size: int = Query(STREAM_WINDOW_SIZE, ge=1, le=1000),
+    analyze: bool = Query(False, description="Run RLM analysis + graph storage on every window."),
+):
+    """
+    Bulk upload of an NDJSON or CSV file sent as the raw request body.
+    Rows are parsed as they arrive and ingested in fixed-size windows, so memory
+    stays bounded by the window size rather than the file size.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = (format or ("csv" if "csv" in content_type else "ndjson")).lower()
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+
+    lines = iter_lines(request.stream())
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+    ingestor = await run_in_threadpool(get_ingestor)
+    # In analyze mode, graph writes from several windows share one Neo4j transaction
+    graph_buffer = GraphWriteBuffer(ingestor.graph_db) if analyze else None
+    ingest_window = partial(ingestor.ingest, graph_buffer=graph_buffer) if analyze else ingestor.ingest_raw
+
+    stats = {"format": fmt, "windows": 0, "chunks_stored": 0}
+    error = None
+    try:
+        async for window in iter_feedback_windows(records, window_size, stats):
+            result = await run_in_threadpool(ingest_window, window)
+            stats["windows"] += 1
+            stats["chunks_stored"] += result.get("chunk_count", 0)
+    except Exception as e:
+        error = e
+        print(f"❌ Stream ingest failed after {stats['windows']} windows: {e}")
+
+    if graph_buffer:
+        # Summaries of the windows that succeeded are still written; a failing flush never hides the window error
+        try:
+            await run_in_threadpool(graph_buffer.flush)
+            stats["graph_flushed"] = True
+        except Exception as e:
+            stats["graph_flushed"] = False
+            print(f"❌ Graph flush failed after {stats['windows']} windows: {e}")
+            error = error or e
+
+    if error is not None:
+        error_msg = str(error)
+        status = 429 if ("429" in error_msg or "Rate limit" in error_msg or "rate_limit" in error_msg) else 500
+        raise HTTPException(status_code=status, detail={"error": error_msg, **stats})
+
+    return {"status": "success", "analyzed": analyze, **stats}
+
+@router.get("/ingest/jobs/{job_id}")
+def get_ingest_job(job_id: str):
+    """
+    Report per-stage progress of an ingestion job, plus its result once completed.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job: {job_id}")
+
+    if job["status"] == "completed" and job["result"] is not None:
+        job["result"] = format_ingest_result(job["result"])
+    elif job["status"] == "failed":
+        error_msg = job["error"] or ""
         if "429" in error_msg or "Rate limit" in error_msg or "rate_limit" in error_msg:
-             print(f"⚠️ Rate Limit Hit: {error_msg}")
-             raise HTTPException(status_code=429, detail=error_msg)
-        raise HTTPException(status_code=500, detail=error_msg)
+            print(f"⚠️ Rate Limit Hit: {error_msg}")
+            job["rate_limited"] = True
+    return job
@@ -8,6 +8,7 @@ class NormalizedFeedback(BaseModel):
     timestamp: datetime = Field(..., description="UTC timestamp of when the feedback was created")
     rating: Optional[float] = Field(None, description="Normalized rating (1-5 scale) if applicable")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Platform-specific extra data (e.g., upvotes, verified_purchase)")
+    timestamp_inferred: bool = Field(False, description="True when the source sent no timestamp and the ingest time was used")
 
     class Config:
         json_schema_extra = {
@@ -25,4 +26,5 @@ class IngestRequest(BaseModel):
 
 class ChatRequest(BaseModel):
     question: str
+    use_cache: bool = Field(True, description="Serve a cached answer to a near-identical question if one exists")
 
@@ -1,8 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.api.routes import ingest, chat, health
+from app.api.middleware import trace_requests
+from app.startup import WARMUP_ON_STARTUP, get_warmup
+from app.telemetry import configure_tracing
 
-app = FastAPI(title="Customer Intelligence Engine API")
+configure_tracing()  # OTLP span export, only when OTEL_EXPORTER_OTLP_ENDPOINT is set
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients and models load on background threads; uvicorn binds immediately
+    # and /health/ready reports when they are warm
+    if WARMUP_ON_STARTUP:
+        get_warmup().start()
+        # Opens the jobs database and resumes jobs a previous process left unfinished
+        await run_in_threadpool(ingest.get_job_queue)
+    yield
+    # Async clients opened by the request path hold sockets bound to this event loop
+    from app.memory.vector.client import aclose_vector_db
+    from app.memory.graph.client import aclose_graph_db
+    await aclose_vector_db()
+    await aclose_graph_db()
+
+app = FastAPI(title="Customer Intelligence Engine API", lifespan=lifespan)
 
 # --- CORS Configuration ---
 # Allow requests from your Next.js frontend (e.g., localhost:3000, Vercel)
@@ -12,8 +34,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
 
+# --- Tracing: one root span per request, trace ID in the X-Trace-Id header ---
+app.middleware("http")(trace_requests)
+
 # --- Include Routers ---
 app.include_router(health.router, tags=["Health"])
 app.include_router(ingest.router, tags=["Ingestion"])
@@ -1,13 +1,35 @@
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, GraphDatabase
 import os
 import json
+import threading
+from collections import defaultdict
 from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from app.memory.ids import content_uuid
+from app.telemetry import span, traced
+
+# Sanitize Label (Cyber injection prevention - basic)
+ALLOWED_ENTITY_LABELS = ["Issue", "Feature", "Product", "Sentiment"]
+
+# Keys that every write MERGEs/MATCHes on. Each gets a uniqueness constraint
+# (which is backed by a range index); entity names also get a text index for
+# the CONTAINS/STARTS WITH lookups the agent writes.
+UNIQUE_KEYS = [("User", "id"), ("Summary", "id")] + [
+    (label, "name") for label in ALLOWED_ENTITY_LABELS + ["Entity"]
+]
+TEXT_INDEXED_KEYS = [(label, "name") for label in ALLOWED_ENTITY_LABELS + ["Entity"]]
 
 class Neo4jClient:
+    # Schema bootstrap runs once per process, however many clients are created
+    _schema_lock = threading.Lock()
+    _schema_report = None
+
     def __init__(self):
         uri = os.getenv("NEO4J_URL_ENDPOINT")
         user = os.getenv("NEO4J_USERNAME")
         password = os.getenv("NEO4J_PASSWORD")
+        self._uri, self._auth = uri, (user, password)
+        self._async_driver = None
         
         if uri and user and password:
             print(f"🕸️ Connecting to Neo4j: {uri}...")
@@ -17,6 +39,13 @@ class Neo4jClient:
             except Exception as e:
                 print(f"❌ Neo4j Connection Failed: {e}")
                 self.driver = None
+
+            if self.driver:
+                try:
+                    self.ensure_schema()
+                except Exception as e:
+                    # Missing indexes only cost speed; keep the connection usable
+                    print(f"⚠️ Neo4j schema bootstrap failed: {e}")
         else:
              print("⚠️ Missing Neo4j Credentials in .env")
              self.driver = None
@@ -25,6 +54,30 @@ class Neo4jClient:
         if self.driver:
             self.driver.close()
 
+    async def aclose(self):
+        """Closes the async driver, if one was opened."""
+        if self._async_driver is not None:
+            driver, self._async_driver = self._async_driver, None
+            await driver.close()
+
+    def get_async_driver(self):
+        """Neo4j AsyncDriver, created on first use by the event loop that will use it."""
+        if not self.driver:
+            return None
+        if self._async_driver is None:
+            self._async_driver = AsyncGraphDatabase.driver(self._uri, auth=self._auth)
+        return self._async_driver
+
+    @traced("neo4j.query")
+    async def arun_query(self, cypher_query: str, **params) -> List[dict]:
+        """Runs a read query on the async driver and returns its records as dicts."""
+        driver = self.get_async_driver()
+        if driver is None:
+            raise ConnectionError("Graph DB not connected")
+        async with driver.session() as session:
+            result = await session.run(cypher_query, **params)
+            return [dict(record) async for record in result]
+
     def verify_connection(self):
         with self.driver.session() as session:
             result = session.run("RETURN 1 AS num")
@@ -34,6 +87,72 @@ class Neo4jClient:
             else:
                  print("❌ Neo4j Verification Failed.")
 
+    def ensure_schema(self) -> dict:
+        """
+        Creates (IF NOT EXISTS) the uniqueness constraints and text indexes the
+        write and query paths rely on, then records their state. If existing
+        duplicate data blocks a constraint, a plain range index is created instead.
+        """
+        with Neo4jClient._schema_lock:
+            if Neo4jClient._schema_report is not None:
+                return Neo4jClient._schema_report
+
+            warnings = []
+            with self.driver.session() as session:
+                for label, prop in UNIQUE_KEYS:
+                    name = f"{label.lower()}_{prop}_unique"
+                    try:
+                        session.run(
+                            f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+                        ).consume()
+                    except Exception as e:
+                        warnings.append(f"{label}.{prop}: constraint not created ({e}); using a range index")
+                        session.run(
+                            f"CREATE INDEX {label.lower()}_{prop}_range IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+                        ).consume()
+
+                for label, prop in TEXT_INDEXED_KEYS:
+                    session.run(
+                        f"CREATE TEXT INDEX {label.lower()}_{prop}_text IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+                    ).consume()
+
+            for warning in warnings:
+                print(f"⚠️ Neo4j schema: {warning}")
+            Neo4jClient._schema_report = {"warnings": warnings}
+            print("✅ Neo4j schema constraints and indexes ensured.")
+            return Neo4jClient._schema_report
+
+    def schema_status(self) -> dict:
+        """Current constraint/index state, for the health route."""
+        if not self.driver:
+            return {"connected": False}
+
+        with self.driver.session() as session:
+            indexes = [
+                dict(record)
+                for record in session.run(
+                    "SHOW INDEXES YIELD name, type, labelsOrTypes, properties, state, populationPercent"
+                )
+            ]
+            constraints = [
+                record["name"] for record in session.run("SHOW CONSTRAINTS YIELD name")
+            ]
+
+        expected = {(label, prop) for label, prop in UNIQUE_KEYS + TEXT_INDEXED_KEYS}
+        covered = {
+            (index["labelsOrTypes"][0], index["properties"][0])
+            for index in indexes
+            if index["labelsOrTypes"] and index["properties"]
+        }
+        return {
+            "connected": True,
+            "all_online": all(index["state"] == "ONLINE" for index in indexes),
+            "missing": sorted(f"{label}.{prop}" for label, prop in expected - covered),
+            "constraints": constraints,
+            "indexes": indexes,
+            "warnings": (Neo4jClient._schema_report or {}).get("warnings", []),
+        }
+
     def store_summary_intelligence(self, summary_text: str, metadata: dict, entities: list):
         """
         Stores the Summary, Source User, and Extracted Entities relationship in the Graph.
@@ -43,68 +162,138 @@ class Neo4jClient:
         (Summary) -[MENTIONS]-> (Issue:Issue)
         (Summary) -[MENTIONS]-> (Feature:Feature)
         """
-        if not self.driver:
+        self.store_summaries([(summary_text, metadata, entities)])
+
+    def store_summaries(self, summaries: List[Tuple[str, dict, list]]):
+        """
+        Stores several (summary_text, metadata, entities) tuples in a single transaction.
+        The whole batch costs 1 + (number of distinct entity labels) round trips,
+        however many summaries and entities it contains.
+        """
+        if not self.driver or not summaries:
             return
 
-        with self.driver.session() as session:
-            session.execute_write(self._create_standard_nodes, summary_text, metadata, entities)
+        summary_rows, mentions_by_label = self.build_write_rows(summaries)
+        with span("neo4j.write", summaries=len(summary_rows)), self.driver.session() as session:
+            session.execute_write(self._write_summaries, summary_rows, mentions_by_label)
+
+        mention_count = sum(len(rows) for rows in mentions_by_label.values())
+        print(f"🕸️ Graph Updated: {len(summary_rows)} Summaries, {mention_count} Entities linked.")
 
     @staticmethod
-    def _create_standard_nodes(tx, summary_text, metadata, entities):
-        # 1. Create/Merge User Node
-        user_id = metadata.get("User") or metadata.get("user") or "Anonymous"
-        tx.run(
-            """
-            MERGE (u:User {id: $user_id})
-            RETURN u
-            """,
-            user_id=user_id
-        )
+    def build_write_rows(summaries: List[Tuple[str, dict, list]]):
+        """Flattens summaries into UNWIND parameter rows, grouping mentions per entity label."""
+        timestamp = datetime.now().isoformat()
+        summary_rows = []
+        mentions_by_label: Dict[str, List[dict]] = defaultdict(list)
+
+        for summary_text, metadata, entities in summaries:
+            # Same ID as the summary's Qdrant point, so replays update instead of duplicating
+            summary_id = metadata.get("summary_id") or content_uuid("rlm_summary", summary_text)
+            summary_rows.append({
+                "user_id": metadata.get("User") or metadata.get("user") or "Anonymous",
+                "summary_id": summary_id,
+                "text": summary_text,
+                "timestamp": timestamp,
+            })
+
+            for entity in entities:
+                # entity = {'name': 'Battery Life', 'type': 'Issue', 'sentiment': 'Negative'}
+                label = entity.get("type", "Entity").capitalize() # e.g., Issue, Feature
+                # Labels can't be parameterized, so only whitelisted ones reach the query text
+                if label not in ALLOWED_ENTITY_LABELS:
+                    label = "Entity"
+                mentions_by_label[label].append({
+                    "summary_id": summary_id,
+                    "name": entity.get("name", "Unknown"),
+                    "sentiment": entity.get("sentiment", "Neutral"),
+                })
 
-        # 2. Create Summary Node (Linked to User)
-        # Using a hash or timestamp for ID if not provided
-        summary_id = f"summ_{hash(summary_text)}"
+        return summary_rows, dict(mentions_by_label)
+
+    @staticmethod
+    def _write_summaries(tx, summary_rows, mentions_by_label):
+        # 1. Users + Summaries + WROTE edges in one statement
         tx.run(
             """
-            MATCH (u:User {id: $user_id})
-            CREATE (s:Summary {
-                id: $summary_id, 
-                text: $text, 
-                timestamp: $timestamp
-            })
-            CREATE (u)-[:WROTE]->(s)
+            UNWIND $rows AS row
+            MERGE (u:User {id: row.user_id})
+            MERGE (s:Summary {id: row.summary_id})
+            ON CREATE SET s.text = row.text, s.timestamp = row.timestamp
+            MERGE (u)-[:WROTE]->(s)
             """,
-            user_id=user_id,
-            summary_id=summary_id,
-            text=summary_text,
-            timestamp=datetime.now().isoformat()
+            rows=summary_rows
         )
 
-        # 3. Create Entity Nodes & Edges
-        for entity in entities:
-            # entity = {'name': 'Battery Life', 'type': 'Issue', 'sentiment': 'Negative'}
-            label = entity.get("type", "Entity").capitalize() # e.g., Issue, Feature
-            name = entity.get("name", "Unknown")
-            sentiment = entity.get("sentiment", "Neutral")
-            
-            # Sanitize Label (Cyber injection prevention - basic)
-            allowed_labels = ["Issue", "Feature", "Product", "Sentiment"]
-            if label not in allowed_labels:
-                label = "Entity"
-
-            # Merge Entity Node (e.g., (i:Issue {name: 'Battery Life'}))
-            query = f"""
-            MERGE (e:{label} {{name: $name}})
-            """
-            tx.run(query, name=name)
-
-            # Link Summary -> Entity
-            # (s)-[:MENTIONS {sentiment: 'Negative'}]->(e)
-            link_query = f"""
-            MATCH (s:Summary {{id: $summary_id}})
-            MATCH (e:{label} {{name: $name}})
-            CREATE (s)-[:MENTIONS {{sentiment: $sentiment}}]->(e)
-            """
-            tx.run(link_query, summary_id=summary_id, name=name, sentiment=sentiment)
+        # 2. One statement per entity label: MERGE the entity, link it to its Summary
+        for label, mentions in mentions_by_label.items():
+            tx.run(
+                f"""
+                UNWIND $mentions AS m
+                MATCH (s:Summary {{id: m.summary_id}})
+                MERGE (e:{label} {{name: m.name}})
+                MERGE (s)-[:MENTIONS {{sentiment: m.sentiment}}]->(e)
+                """,
+                mentions=mentions
+            )
+
+
+class GraphWriteBuffer:
+    """
+    Collects summaries from bulk ingestion and writes them to Neo4j in batches of
+    `max_summaries` per transaction. Thread-safe; call flush() when the bulk run ends.
+    """
+
+    def __init__(self, graph_db: Neo4jClient, max_summaries: int = 20):
+        self.graph_db = graph_db
+        self.max_summaries = max_summaries
+        self._pending: List[Tuple[str, dict, list]] = []
+        self._on_written: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def add(self, summary_text: str, metadata: dict, entities: list, on_written: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Buffers one summary. `on_written` runs once it has actually been written.
+        Returns True if this call wrote the buffer, False if the summary is still pending.
+        """
+        with self._lock:
+            self._pending.append((summary_text, metadata, entities))
+            if on_written:
+                self._on_written.append(on_written)
+            if len(self._pending) < self.max_summaries:
+                return False
+            batch, self._pending = self._pending, []
+            callbacks, self._on_written = self._on_written, []
+        self._write(batch, callbacks)
+        return True
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            callbacks, self._on_written = self._on_written, []
+        self._write(batch, callbacks)
+
+    def _write(self, batch, callbacks):
+        self.graph_db.store_summaries(batch)
+        for callback in callbacks:
+            callback()
+
+
+_graph_db: Optional[Neo4jClient] = None
+_graph_db_lock = threading.Lock()
+
+
+def get_graph_db() -> Neo4jClient:
+    """Returns the process-wide Neo4jClient, connecting (and bootstrapping the schema) on first use."""
+    global _graph_db
+    if _graph_db is None:
+        with _graph_db_lock:
+            if _graph_db is None:
+                _graph_db = Neo4jClient()
+    return _graph_db
+
 
-        print(f"🕸️ Graph Updated: 1 Summary, {len(entities)} Entities linked.")
+async def aclose_graph_db():
+    """Closes the shared Neo4jClient's async driver on shutdown (no-op if it was never created)."""
+    if _graph_db is not None:
+        await _graph_db.aclose()
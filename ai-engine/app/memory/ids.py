@@ -0,0 +1,60 @@
+import hashlib
+import uuid
+import unicodedata
+from typing import Any, Dict, Optional
+
+# Fixed namespace so the same content maps to the same ID in every process and deployment.
+FEEDBACK_NAMESPACE = uuid.UUID("6f1c3a52-8f0e-4c1e-9a57-2c4b1d7e9f30")
+
+# Metadata keys that identify an item or its author at the source (the first one present is used)
+FEEDBACK_ID_KEYS = ("id", "external_id", "review_id", "comment_id", "author", "author_id", "user", "username")
+
+
+def content_hash(*parts) -> str:
+    """Stable sha256 over the given parts (unlike Python's per-process salted hash())."""
+    joined = "\x1f".join("" if p is None else unicodedata.normalize("NFC", str(p)).strip() for p in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def content_uuid(*parts) -> str:
+    """Deterministic UUID (v5) for a piece of content, usable as a Qdrant point ID."""
+    return str(uuid.uuid5(FEEDBACK_NAMESPACE, content_hash(*parts)))
+
+
+def feedback_discriminator(metadata: Optional[Dict[str, Any]], timestamp=None) -> Optional[str]:
+    """
+    What tells two identical texts from the same source apart: an external ID or
+    author in the metadata, else the item's original timestamp. Pass no timestamp
+    when it was only filled in at ingest time, or replays would get new IDs.
+    """
+    for key in FEEDBACK_ID_KEYS:
+        value = (metadata or {}).get(key)
+        if value not in (None, ""):
+            return f"{key}={value}"
+    if timestamp is not None:
+        return f"timestamp={timestamp.isoformat() if hasattr(timestamp, 'isoformat') else timestamp}"
+    return None
+
+
+def feedback_parent_id(source: str, content: str, discriminator: Optional[str] = None) -> str:
+    """
+    Identity of one feedback item: the same text from the same source (and the same
+    author, external ID or original timestamp, when known) is the same feedback.
+    """
+    parts = (source, content) if discriminator is None else (source, content, discriminator)
+    return f"fb_{content_hash(*parts)[:32]}"
+
+
+def item_parent_id(item) -> str:
+    """feedback_parent_id of a NormalizedFeedback."""
+    timestamp = None if getattr(item, "timestamp_inferred", False) else item.timestamp
+    return feedback_parent_id(item.source, item.content, feedback_discriminator(item.metadata, timestamp))
+
+
+def chunk_point_id(parent_id: str, chunk_index: int) -> str:
+    return content_uuid("chunk", parent_id, chunk_index)
+
+
+def summary_point_id(parent_ids) -> str:
+    """A batch summary is identified by the (order-independent) set of feedback it covers."""
+    return content_uuid("rlm_summary", *sorted(set(parent_ids)))
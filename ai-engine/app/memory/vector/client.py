@@ -5,23 +5,176 @@ try:
 except ImportError:
     pass
 
-from qdrant_client import QdrantClient
+import asyncio
+import re
+from contextlib import nullcontext
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterator, Union
 from langchain_core.documents import Document
+from app.memory.ids import content_uuid
+from app.telemetry import span, traced
+
+EMBEDDING_DIMENSION = 384
+
+_INT8 = models.ScalarQuantization(
+    scalar=models.ScalarQuantizationConfig(
+        type=models.ScalarType.INT8,
+        quantile=0.99,     # Clip the outer 1% so outliers don't waste the int8 range
+        always_ram=True,   # Quantized vectors stay in RAM even when the originals are on disk
+    )
+)
+
+# Collection layouts, chosen with QDRANT_COLLECTION_PROFILE. "default" is the original
+# float32, all-in-RAM collection. The quantized profiles search int8 copies held in RAM,
+# then rescore the oversampled candidates against the float32 originals read from disk.
+COLLECTION_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "on_disk": False,
+        "on_disk_payload": False,
+        "hnsw": None,
+        "quantization": None,
+        "search": {},
+    },
+    "quantized": {
+        "on_disk": True,
+        "on_disk_payload": False,
+        "hnsw": models.HnswConfigDiff(m=16, ef_construct=200),
+        "quantization": _INT8,
+        "search": {"hnsw_ef": 128, "oversampling": 2.0, "rescore": True},
+    },
+    "large": {
+        "on_disk": True,
+        "on_disk_payload": True,
+        "hnsw": models.HnswConfigDiff(m=32, ef_construct=256),
+        "quantization": _INT8,
+        "search": {"hnsw_ef": 256, "oversampling": 3.0, "rescore": True},
+    },
+}
+
+
+# Payload fields that searches can filter on. Indexed on the server so Qdrant applies the
+# filter while traversing HNSW instead of post-filtering a larger top-k.
+PAYLOAD_INDEXES = {
+    "type": models.PayloadSchemaType.KEYWORD,
+    "source": models.PayloadSchemaType.KEYWORD,
+    "parent_id": models.PayloadSchemaType.KEYWORD,
+    "rating": models.PayloadSchemaType.FLOAT,
+    "timestamp": models.PayloadSchemaType.DATETIME,
+}
+
+_RELATIVE_TIME = re.compile(r"^\s*(\d+)\s*([hdw])\s*$")
+_TIME_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def _as_datetime(value: Union[str, datetime]) -> datetime:
+    """Accepts a datetime, an ISO-8601 string, or a look-back like '24h', '7d' or '2w'."""
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        relative = _RELATIVE_TIME.match(value)
+        if relative:
+            amount, unit = relative.groups()
+            return datetime.now(timezone.utc) - timedelta(**{_TIME_UNITS[unit]: int(amount)})
+        moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    # Stored timestamps without an offset are UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _match(key: str, value: Union[str, List[str]]) -> models.FieldCondition:
+    if isinstance(value, (list, tuple, set)):
+        return models.FieldCondition(key=key, match=models.MatchAny(any=list(value)))
+    return models.FieldCondition(key=key, match=models.MatchValue(value=value))
+
+
+def build_filter(
+    source: Union[str, List[str], None] = None,
+    doc_type: Union[str, List[str], None] = None,
+    parent_id: Union[str, List[str], None] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    since: Union[str, datetime, None] = None,
+    until: Union[str, datetime, None] = None,
+) -> Optional[models.Filter]:
+    """
+    Qdrant filter over the indexed payload fields (None when nothing is set).
+    String/list values match any of the given values; ratings and times are
+    inclusive bounds. doc_type 'chunk' also matches chunks stored before raw
+    chunks were tagged with a type.
+    """
+    conditions = []
+    if source:
+        conditions.append(_match("source", source))
+    if parent_id:
+        conditions.append(_match("parent_id", parent_id))
+    if doc_type:
+        types = [doc_type] if isinstance(doc_type, str) else list(doc_type)
+        type_condition = _match("type", types)
+        if "chunk" in types:
+            type_condition = models.Filter(should=[
+                type_condition, models.IsEmptyCondition(is_empty=models.PayloadField(key="type"))
+            ])
+        conditions.append(type_condition)
+    if min_rating is not None or max_rating is not None:
+        conditions.append(models.FieldCondition(key="rating", range=models.Range(gte=min_rating, lte=max_rating)))
+    if since or until:
+        conditions.append(models.FieldCondition(key="timestamp", range=models.DatetimeRange(
+            gte=_as_datetime(since) if since else None,
+            lte=_as_datetime(until) if until else None,
+        )))
+    return models.Filter(must=conditions) if conditions else None
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
 
 class VectorDatabase:
-    def __init__(self, collection_name: str = "feedback_vectors"):
+    def __init__(self, collection_name: str = "feedback_vectors", profile: Optional[str] = None):
         self.collection_name = collection_name
+        self.profile_name = profile or os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+        if self.profile_name not in COLLECTION_PROFILES:
+            raise ValueError(
+                f"Unknown Qdrant collection profile '{self.profile_name}' (choose from {', '.join(COLLECTION_PROFILES)})"
+            )
+        self.profile = COLLECTION_PROFILES[self.profile_name]
+
+        # Search-time defaults; explicit arguments to search() win, then these, then the profile's
+        hnsw_ef = _env_float("QDRANT_HNSW_EF")
+        rescore = os.getenv("QDRANT_RESCORE")
+        self.search_defaults = {
+            **self.profile["search"],
+            **({"hnsw_ef": int(hnsw_ef)} if hnsw_ef else {}),
+            **({"oversampling": _env_float("QDRANT_OVERSAMPLING")} if os.getenv("QDRANT_OVERSAMPLING") else {}),
+            **({"rescore": rescore != "0"} if rescore else {}),
+        }
+
+        # Bulk write tuning
+        self.upsert_batch_size = int(os.getenv("QDRANT_UPSERT_BATCH", "256"))
+        self.upsert_parallelism = int(os.getenv("QDRANT_UPSERT_PARALLEL", "4"))
+        self.upsert_retries = int(os.getenv("QDRANT_UPSERT_RETRIES", "3"))
+        self.upsert_wait = os.getenv("QDRANT_UPSERT_WAIT", "1") != "0"
+        self.is_remote = False
+        self._async_client = None
+        # Serializes writes to the in-memory client, which is not thread-safe
+        self._local_write_lock = threading.Lock()
         
         url = os.getenv("QDRANT_URL_ENDPOINT")
         api_key = os.getenv("QDRANT_API_KEY")
+        self._url, self._api_key = url, api_key
 
         if url and api_key:
             print(f"🚀 Connecting to Qdrant Cloud: {url}...")
             try:
                 self.client = QdrantClient(url=url, api_key=api_key)
                 self.client.get_collections() # Test connection
+                self.is_remote = True
             except Exception as e:
                 print(f"⚠️ Failed to connect to Qdrant Cloud ({e}). Falling back to In-Memory.")
                 self.client = QdrantClient(":memory:")
@@ -38,76 +191,447 @@ class VectorDatabase:
             self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=models.VectorParams(
-                    size=384,
-                    distance=models.Distance.COSINE
-                )
+                    size=EMBEDDING_DIMENSION,
+                    distance=models.Distance.COSINE,
+                    on_disk=self.profile["on_disk"] or None
+                ),
+                hnsw_config=self.profile["hnsw"],
+                quantization_config=self.profile["quantization"],
+                on_disk_payload=self.profile["on_disk_payload"] or None
             )
-            print(f"✅ Collection '{self.collection_name}' created.")
+            print(f"✅ Collection '{self.collection_name}' created ({self.profile_name} profile).")
+        elif self.is_remote:
+            # The in-memory client does not keep index settings, so drift is only checked remotely
+            drift = self.profile_drift()
+            if drift and os.getenv("QDRANT_MIGRATE_ON_START") == "1":
+                self.apply_profile()
+            elif drift:
+                print(
+                    f"⚠️ Collection '{self.collection_name}' differs from the {self.profile_name} profile "
+                    f"({', '.join(drift)}). Run `python -m app.memory.vector.client --migrate` "
+                    f"or set QDRANT_MIGRATE_ON_START=1."
+                )
         
-        # Create payload index for 'type' (safe to call even if exists)
-        self.client.create_payload_index(
-            collection_name=self.collection_name,
-            field_name="type",
-            field_schema=models.PayloadSchemaType.KEYWORD
-        )
+        # Payload indexes for filtered search (safe to call even if they exist; the
+        # in-memory client has no indexes and filters by scanning)
+        if self.is_remote:
+            for field_name, schema in PAYLOAD_INDEXES.items():
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=schema
+                )
+
+    @traced("qdrant.upsert")
+    def upsert_documents(
+        self,
+        documents: List[Document],
+        embeddings: List[List[float]],
+        batch_size: Optional[int] = None,
+        wait: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Writes documents in batches of `batch_size` points, with up to
+        QDRANT_UPSERT_PARALLEL batches in flight (remote Qdrant only; the local
+        in-memory client is not thread-safe). Each failed batch is retried on its own.
+
+        With wait=False, Qdrant acknowledges each batch before applying it; a
+        visibility barrier then polls until the last point of every batch can be
+        read back, so callers still see their writes when this returns.
 
-    def upsert_documents(self, documents: List[Document], embeddings: List[List[float]]):
-        points = []
-        for i, (doc, vector) in enumerate(zip(documents, embeddings)):
-            points.append(
+        Returns write stats (points, batches, retries, seconds, points_per_sec).
+        """
+        batch_size = batch_size or self.upsert_batch_size
+        wait = self.upsert_wait if wait is None else wait
+        started = time.perf_counter()
+
+        def build_batch(start: int) -> List[models.PointStruct]:
+            return [
                 models.PointStruct(
-                    id=i,  # Simple integer ID for MVP. Use UUID in prod.
+                    # Deterministic IDs make re-ingesting the same document an overwrite, not a duplicate
+                    id=doc.id or content_uuid(doc.metadata.get("type", "chunk"), doc.page_content),
                     vector=vector,
                     payload={
                         "content": doc.page_content,
                         **doc.metadata
                     }
                 )
+                for doc, vector in zip(documents[start:start + batch_size], embeddings[start:start + batch_size])
+            ]
+
+        def send(start: int):
+            points = build_batch(start)
+            for attempt in range(self.upsert_retries + 1):
+                try:
+                    self.client.upsert(collection_name=self.collection_name, points=points, wait=wait)
+                    return points[-1].id, attempt
+                except Exception as e:
+                    if attempt == self.upsert_retries:
+                        raise
+                    delay = 0.5 * 2 ** attempt
+                    print(f"⚠️ Upsert batch at {start} failed ({e}). Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+
+        offsets = range(0, min(len(documents), len(embeddings)), batch_size)
+        parallelism = self.upsert_parallelism if self.is_remote else 1
+        if parallelism > 1 and len(offsets) > 1:
+            with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                sent = list(pool.map(send, offsets))
+        elif self.is_remote:
+            sent = [send(start) for start in offsets]
+        else:
+            # Ingest stages upsert chunks and summaries from different threads
+            with self._local_write_lock:
+                sent = [send(start) for start in offsets]
+
+        if not wait and sent:
+            self._wait_until_visible([last_id for last_id, _ in sent])
+
+        seconds = time.perf_counter() - started
+        points = min(len(documents), len(embeddings))
+        return {
+            "points": points,
+            "batches": len(sent),
+            "retries": sum(retries for _, retries in sent),
+            "seconds": round(seconds, 3),
+            "points_per_sec": round(points / seconds, 1) if seconds else 0.0,
+        }
+
+    def _wait_until_visible(self, point_ids: List[Any], timeout: float = 30.0):
+        """Consistency barrier for wait=False writes: polls until every ID is readable."""
+        deadline = time.monotonic() + timeout
+        pending = {str(pid) for pid in point_ids}
+        delay = 0.05
+        while pending:
+            pending -= self.existing_ids(list(pending))
+            if not pending:
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{len(pending)} upsert batches not visible after {timeout}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    def existing_ids(self, point_ids: List[str], analyzed: bool = False) -> set:
+        """
+        Returns which of the given point IDs are already stored. With analyzed=True,
+        only points that `mark_analyzed` has flagged count.
+        """
+        if not point_ids:
+            return set()
+        found = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=["analyzed"] if analyzed else False,
+            with_vectors=False
+        )
+        return {str(p.id) for p in found if not analyzed or (p.payload or {}).get("analyzed")}
+
+    def mark_analyzed(self, point_ids: List[str]):
+        """Flags points whose summary and graph rows have been written (see IngestionService.drop_existing)."""
+        if not point_ids:
+            return
+        with self._local_write_lock if not self.is_remote else nullcontext():
+            self.client.set_payload(
+                collection_name=self.collection_name,
+                payload={"analyzed": True},
+                points=point_ids
             )
-        
-        self.client.upsert(
+
+    def profile_drift(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Compares the live collection with the configured profile. Returns
+        {setting: {"current": ..., "wanted": ...}} for every setting that differs.
+        """
+        config = self.client.get_collection(self.collection_name).config
+        vectors = config.params.vectors
+        quantization = config.quantization_config
+        current = {
+            "on_disk": bool(getattr(vectors, "on_disk", None)),
+            "on_disk_payload": bool(config.params.on_disk_payload),
+            "quantization": quantization.scalar.type.value if isinstance(quantization, models.ScalarQuantization) else None,
+        }
+        wanted = {
+            "on_disk": self.profile["on_disk"],
+            "on_disk_payload": self.profile["on_disk_payload"],
+            "quantization": self.profile["quantization"].scalar.type.value if self.profile["quantization"] else None,
+        }
+        if self.profile["hnsw"] is not None:
+            for key in ("m", "ef_construct"):
+                current[f"hnsw_{key}"] = getattr(config.hnsw_config, key)
+                wanted[f"hnsw_{key}"] = getattr(self.profile["hnsw"], key)
+        return {
+            key: {"current": current[key], "wanted": wanted[key]}
+            for key in wanted if current[key] != wanted[key]
+        }
+
+    def apply_profile(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Migrates an existing collection to the configured profile in place. Qdrant
+        keeps serving reads while it rebuilds the index and quantized copies in the
+        background; points are not re-uploaded. Returns the settings that changed.
+        """
+        drift = self.profile_drift()
+        if not drift:
+            return drift
+        print(f"🔧 Migrating collection '{self.collection_name}' to the {self.profile_name} profile: {drift}")
+        self.client.update_collection(
             collection_name=self.collection_name,
-            points=points
+            vectors_config={"": models.VectorParamsDiff(on_disk=self.profile["on_disk"])},
+            collection_params=models.CollectionParamsDiff(on_disk_payload=self.profile["on_disk_payload"]),
+            hnsw_config=self.profile["hnsw"],
+            # Dropping back to the default profile turns quantization off again
+            quantization_config=self.profile["quantization"] or models.Disabled.DISABLED,
         )
+        return drift
+
+    def search_params(
+        self,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None,
+        exact: bool = False,
+    ) -> Optional[models.SearchParams]:
+        """
+        Builds Qdrant SearchParams from explicit arguments, falling back to the
+        QDRANT_HNSW_EF / QDRANT_OVERSAMPLING / QDRANT_RESCORE settings and then the
+        profile. Returns None when nothing differs from Qdrant's defaults.
+        """
+        hnsw_ef = hnsw_ef or self.search_defaults.get("hnsw_ef")
+        oversampling = oversampling or self.search_defaults.get("oversampling")
+        rescore = self.search_defaults.get("rescore") if rescore is None else rescore
 
-    def search(self, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        quantization = None
+        if oversampling is not None or rescore is not None:
+            quantization = models.QuantizationSearchParams(oversampling=oversampling, rescore=rescore)
+        if hnsw_ef is None and quantization is None and not exact:
+            return None
+        return models.SearchParams(hnsw_ef=hnsw_ef, exact=exact or None, quantization=quantization)
+
+    def _query_params(self, **overrides) -> Optional[models.SearchParams]:
+        # The in-memory client always searches exactly and warns if given index parameters
+        return self.search_params(**overrides) if self.is_remote else None
+
+    @traced("qdrant.search")
+    def search(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        hnsw_ef: Optional[int] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None,
+        exact: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-`limit` points by cosine similarity, restricted to points matching
+        `filters` (keyword arguments of `build_filter`, e.g. {"source": "amazon",
+        "max_rating": 1, "since": "7d"}). `hnsw_ef` widens the HNSW beam; on
+        quantized profiles `oversampling` x `limit` int8 candidates are fetched
+        and, with `rescore`, re-ranked against the float32 originals.
+        """
         results = self.client.query_points(
             collection_name=self.collection_name,
             query=query_vector,
-            limit=limit
+            limit=limit,
+            query_filter=build_filter(**filters) if filters else None,
+            search_params=self._query_params(hnsw_ef=hnsw_ef, oversampling=oversampling, rescore=rescore, exact=exact)
         ).points
+        return self._format_hits(results)
+
+    def _batch_requests(
+        self,
+        query_vectors: List[List[float]],
+        limit: int,
+        filters: Union[Dict[str, Any], List[Optional[Dict[str, Any]]], None],
+        params: Dict[str, Any],
+    ) -> List[models.QueryRequest]:
+        # One filter dict applies to every query; a list gives each query its own
+        per_query = filters if isinstance(filters, list) else [filters] * len(query_vectors)
+        if len(per_query) != len(query_vectors):
+            raise ValueError(f"Got {len(per_query)} filters for {len(query_vectors)} queries")
+        search_params = self._query_params(**params)
+        return [
+            models.QueryRequest(
+                query=vector,
+                limit=limit,
+                filter=build_filter(**query_filters) if query_filters else None,
+                params=search_params,
+                with_payload=True,
+            )
+            for vector, query_filters in zip(query_vectors, per_query)
+        ]
+
+    @traced("qdrant.search_batch")
+    def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filters: Union[Dict[str, Any], List[Optional[Dict[str, Any]]], None] = None,
+        **params,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Runs several searches in one `query_batch_points` round trip. Returns one
+        hit list per query vector, in order. `filters` is either one filter dict
+        for every query or a list with one (or None) per query; `params` are the
+        search parameters accepted by `search`.
+        """
+        if not query_vectors:
+            return []
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=self._batch_requests(query_vectors, limit, filters, params)
+        )
+        return [self._format_hits(response.points) for response in responses]
+
+    def get_async_client(self) -> Optional[AsyncQdrantClient]:
+        """AsyncQdrantClient for the remote collection, created on first use (None when in-memory)."""
+        if not self.is_remote:
+            return None
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(url=self._url, api_key=self._api_key)
+        return self._async_client
+
+    async def aclose(self):
+        """Closes the AsyncQdrantClient, if one was opened."""
+        if self._async_client is not None:
+            client, self._async_client = self._async_client, None
+            await client.close()
+
+    async def asearch(
+        self, query_vector: List[float], limit: int = 5, filters: Optional[Dict[str, Any]] = None, **params
+    ) -> List[Dict[str, Any]]:
+        """Non-blocking `search` for the async request path (same filters and search parameters)."""
+        client = self.get_async_client()
+        if client is None:
+            # The in-memory store only exists inside the sync client
+            return await asyncio.to_thread(self.search, query_vector, limit, filters, **params)
+        with span("qdrant.search"):
+            response = await client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                limit=limit,
+                query_filter=build_filter(**filters) if filters else None,
+                search_params=self._query_params(**params)
+            )
+        return self._format_hits(response.points)
+
+    async def asearch_batch(
+        self,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        filters: Union[Dict[str, Any], List[Optional[Dict[str, Any]]], None] = None,
+        **params,
+    ) -> List[List[Dict[str, Any]]]:
+        """Non-blocking `search_batch` for the async request path."""
+        client = self.get_async_client()
+        if client is None:
+            return await asyncio.to_thread(self.search_batch, query_vectors, limit, filters, **params)
+        if not query_vectors:
+            return []
+        with span("qdrant.search_batch", queries=len(query_vectors)):
+            responses = await client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=self._batch_requests(query_vectors, limit, filters, params)
+            )
+        return [self._format_hits(response.points) for response in responses]
+
+    @staticmethod
+    def _format_hits(points) -> List[Dict[str, Any]]:
         return [
             {
                 "score": hit.score,
                 "content": hit.payload.get("content"),
                 "metadata": {k:v for k,v in hit.payload.items() if k != "content"}
             }
-            for hit in results
+            for hit in points
         ]
 
+    def iter_by_metadata(self, key: str, values: Union[str, List[str]], page_size: int = 256) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the payload of every point whose `key` matches `values` (one value
+        or any of a list), following scroll offsets page by page so the whole
+        collection is covered with only one page in memory.
+        """
+        match = models.MatchAny(any=values) if isinstance(values, list) else models.MatchValue(value=values)
+        filter_condition = models.Filter(must=[models.FieldCondition(key=key, match=match)])
+
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=filter_condition,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            for point in points:
+                yield point.payload
+            if offset is None:
+                return
+
+    def iter_with_vectors(self, filters: Optional[Dict[str, Any]] = None, page_size: int = 256) -> Iterator[tuple]:
+        """
+        Yields (payload, vector) for every point matching `filters` (`build_filter`
+        arguments), one scroll page at a time, so stored embeddings can be reused
+        without re-encoding their text.
+        """
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=build_filter(**filters) if filters else None,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            for point in points:
+                yield point.payload, point.vector
+            if offset is None:
+                return
+
     def scroll_by_metadata(self, key: str, value: str, limit: int = 100) -> List[str]:
         """
         Scrolls through the collection to find points matching a metadata filter.
-        Returns a list of content strings.
+        Returns up to `limit` content strings.
         """
-        filter_condition = models.Filter(
-            must=[
-                models.FieldCondition(
-                    key=key,
-                    match=models.MatchValue(value=value)
-                )
-            ]
-        )
-        
-        # Use scroll to get points
-        # Note: scroll returns (points, next_page_offset). 
-        # For this MVP, we just get the first page/batch defined by limit.
-        points, _ = self.client.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=filter_condition,
-            limit=limit,
-            with_payload=True,
-            with_vectors=False
-        )
-        
-        return [p.payload.get("content") for p in points]
+        return [payload.get("content") for payload in islice(self.iter_by_metadata(key, value), limit)]
+
+
+_vector_db: Optional[VectorDatabase] = None
+_vector_db_lock = threading.Lock()
+
+
+def get_vector_db() -> VectorDatabase:
+    """
+    Returns the process-wide VectorDatabase, connecting on first use. Ingestion and
+    the agent tools share it, so the in-memory fallback is one store, not two.
+    """
+    global _vector_db
+    if _vector_db is None:
+        with _vector_db_lock:
+            if _vector_db is None:
+                _vector_db = VectorDatabase()
+    return _vector_db
+
+
+async def aclose_vector_db():
+    """Closes the shared VectorDatabase's async client on shutdown (no-op if it was never created)."""
+    if _vector_db is not None:
+        await _vector_db.aclose()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Check or migrate a Qdrant collection to a collection profile.")
+    parser.add_argument("--collection", default="feedback_vectors")
+    parser.add_argument("--profile", choices=list(COLLECTION_PROFILES), help="Defaults to QDRANT_COLLECTION_PROFILE")
+    parser.add_argument("--migrate", action="store_true", help="Apply the profile instead of only reporting drift")
+    args = parser.parse_args()
+
+    db = VectorDatabase(collection_name=args.collection, profile=args.profile)
+    changes = db.apply_profile() if args.migrate else db.profile_drift()
+    print(json.dumps({"profile": db.profile_name, "migrated": args.migrate and bool(changes), "drift": changes}, indent=2))
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class AnswerCache:
+    """
+    Semantic response cache in front of the /chat agent.
+
+    Questions are embedded and compared (cosine similarity) against an in-process
+    index of recently answered questions. A match at or above `threshold` returns
+    the stored answer and trace without running the LangGraph loop. Entries expire
+    after `ttl` seconds, the index holds at most `max_entries` (oldest evicted
+    first), and `invalidate()` drops everything whenever new feedback is ingested.
+    """
+
+    def __init__(
+        self,
+        encode: Optional[Callable[[List[str]], np.ndarray]] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self._encode = encode
+        self.threshold = threshold if threshold is not None else float(os.getenv("CHAT_CACHE_THRESHOLD", "0.92"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("CHAT_CACHE_TTL", "3600"))
+        self.max_entries = max_entries or int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512"))
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (n, dim), unit-normalized rows
+        self._entries: List[Dict[str, Any]] = []
+        # Bumped on invalidation so answers computed against older data are not stored
+        self._generation = 0
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "invalidations": 0}
+
+    def embed(self, question: str) -> np.ndarray:
+        if self._encode is None:
+            from app.processing.embedder import get_embedding_service
+            return self._normalize(get_embedding_service().encode([question])[0])
+        return self._normalize(self._encode([question])[0])
+
+    async def aembed(self, question: str) -> np.ndarray:
+        if self._encode is None:
+            from app.processing.embedder import get_embedding_service
+            return self._normalize((await get_embedding_service().aencode([question]))[0])
+        # Injected encoders are plain callables; keep them off the event loop too
+        return self._normalize((await asyncio.to_thread(self._encode, [question]))[0])
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def lookup(self, question: str) -> Tuple[Optional[Dict[str, Any]], np.ndarray, int]:
+        """
+        Returns (hit, vector, generation). `hit` is the cached response (with the
+        matched question and its similarity) or None. Pass `vector` and
+        `generation` back to `store` once the agent has answered.
+        """
+        return self._match(self.embed(question))
+
+    async def alookup(self, question: str) -> Tuple[Optional[Dict[str, Any]], np.ndarray, int]:
+        """Awaitable `lookup`; the question is embedded without blocking the event loop."""
+        return self._match(await self.aembed(question))
+
+    def _match(self, vector: np.ndarray) -> Tuple[Optional[Dict[str, Any]], np.ndarray, int]:
+        with self._lock:
+            generation = self._generation
+            self._expire()
+            if self._entries:
+                scores = self._vectors @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._counters["hits"] += 1
+                    entry = self._entries[best]
+                    return {
+                        "answer": entry["answer"],
+                        "trace": entry["trace"],
+                        "matched_question": entry["question"],
+                        "similarity": round(float(scores[best]), 4),
+                        "age_seconds": round(time.time() - entry["created_at"], 1),
+                    }, vector, generation
+            self._counters["misses"] += 1
+        return None, vector, generation
+
+    def store(self, question: str, vector: np.ndarray, answer: str, trace: List[Any], generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False  # Feedback was ingested while the agent was running
+            self._entries.append({"question": question, "answer": answer, "trace": trace, "created_at": time.time()})
+            row = vector[np.newaxis, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._drop(overflow)
+            self._counters["stores"] += 1
+        return True
+
+    def invalidate(self):
+        """Drops every cached answer; called when new feedback is stored."""
+        with self._lock:
+            self._generation += 1
+            self._entries = []
+            self._vectors = None
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "threshold": self.threshold,
+            "ttl": self.ttl,
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals (called with the lock held)
+    # ------------------------------------------------------------------
+
+    def _expire(self):
+        # Entries are appended in time order, so the expired ones form a prefix
+        cutoff = time.time() - self.ttl
+        expired = 0
+        while expired < len(self._entries) and self._entries[expired]["created_at"] < cutoff:
+            expired += 1
+        if expired:
+            self._drop(expired)
+            self._counters["expired"] += expired
+
+    def _drop(self, n: int):
+        self._entries = self._entries[n:]
+        self._vectors = self._vectors[n:] if self._entries else None
+
+
+_answer_cache: Optional[AnswerCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Returns the process-wide AnswerCache, creating it on first use."""
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = AnswerCache()
+    return _answer_cache
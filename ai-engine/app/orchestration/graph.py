@@ -1,9 +1,11 @@
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode, tools_condition
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from app.orchestration.state import AgentState
-from app.abilities.tools import search_vector_memory, fetch_global_themes, query_graph_memory
+from app.abilities.tools import search_vector_memory, search_vector_memory_batch, fetch_global_themes, query_graph_memory
+from app.processing.llm_gateway import GatewayChatGroq
+from app.orchestration.prefetch import PREFETCH_ENABLED, prefetch_node, aprefetch_node, format_evidence
 import os
 
 # 1. Initialize LLM (Groq)
@@ -12,32 +14,53 @@ if not groq_api_key:
     # Use dummy for testing or raise error
     raise ValueError("GROQ_API_KEY not found in environment.")
 
-llm = ChatGroq(
+# Admitted, prioritized (interactive lane) and retried by the shared LLM gateway
+llm = GatewayChatGroq(
     temperature=0, 
     model_name="llama-3.1-8b-instant",
-    api_key=groq_api_key
+    api_key=groq_api_key,
+    max_retries=0,
+    lane="interactive"
 )
 
 # 2. Define Tools
-tools = [search_vector_memory, query_graph_memory, fetch_global_themes]
+tools = [search_vector_memory, search_vector_memory_batch, query_graph_memory, fetch_global_themes]
 
 # 3. Bind Tools to LLM
 llm_with_tools = llm.bind_tools(tools)
 
 # 4. Define Nodes
-def agent_node(state):
-    """
-    Invokes the LLM to decide on the next step (tool call or final answer).
-    """
+SYSTEM_PROMPT = "You are an expert AI Analyst. Use your tools (Vector Search, Batch Vector Search for several sub-questions, Graph Query, Global Themes) to answer user questions with evidence."
+
+def _agent_messages(state):
     messages = state.get("messages", [])
     if not messages:
         # Initial user query from state['question'] if messages empty
         messages = [
-            SystemMessage(content="You are an expert AI Analyst. Use your tools (Vector Search, Graph Query, Global Themes) to answer user questions with evidence."),
+            SystemMessage(content=SYSTEM_PROMPT),
             HumanMessage(content=state["question"])
         ]
-    
-    response = llm_with_tools.invoke(messages)
+    evidence = format_evidence(state)
+    if evidence:
+        # Prefetched context goes into the prompt only; it is not stored in the message history
+        messages = [SystemMessage(content=f"{SYSTEM_PROMPT}\n\n{evidence}")] + [
+            m for m in messages if getattr(m, "type", "") != "system"
+        ]
+    return messages
+
+def agent_node(state):
+    """
+    Invokes the LLM to decide on the next step (tool call or final answer).
+    """
+    response = llm_with_tools.invoke(_agent_messages(state))
+    return {"messages": [response], "steps": ["Agent Reasoning"]}
+
+async def aagent_node(state):
+    """
+    Async twin of agent_node, used by ainvoke/astream_events so the Groq call
+    doesn't occupy a thread.
+    """
+    response = await llm_with_tools.ainvoke(_agent_messages(state))
     return {"messages": [response], "steps": ["Agent Reasoning"]}
 
 # 5. Build Graph
@@ -50,19 +73,32 @@ from langgraph.graph import MessagesState
 class AgentState(MessagesState):
     question: str
     steps: list
+    # Filled by the prefetch node
+    vector_evidence: str
+    global_themes: str
+    graph_evidence: str
 
-workflow = StateGraph(AgentState)
+def build_graph(prefetch: bool = PREFETCH_ENABLED):
+    workflow = StateGraph(AgentState)
 
-workflow.add_node("agent", agent_node)
-workflow.add_node("tools", ToolNode(tools))
+    workflow.add_node("agent", RunnableLambda(agent_node, afunc=aagent_node, name="agent"))
+    workflow.add_node("tools", ToolNode(tools))
 
-workflow.set_entry_point("agent")
+    if prefetch:
+        # Evidence from all three memory layers is fetched concurrently before the first LLM turn
+        workflow.add_node("prefetch", RunnableLambda(prefetch_node, afunc=aprefetch_node, name="prefetch"))
+        workflow.set_entry_point("prefetch")
+        workflow.add_edge("prefetch", "agent")
+    else:
+        workflow.set_entry_point("agent")
 
-workflow.add_conditional_edges(
-    "agent",
-    tools_condition,
-)
+    workflow.add_conditional_edges(
+        "agent",
+        tools_condition,
+    )
+
+    workflow.add_edge("tools", "agent")
 
-workflow.add_edge("tools", "agent")
+    return workflow.compile()
 
-app = workflow.compile()
+app = build_graph()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from app.abilities.tools import search_vector_memory, fetch_global_themes, query_graph_memory
+from app.telemetry import in_current_context
+
+# Run the prefetch node before the first LLM turn. Off by default: every question would pay for
+# three lookups and up to 3 x MAX_EVIDENCE_CHARS of prompt on each LLM turn, against the gateway's TPM budget
+PREFETCH_ENABLED = os.getenv("AGENT_PREFETCH", "0") == "1"
+
+# Per-source cap on injected evidence, so the prompt stays well inside the context window
+MAX_EVIDENCE_CHARS = int(os.getenv("AGENT_PREFETCH_MAX_CHARS", "3000"))
+
+# Canned graph aggregate: the most mentioned entities and how people feel about them
+TOP_ENTITIES_QUERY = (
+    "MATCH (s:Summary)-[r:MENTIONS]->(e) "
+    "RETURN labels(e)[0] AS type, e.name AS name, count(s) AS mentions, collect(DISTINCT r.sentiment) AS sentiments "
+    "ORDER BY mentions DESC LIMIT 10"
+)
+
+_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="agent-prefetch")
+
+
+def _question(state) -> str:
+    if state.get("question"):
+        return state["question"]
+    # Callers that only pass messages: use the latest human turn
+    humans = [m.content for m in state.get("messages", []) if getattr(m, "type", "") == "human"]
+    return humans[-1] if humans else ""
+
+
+def _calls(question: str):
+    return {
+        "vector_evidence": (search_vector_memory, {"query": question}),
+        "global_themes": (fetch_global_themes, {}),
+        "graph_evidence": (query_graph_memory, {"cypher_query": TOP_ENTITIES_QUERY}),
+    }
+
+
+def _clip(result) -> str:
+    text = str(result)
+    return text if len(text) <= MAX_EVIDENCE_CHARS else text[:MAX_EVIDENCE_CHARS] + " ...[truncated]"
+
+
+def _safe_invoke(tool, args) -> str:
+    try:
+        return _clip(tool.invoke(args))
+    except Exception as e:
+        return f"Unavailable ({e})"
+
+
+async def _safe_ainvoke(tool, args) -> str:
+    try:
+        return _clip(await tool.ainvoke(args))
+    except Exception as e:
+        return f"Unavailable ({e})"
+
+
+def prefetch_node(state) -> Dict[str, str]:
+    """
+    Gathers vector evidence, the global theme report and a top-entities graph
+    aggregate side by side, so the first LLM turn can often answer directly
+    instead of spending one turn per tool.
+    """
+    futures = {key: _executor.submit(in_current_context(_safe_invoke), tool, args) for key, (tool, args) in _calls(_question(state)).items()}
+    return {key: future.result() for key, future in futures.items()}
+
+
+async def aprefetch_node(state) -> Dict[str, str]:
+    """Async twin of prefetch_node; the three lookups run as concurrent coroutines."""
+    calls = _calls(_question(state))
+    results = await asyncio.gather(*(_safe_ainvoke(tool, args) for tool, args in calls.values()))
+    return dict(zip(calls.keys(), results))
+
+
+def format_evidence(state) -> str:
+    """Renders prefetched evidence for the system prompt ('' when nothing was prefetched)."""
+    sections = [
+        ("Relevant feedback (vector search)", state.get("vector_evidence")),
+        ("Global theme report", state.get("global_themes")),
+        ("Most mentioned entities (graph)", state.get("graph_evidence")),
+    ]
+    body = "\n\n".join(f"## {title}\n{text}" for title, text in sections if text)
+    if not body:
+        return ""
+    return (
+        "The following evidence was already retrieved for this question. "
+        "Answer from it directly when it is sufficient, and only call tools for details it does not cover.\n\n"
+        + body
+    )
@@ -0,0 +1,57 @@
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# Tool outputs can be whole report texts; events carry a preview only
+TOOL_OUTPUT_PREVIEW_CHARS = 2000
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encodes one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def summarize_result(result: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Returns (answer, trace) from a final agent state, as served by /chat."""
+    messages = (result or {}).get("messages") or []
+    if not messages:
+        return "", []
+    answer = messages[-1].content
+    trace = [m.content for m in messages if getattr(m, "type", "") == "ai"]
+    return answer, trace
+
+
+def _preview(value: Any) -> str:
+    text = getattr(value, "content", value)
+    text = text if isinstance(text, str) else str(text)
+    return text[:TOOL_OUTPUT_PREVIEW_CHARS]
+
+
+async def stream_agent_events(agent, inputs: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Runs the compiled LangGraph agent and yields (event, data) pairs as work happens:
+
+        token        {"text"}               answer tokens from the LLM
+        tool_call    {"name", "input"}      a tool is about to run
+        tool_result  {"name", "output"}     the tool finished (output truncated)
+        final        {"answer", "trace"}    the agent is done
+
+    Tokens produced by an LLM step that ends up calling tools are followed by a
+    tool_call event, so clients should discard the text they have collected so far
+    when one arrives.
+    """
+    final_state = None
+    async for event in agent.astream_events(inputs, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            text = getattr(event["data"].get("chunk"), "content", "")
+            if text:
+                yield "token", {"text": text}
+        elif kind == "on_tool_start":
+            yield "tool_call", {"name": event["name"], "input": event["data"].get("input")}
+        elif kind == "on_tool_end":
+            yield "tool_result", {"name": event["name"], "output": _preview(event["data"].get("output"))}
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            final_state = event["data"].get("output")
+
+    answer, trace = summarize_result(final_state)
+    yield "final", {"answer": answer, "trace": trace}
@@ -1,32 +1,41 @@
-from typing import List
-from app.memory.vector.client import VectorDatabase
-from app.processing.rlm_agent import RLMFeedbackAnalyzer
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from app.memory.vector.client import get_vector_db
+from app.telemetry import in_current_context, traced
+
+# Level 1 summaries written by ingestion ('rlm_summary') and by older pipelines ('summary')
+SUMMARY_TYPES = ["rlm_summary", "summary"]
 
 class GlobalAggregator:
-    def __init__(self):
-        self.vector_db = VectorDatabase()
-        self.rlm = RLMFeedbackAnalyzer()
+    def __init__(self, vector_db=None, rlm=None, group_size: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.vector_db = vector_db or get_vector_db()
+        self.rlm = rlm or self._default_rlm()
+        # Summaries per RLM call, and RLM calls in flight, for the map-reduce tree
+        self.group_size = group_size if group_size is not None else int(os.getenv("AGGREGATION_GROUP_SIZE", "20"))
+        self.max_concurrency = max_concurrency or int(os.getenv("AGGREGATION_MAX_CONCURRENCY", "4"))
+        if self.group_size < 2:
+            # Groups of one never shrink a level, so the reduce would not terminate
+            raise ValueError(f"Aggregation group size must be at least 2, got {self.group_size}")
+
+    @staticmethod
+    def _default_rlm():
+        # dspy is imported only when an aggregation actually needs the RLM; the analyzer
+        # (and its LM) is the one ingestion uses, whichever thread built it first
+        from app.processing.rlm_agent import get_rlm_analyzer
+        return get_rlm_analyzer()
 
     def run_aggregation(self) -> str:
         """
         Fetches all Level 1 summaries and aggregates them into a Global Theme Report.
+
+        The whole collection is scrolled page by page, then reduced as a tree:
+        fixed-size groups are summarized in parallel, and the group reports become
+        the input of the next level until one report remains (log depth).
         """
         print("🔍 Fetching Level 1 Summaries from Qdrant...")
         
         # Use precise metadata filtering to get Level 1 Summaries
-        summaries = self.vector_db.scroll_by_metadata(
-            key="type", 
-            value="summary", 
-            limit=100
-        )
-        
-        if not summaries:
-            print("⚠️ No Level 1 summaries found to aggregate.")
-            return "No data."
-
-        print(f"✅ Found {len(summaries)} summaries. Aggregating...")
-        
-        # Prepare data for new RLM analyzer
         feedback_data = [
             {
                 'content': s.get('content', ''),
@@ -34,11 +43,16 @@ class GlobalAggregator:
                 'source': s.get('source', 'summary-store'),
                 'timestamp': s.get('timestamp')
             }
-            for s in summaries
+            for s in self.vector_db.iter_by_metadata(key="type", values=SUMMARY_TYPES)
         ]
         
-        analysis = self.rlm.analyze(feedback_data)
-        global_report = analysis.get('hierarchical_summary', 'Aggregation failed.')
+        if not feedback_data:
+            print("⚠️ No Level 1 summaries found to aggregate.")
+            return "No data."
+
+        print(f"✅ Found {len(feedback_data)} summaries. Aggregating...")
+        
+        global_report = self.reduce(feedback_data)
         
         print("\n" + "="*40)
         print("🌍 GLOBAL THEMES REPORT 🌍")
@@ -48,6 +62,53 @@ class GlobalAggregator:
         
         return global_report
 
+    @traced("aggregation.reduce")
+    def reduce(self, items: List[Dict[str, Any]]) -> str:
+        """Tree-structured map-reduce over RLM analyses. Returns the final summary."""
+        level = 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="aggregate") as pool:
+            while True:
+                groups = [items[i:i + self.group_size] for i in range(0, len(items), self.group_size)]
+                print(f"🌲 Aggregation level {level}: {len(items)} inputs -> {len(groups)} groups")
+                analyses = list(pool.map(in_current_context(self._analyze_group), groups))
+                if len(analyses) == 1:
+                    return str(analyses[0].get('hierarchical_summary', 'Aggregation failed.'))
+
+                # Group reports become the inputs of the next level
+                items = [
+                    {
+                        'content': self._format_partial(analysis),
+                        'rating': None,
+                        'source': f'aggregation-level-{level}',
+                        'timestamp': None
+                    }
+                    for analysis in analyses
+                ]
+                level += 1
+
+    def _analyze_group(self, group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            return self._as_dict(self.rlm.analyze(group))
+        except Exception as e:
+            # One failed RLM call must not abort the corpus: pass the group's inputs up unmerged
+            print(f"⚠️ Aggregation of {len(group)} inputs failed, keeping them as-is: {e}")
+            return {'hierarchical_summary': "\n\n".join(str(item.get('content', '')) for item in group)}
+
+    @staticmethod
+    def _as_dict(analysis: Any) -> Dict[str, Any]:
+        # dspy may hand back the analysis as free text instead of a dict
+        return analysis if isinstance(analysis, dict) else {'hierarchical_summary': str(analysis)}
+
+    @staticmethod
+    def _format_partial(analysis: Dict[str, Any]) -> str:
+        """Keeps a group's themes/issues alongside its summary so the next level can merge them."""
+        themes = ", ".join(map(str, analysis.get('themes', [])))
+        issues = ", ".join(map(str, analysis.get('critical_issues', [])))
+        return (
+            f"{analysis.get('hierarchical_summary', '')}\n"
+            f"Themes: {themes}\nCritical issues: {issues}\nSentiment: {analysis.get('sentiment', 'unknown')}"
+        )
+
 if __name__ == "__main__":
     aggregator = GlobalAggregator()
     aggregator.run_aggregation()
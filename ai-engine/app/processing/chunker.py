@@ -2,6 +2,7 @@ from typing import List, Dict, Any
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from app.api.schemas import NormalizedFeedback
+from app.memory.ids import item_parent_id, chunk_point_id
 
 class FeedbackChunker:
     def __init__(self, chunk_size: int = 1024, chunk_overlap: int = 200):
@@ -17,10 +18,11 @@ class FeedbackChunker:
         for item in feedback_items:
             base_metadata = item.metadata.copy()
             base_metadata.update({
+                "type": "chunk",
                 "source": item.source,
                 "timestamp": item.timestamp.isoformat() if item.timestamp else None,
                 "rating": item.rating,
-                "parent_id": f"{item.source}_{item.timestamp}_{hash(item.content)}" # Simple unique ID logic
+                "parent_id": item_parent_id(item)  # Content-addressed, stable across processes
             })
 
             chunks = self.text_splitter.split_text(item.content)
@@ -30,6 +32,7 @@ class FeedbackChunker:
                 chunk_metadata["chunk_index"] = i
                 
                 doc = Document(
+                    id=chunk_point_id(base_metadata["parent_id"], i),
                     page_content=chunk_text,
                     metadata=chunk_metadata
                 )
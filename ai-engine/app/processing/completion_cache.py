@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# off:       no caching
+# readwrite: serve hits, store fresh completions (default)
+# record:    always call the LLM, overwrite stored completions
+# replay:    serve hits only; a miss raises CompletionCacheMiss instead of calling Groq
+CACHE_MODES = ("off", "readwrite", "record", "replay")
+
+
+class CompletionCacheMiss(LookupError):
+    """Raised in replay mode when a prompt has no recorded completion."""
+
+
+def completion_key(namespace: str, request: Dict[str, Any]) -> str:
+    """Content address of an LLM request: sha256 over its canonical JSON form."""
+    canonical = json.dumps(request, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(f"{namespace}\x00{canonical}".encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Content-addressed store of LLM completions shared by the ChatGroq and dspy.LM
+    adapters in `llm_gateway`.
+
+    Completions are JSON documents in a SQLite file, keyed by `completion_key`.
+    When the file holds more than `max_bytes` of completions, the least recently
+    used ones are evicted. Hits are served before the gateway, so they cost no
+    Groq quota. In replay mode, a whole ingest or chat run can be reproduced
+    offline from a previous recording.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None, mode: Optional[str] = None):
+        self.path = path if path is not None else os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.mode = (mode or os.getenv("LLM_CACHE_MODE", "readwrite")).lower()
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"LLM_CACHE_MODE must be one of {CACHE_MODES}, got {self.mode!r}")
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "replay_misses": 0}
+
+        self._conn = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used)")
+        (self._bytes,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the stored completion for `key`, or None (raises on a replay miss)."""
+        if self.mode in ("off", "record"):
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                with self._conn:
+                    self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._counters["hits"] += 1
+                return json.loads(row[0])
+            self._counters["misses"] += 1
+            if self.mode == "replay":
+                self._counters["replay_misses"] += 1
+        if self.mode == "replay":
+            raise CompletionCacheMiss(f"No recorded completion for request {key[:16]} (LLM_CACHE_MODE=replay)")
+        return None
+
+    def put(self, key: str, namespace: str, value: Any) -> bool:
+        """Stores a completion. Values that are not JSON-serializable are skipped."""
+        if self.mode not in ("readwrite", "record"):
+            return False
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return False
+        size = len(encoded.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                previous = self._conn.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO completions (key, namespace, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, namespace, encoded, size, now, now),
+                )
+            self._bytes += size - (previous[0] if previous else 0)
+            self._counters["writes"] += 1
+            if self._bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["bytes"] = self._bytes
+            (stats["entries"],) = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({"mode": self.mode, "max_bytes": self.max_bytes, "hit_rate": stats["hits"] / lookups if lookups else 0.0})
+        return stats
+
+    def _evict(self):
+        # Trim to 90% of the budget so we don't evict on every write
+        target = int(self.max_bytes * 0.9)
+        freed = evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM completions ORDER BY last_used").fetchall()
+        doomed = []
+        for key, size in rows:
+            if self._bytes - freed <= target:
+                break
+            doomed.append((key,))
+            freed += size
+            evicted += 1
+        with self._conn:
+            self._conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+        self._bytes -= freed
+        self._counters["evictions"] += evicted
+
+
+_completion_cache: Optional[CompletionCache] = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """Returns the process-wide CompletionCache, creating it on first use."""
+    global _completion_cache
+    if _completion_cache is None:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                _completion_cache = CompletionCache()
+    return _completion_cache
@@ -0,0 +1,231 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.processing.embedding_cache import EmbeddingCache, cache_key
+from app.telemetry import in_current_context, traced
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# torch:     SentenceTransformer on PyTorch (default)
+# onnx:      the model's ONNX export on ONNX Runtime, fp32 (same vectors, no torch needed)
+# onnx-int8: the same graph with dynamic int8 quantization (fastest, vectors differ slightly)
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class _EncodeRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingService:
+    """
+    Process-wide embedding engine shared by ingestion, agent tools and the RLM helpers.
+
+    A single model is loaded lazily, on the backend chosen by `EMBEDDING_BACKEND`
+    (see EMBEDDING_BACKENDS). Concurrent `encode` calls are
+    queued and a dispatcher thread coalesces them into micro-batches (up to
+    `max_batch_size` texts, or whatever has arrived after `max_wait_ms`), sorted
+    by length to cut padding waste. Texts already in the `EmbeddingCache` never
+    reach the model. Async callers use `aencode`, which waits on a small
+    dedicated executor (`EMBED_ASYNC_WORKERS`) instead of the event loop or
+    Starlette's request threadpool.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        cache: Optional[EmbeddingCache] = None,
+        backend: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+        if self.backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"EMBEDDING_BACKEND must be one of {EMBEDDING_BACKENDS}, got {self.backend!r}")
+        # int8 vectors are not interchangeable with fp32 ones, so they get their own cache entries
+        self.cache_namespace = f"{model_name}#int8" if self.backend == "onnx-int8" else model_name
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBED_MAX_BATCH", "64"))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("EMBED_MAX_WAIT_MS", "10"))) / 1000
+
+        self.cache = cache
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._queue: "queue.Queue[_EncodeRequest]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "texts": 0,
+            "batches": 0,
+            "encode_seconds": 0.0,
+            "queue_wait_seconds": 0.0,
+        }
+
+        self._async_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("EMBED_ASYNC_WORKERS", "4")), thread_name_prefix="embedding-async"
+        )
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="embedding-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    # ------------------------------------------------------------------
+    # Model
+    # ------------------------------------------------------------------
+
+    def get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    print(f"⏳ Loading embedding model '{self.model_name}' ({self.backend}) into memory...")
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        if self.backend.startswith("onnx"):
+            from app.processing.onnx_encoder import OnnxSentenceEncoder
+            return OnnxSentenceEncoder(self.model_name, quantize=self.backend == "onnx-int8")
+
+        import torch
+        from sentence_transformers import SentenceTransformer
+        torch.set_num_threads(1)  # Limit CPU threads to avoid OOM
+        return SentenceTransformer(self.model_name, device='cpu')
+
+    def warmup(self) -> "EmbeddingService":
+        """Loads the model and runs one throwaway batch, so the first request skips torch's lazy setup."""
+        self.get_model().encode(["warmup"], batch_size=1)
+        return self
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @traced("embedding.encode")
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeds `texts`, blocking until the micro-batch containing them is done.
+        Returns a (len(texts), dim) float32 array, like SentenceTransformer.encode.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.get_model().get_sentence_embedding_dimension()), dtype=np.float32)
+        if self.cache is None:
+            return self._encode_uncached(texts)
+
+        keys = [cache_key(self.cache_namespace, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = list({key: text for key, text in zip(keys, texts) if key not in cached}.items())
+        if missing:
+            encoded = self._encode_uncached([text for _, text in missing])
+            fresh = {key: vector for (key, _), vector in zip(missing, encoded)}
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+        return np.stack([cached[key] for key in keys])
+
+    async def aencode(self, texts: List[str]) -> np.ndarray:
+        """Awaitable `encode`; cache lookups and the model run off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._async_executor, in_current_context(self.encode), texts)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        request = _EncodeRequest(texts)
+        self._queue.put(request)
+        return request.future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        encode_seconds = stats["encode_seconds"]
+        stats.update({
+            "model": self.model_name,
+            "backend": self.backend,
+            "model_loaded": self._model is not None,
+            "queue_depth": self._queue.qsize(),
+            "avg_batch_size": stats["texts"] / stats["batches"] if stats["batches"] else 0.0,
+            "texts_per_second": stats["texts"] / encode_seconds if encode_seconds else 0.0,
+            "avg_queue_wait_ms": 1000 * stats["queue_wait_seconds"] / stats["requests"] if stats["requests"] else 0.0,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Dispatcher
+    # ------------------------------------------------------------------
+
+    def _collect_batch(self) -> List[_EncodeRequest]:
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _run_batch(self, batch: List[_EncodeRequest]):
+        started = time.perf_counter()
+        texts = [text for request in batch for text in request.texts]
+
+        # Length-sorted order keeps similarly sized inputs in the same padded batch
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        model = self.get_model()
+        encoded = model.encode([texts[i] for i in order], batch_size=min(len(texts), self.max_batch_size))
+        embeddings = np.empty_like(encoded)
+        embeddings[order] = encoded
+
+        offset = 0
+        for request in batch:
+            n = len(request.texts)
+            request.future.set_result(embeddings[offset:offset + n])
+            offset += n
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self._stats["requests"] += len(batch)
+            self._stats["texts"] += len(texts)
+            self._stats["batches"] += 1
+            self._stats["encode_seconds"] += finished - started
+            self._stats["queue_wait_seconds"] += sum(started - r.enqueued_at for r in batch)
+
+
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Returns the process-wide EmbeddingService, creating it on first use."""
+    global _embedding_service
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                cache = EmbeddingCache() if os.getenv("EMBED_CACHE", "1") != "0" else None
+                _embedding_service = EmbeddingService(os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL), cache=cache)
+    return _embedding_service
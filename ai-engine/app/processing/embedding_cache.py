@@ -0,0 +1,146 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC unicode with collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by sha256(model name + normalized text).
+
+    Tier 1 is an in-memory LRU of `memory_items` vectors. Tier 2 is a SQLite file
+    storing float32 blobs, trimmed back to `disk_items` rows (least recently used
+    first) whenever it grows past the limit. Set `path` to "" to keep memory only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_items: Optional[int] = None,
+        disk_items: Optional[int] = None,
+    ):
+        self.path = path if path is not None else os.getenv("EMBED_CACHE_PATH", "embedding_cache.db")
+        self.memory_items = memory_items if memory_items is not None else int(os.getenv("EMBED_CACHE_MEMORY_ITEMS", "10000"))
+        self.disk_items = disk_items if disk_items is not None else int(os.getenv("EMBED_CACHE_DISK_ITEMS", "200000"))
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = None
+        if self.path:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        key TEXT PRIMARY KEY,
+                        vector BLOB NOT NULL,
+                        last_used REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            (self._disk_count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached vectors for whichever of `keys` are present."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            disk_lookup = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                else:
+                    disk_lookup.append(key)
+            self._counters["memory_hits"] += len(found)
+
+            if disk_lookup and self._conn is not None:
+                now = time.time()
+                for start in range(0, len(disk_lookup), 500):  # Stay under SQLite's variable limit
+                    batch = disk_lookup[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+                    if rows:
+                        with self._conn:
+                            self._conn.executemany(
+                                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                [(now, key) for key, _ in rows],
+                            )
+                self._counters["disk_hits"] += sum(1 for key in disk_lookup if key in found)
+
+            self._counters["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, np.asarray(vector, dtype=np.float32))
+            self._counters["writes"] += len(items)
+
+            if self._conn is not None:
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                        [(key, np.asarray(v, dtype=np.float32).tobytes(), now) for key, v in items.items()],
+                    )
+                self._disk_count += len(items)  # Upper bound; replaced keys are recounted on trim
+                if self._disk_count > self.disk_items:
+                    self._trim_disk()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self):
+        (self._disk_count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = self._disk_count - self.disk_items
+        if excess <= 0:
+            return
+        # Evict a little extra so we don't trim on every single write
+        excess += max(1, self.disk_items // 20)
+        with self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+        self._disk_count -= deleted
+        self._counters["evictions"] += deleted
@@ -0,0 +1,175 @@
+import os
+from typing import List
+
+import numpy as np
+
+# Up to this many items, groups come from exact average-linkage clustering (O(n²) memory)
+EXACT_GROUPING_MAX = int(os.getenv("RLM_GROUPING_EXACT_MAX", "2000"))
+
+# Items assigned per mini-batch by the streaming grouper, and cluster rows compared per block
+GROUPING_BATCH_SIZE = int(os.getenv("RLM_GROUPING_BATCH", "1024"))
+
+# Clusters the streaming grouper keeps; past this the most similar ones are merged, even below
+# the threshold, so low-cohesion input costs O(n * limit) instead of O(n²)
+GROUPING_MAX_CLUSTERS = int(os.getenv("RLM_GROUPING_MAX_CLUSTERS", "1024"))
+_BLOCK = 1024
+
+
+def group_embeddings(embeddings, threshold: float = 0.7, exact_max: int = None) -> List[List[int]]:
+    """
+    Groups row indices of `embeddings` so that items in a group have an average
+    cosine similarity of at least `threshold`. Small inputs use exact
+    agglomerative clustering; larger ones the streaming grouper, which keeps the
+    same average-linkage threshold (up to RLM_GROUPING_MAX_CLUSTERS groups) but
+    runs in O(n * groups) time and O(batch * groups) memory.
+    """
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    if len(vectors) < 2:
+        return [list(range(len(vectors)))]
+    exact_max = EXACT_GROUPING_MAX if exact_max is None else exact_max
+    if len(vectors) <= exact_max:
+        return agglomerative_groups(vectors, threshold)
+    return streaming_groups(vectors, threshold)
+
+
+def agglomerative_groups(embeddings, threshold: float) -> List[List[int]]:
+    """Exact average-linkage clustering on cosine distance (sklearn; n x n distance matrix)."""
+    # sklearn is imported on first use; it is slow to load
+    from sklearn.cluster import AgglomerativeClustering
+    clustering = AgglomerativeClustering(
+        n_clusters=None,
+        distance_threshold=1 - threshold,
+        metric='cosine',
+        linkage='average'
+    )
+    return _groups_from_labels(clustering.fit_predict(embeddings))
+
+
+def streaming_groups(embeddings, threshold: float, batch_size: int = None, max_clusters: int = None) -> List[List[int]]:
+    """
+    Mini-batch average-linkage grouping.
+
+    Each cluster is kept as the sum of its unit vectors and a count. For unit
+    vectors the average cosine between an item and a cluster's members is
+    `x · sum / count`, and between two clusters `sum_a · sum_b / (n_a * n_b)`,
+    so average linkage can be evaluated without any pairwise item matrix.
+
+    1. Stream: each batch is compared with the current clusters in one matrix
+       product. Items whose best average similarity reaches `threshold` join that
+       cluster. The rest start new clusters among themselves, in input order.
+    2. Merge: clusters whose average-linkage similarity still reaches
+       `threshold` are merged, best pairs first, until no pair qualifies (the
+       same stopping rule as agglomerative clustering with that threshold).
+
+    At most `max_clusters` clusters are kept. When a batch pushes the count past
+    it, the most similar clusters are merged down to the limit, so every item is
+    compared with a bounded number of clusters. Data with more distinct topics
+    than the limit (or no structure at all) comes back as `max_clusters` coarser
+    groups rather than costing O(n²).
+    """
+    vectors = _unit(np.asarray(embeddings, dtype=np.float32))
+    batch_size = batch_size or GROUPING_BATCH_SIZE
+    max_clusters = max_clusters or GROUPING_MAX_CLUSTERS
+    labels = np.empty(len(vectors), dtype=np.int64)
+    sums = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+    counts = np.zeros(0, dtype=np.float32)
+
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start:start + batch_size]
+        joined = np.zeros(len(batch), dtype=bool)
+        if len(counts):
+            similarity = (batch @ sums.T) / counts
+            best = similarity.argmax(axis=1)
+            joined = similarity[np.arange(len(batch)), best] >= threshold
+            labels[start + np.flatnonzero(joined)] = best[joined]
+            np.add.at(sums, best[joined], batch[joined])
+            np.add.at(counts, best[joined], 1)
+
+        new_sums, new_counts, new_labels = _leader_clusters(batch[~joined], threshold)
+        labels[start + np.flatnonzero(~joined)] = len(counts) + new_labels
+        sums = np.concatenate([sums, new_sums])
+        counts = np.concatenate([counts, new_counts])
+        if len(counts) > max_clusters:
+            seen = start + len(batch)
+            labels[:seen], sums, counts = _merge_clusters(sums, counts, labels[:seen], threshold, max_clusters)
+
+    return _groups_from_labels(_merge_clusters(sums, counts, labels, threshold)[0])
+
+
+def _leader_clusters(batch: np.ndarray, threshold: float):
+    """Sequentially clusters the items no existing cluster accepted. Returns (sums, counts, labels)."""
+    sums = np.zeros((len(batch), batch.shape[1]), dtype=np.float32)
+    counts = np.zeros(len(batch), dtype=np.float32)
+    labels = np.empty(len(batch), dtype=np.int64)
+    clusters = 0
+    for i, vector in enumerate(batch):
+        if clusters:
+            similarity = (sums[:clusters] @ vector) / counts[:clusters]
+            best = int(similarity.argmax())
+            if similarity[best] >= threshold:
+                sums[best] += vector
+                counts[best] += 1
+                labels[i] = best
+                continue
+        sums[clusters], counts[clusters], labels[i] = vector, 1, clusters
+        clusters += 1
+    return sums[:clusters], counts[:clusters], labels
+
+
+def _merge_clusters(sums: np.ndarray, counts: np.ndarray, labels: np.ndarray, threshold: float, max_clusters: int = None):
+    """
+    Merges clusters while any pair's average-linkage similarity reaches `threshold`,
+    and, while there are more than `max_clusters`, the most similar pairs below it.
+    Returns (labels, sums, counts).
+    """
+    while len(counts) > 1:
+        # Each cluster's most similar partner, computed a block of rows at a time
+        best_partner = np.empty(len(counts), dtype=np.int64)
+        best_similarity = np.empty(len(counts), dtype=np.float32)
+        for start in range(0, len(counts), _BLOCK):
+            rows = slice(start, start + _BLOCK)
+            similarity = (sums[rows] @ sums.T) / np.outer(counts[rows], counts)
+            block = np.arange(similarity.shape[0])
+            similarity[block, block + start] = -np.inf
+            best_partner[rows] = similarity.argmax(axis=1)
+            best_similarity[rows] = similarity[block, best_partner[rows]]
+
+        excess = len(counts) - max_clusters if max_clusters else 0
+        candidates = np.arange(len(counts)) if excess > 0 else np.flatnonzero(best_similarity >= threshold)
+        if not len(candidates):
+            break
+        # Best pairs first; a cluster takes part in at most one merge per round
+        target = np.arange(len(counts))
+        merged = np.zeros(len(counts), dtype=bool)
+        merges = 0
+        for i in candidates[np.argsort(-best_similarity[candidates], kind="stable")]:
+            j = best_partner[i]
+            if merged[i] or merged[j]:
+                continue
+            if best_similarity[i] < threshold and merges >= excess:
+                break  # Down to the limit; the remaining pairs are below the threshold
+            merges += 1
+            merged[i] = merged[j] = True
+            keep, drop = min(i, j), max(i, j)
+            target[drop] = keep
+            sums[keep] += sums[drop]
+            counts[keep] += counts[drop]
+
+        survivors = np.flatnonzero(target == np.arange(len(counts)))
+        renumber = np.empty(len(counts), dtype=np.int64)
+        renumber[survivors] = np.arange(len(survivors))
+        labels = renumber[target[labels]]
+        sums, counts = sums[survivors], counts[survivors]
+    return labels, sums, counts
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def _groups_from_labels(labels) -> List[List[int]]:
+    """Index lists per label, ordered by each group's first item."""
+    groups = {}
+    for idx, label in enumerate(labels):
+        groups.setdefault(label, []).append(idx)
+    return list(groups.values())
@@ -1,42 +1,104 @@
-from typing import List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Optional
 from collections import defaultdict
 from langchain_core.documents import Document
 
 from app.api.schemas import NormalizedFeedback
 from app.processing.chunker import FeedbackChunker
-from app.memory.vector.client import VectorDatabase
-from app.processing.rlm_agent import RLMFeedbackAnalyzer  # Using dspy.RLM
-from app.memory.graph.client import Neo4jClient
+from app.memory.vector.client import get_vector_db
+from app.processing.rlm_agent import get_rlm_analyzer  # Using dspy.RLM
+from app.memory.graph.client import GraphWriteBuffer, get_graph_db
+from app.processing.embedder import get_embedding_service
+from app.processing.theme_report import get_theme_report_store
+from app.orchestration.answer_cache import get_answer_cache
+from app.memory.ids import item_parent_id, chunk_point_id, summary_point_id
+from app.telemetry import in_current_context, span, traced
 
 class IngestionService:
     def __init__(self):
         self.chunker = FeedbackChunker()
-        self.vector_db = VectorDatabase()
-        self.rlm = RLMFeedbackAnalyzer()  # Using dspy.RLM for code-based analysis
-        self.graph_db = Neo4jClient()
-
-    def get_model(self):
-        import torch
-        from sentence_transformers import SentenceTransformer
-        if not hasattr(self, '_model'):
-            print("⏳ Loading embedding model into memory...")
-            torch.set_num_threads(1) # Limit CPU threads to avoid OOM
-            self._model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-        return self._model
-
-    def ingest(self, feedback_items: List[NormalizedFeedback]):
-        # 1. Chunking
-        documents = self.chunker.chunk_feedback(feedback_items)
+        self.vector_db = get_vector_db()  # Shared with the agent tools
+        self.rlm = get_rlm_analyzer()  # dspy.RLM code-based analysis, shared with the global aggregation
+        self.graph_db = get_graph_db()
+        self.embedder = get_embedding_service()  # Shared, micro-batching model (one copy per process)
+        self.theme_reports = get_theme_report_store()  # Materialized global report, invalidated by new summaries
+        self.answer_cache = get_answer_cache()  # Cached /chat answers, invalidated by new feedback
+        # Runs independent ingest stages (chunk storage, summary storage, graph writes) side by side
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ingest-stage")
+
+    @traced("ingest.batch")
+    def ingest(
+        self,
+        feedback_items: List[NormalizedFeedback],
+        on_stage: Optional[Callable[..., None]] = None,
+        graph_buffer: Optional[GraphWriteBuffer] = None,
+    ):
+        """
+        Runs the full pipeline for one batch as overlapping stages:
+
+            chunking ─┬─> embedding -> upsert                  (raw chunks)
+                      └─> rlm_analysis ─┬─> summary_storage    (embed + upsert summary)
+                                        └─> graph_storage
+
+        Raw chunks don't depend on the RLM result, so they are embedded and stored
+        while the LLM is still working; wall-clock time approaches the slowest
+        branch instead of the sum of all stages.
+
+        `on_stage(stage, status, **info)` is called as each stage starts and finishes
+        (possibly from worker threads) so background jobs can report progress.
+        Per-stage durations are returned under "timings". Bulk callers can pass a
+        `graph_buffer` so graph writes from many batches share transactions.
+        """
+        report = on_stage or (lambda stage, status, **info: None)
+        timings: Dict[str, float] = {}
+
+        def run_stage(stage, fn, describe=None):
+            """Runs fn() as a named stage; describe(result) adds progress details."""
+            report(stage, "running")
+            started = time.perf_counter()
+            try:
+                with span(f"ingest.{stage}"):
+                    result = fn()
+                details = describe(result) if describe else {}
+            except Exception as e:
+                timings[stage] = round(time.perf_counter() - started, 3)
+                report(stage, "failed", error=str(e), seconds=timings[stage])
+                raise
+            timings[stage] = round(time.perf_counter() - started, 3)
+            # A write that only reached a buffer is not done yet
+            report(stage, "buffered" if details.get("buffered") else "completed", seconds=timings[stage], **details)
+            return result
+
+        pipeline_started = time.perf_counter()
+
+        # 1. Chunking (feedback that is already stored and analyzed is skipped entirely)
+        feedback_items, skipped = self.drop_existing(feedback_items, analyzed=True)
+        documents = run_stage(
+            "chunking",
+            lambda: self.chunker.chunk_feedback(feedback_items),
+            lambda docs: {"chunks": len(docs), "skipped_items": skipped}
+        )
         if not documents:
-            return {"chunk_count": 0}
+            return {"chunk_count": 0, "skipped_items": skipped, "timings": timings}
             
         print(f"Split {len(feedback_items)} feedback items into {len(documents)} chunks.")
 
-        
-        # 2. RLM Analysis (Layer 3) - NEW APPROACH
+        # 2a. Raw chunks: embed + upsert, in the background
+        def store_chunks():
+            texts = [doc.page_content for doc in documents]
+            embeddings = run_stage("embedding", lambda: self.embedder.encode(texts).tolist(), lambda v: {"vectors": len(v)})
+            run_stage(
+                "upsert",
+                lambda: self.vector_db.upsert_documents(documents, embeddings),
+                lambda stats: {k: stats[k] for k in ("points", "batches", "retries", "points_per_sec")}
+            )
+
+        chunk_future = self.executor.submit(in_current_context(store_chunks))
+
+        # 2b. RLM Analysis (Layer 3), concurrently with 2a
         print(f"🧠 RLM analyzing {len(feedback_items)} feedback items...")
-        
-        # Prepare feedback data for RLM
         feedback_data = [
             {
                 'content': item.content,
@@ -46,73 +108,190 @@ class IngestionService:
             }
             for item in feedback_items
         ]
-        
+
+        rlm_analysis = {}
+        summary_documents = []
+        entities = []
         try:
             # RLM will write Python code to hierarchically analyze feedback
-            rlm_analysis = self.rlm.analyze(feedback_data)
-            
+            rlm_analysis = run_stage(
+                "rlm_analysis",
+                lambda: self._as_analysis(self.rlm.analyze(feedback_data)),
+                lambda analysis: {"themes": len(analysis.get('themes', []))}
+            )
+
             print(f"✅ RLM Analysis Complete:")
             print(f"   Themes: {rlm_analysis.get('themes', [])}")
             print(f"   Critical Issues: {rlm_analysis.get('critical_issues', [])}")
-            
-            # Create a single hierarchical summary document
-            hierarchical_summary = rlm_analysis.get('hierarchical_summary', '')
-            if hierarchical_summary:
-                summary_doc = Document(
-                    page_content=hierarchical_summary,
-                    metadata={
-                        'type': 'rlm_summary',
-                        'level': 'hierarchical',
-                        'total_items': len(feedback_items),
-                        'themes': rlm_analysis.get('themes', []),
-                        'critical_issues': rlm_analysis.get('critical_issues', []),
-                        'sentiment': rlm_analysis.get('sentiment', 'unknown')
-                    }
-                )
-                summary_documents = [summary_doc]
-                
-                # --- LAYER 4: GRAPH STORAGE ---
-                # Extract entities from RLM analysis
-                print(f"🕸️ Storing RLM insights in graph...")
-                entities = [
-                    {'name': theme, 'type': 'Theme', 'sentiment': 'neutral'}
-                    for theme in rlm_analysis.get('themes', [])
-                ] + [
-                    {'name': issue, 'type': 'Issue', 'sentiment': 'negative'}
-                    for issue in rlm_analysis.get('critical_issues', [])
-                ]
-                
-                if entities:
-                    self.graph_db.store_summary_intelligence(
-                        hierarchical_summary,
-                        summary_doc.metadata,
-                        entities
-                    )
-                # ------------------------------
-        
         except Exception as e:
             print(f"❌ RLM analysis failed: {e}")
             print("   Falling back to no summarization...")
-            summary_documents = []
 
-        # 3. Embedding & Storage (Mix of Raw Chunks + Summaries)
-        all_docs = documents + summary_documents
-        print(f"Upserting {len(documents)} chunks + {len(summary_documents)} summaries...")
-        
-        texts = [doc.page_content for doc in all_docs]
-        embeddings = self.get_model().encode(texts).tolist()
+        # 3. Summary storage + graph storage, once RLM is done
+        hierarchical_summary = rlm_analysis.get('hierarchical_summary', '')
+        follow_ups = []
+        first_chunk_ids = [doc.id for doc in documents if doc.metadata.get('chunk_index') == 0]
+
+        def mark_analyzed():
+            # Replays skip these items only from now on; until then they are analyzed again
+            try:
+                chunk_future.result()  # A buffer flush can fire this before the chunks are stored
+                self.vector_db.mark_analyzed(first_chunk_ids)
+            except Exception as e:
+                print(f"⚠️ Could not mark {len(first_chunk_ids)} items as analyzed: {e}")
+
+        def on_graph_flushed():
+            mark_analyzed()
+            self.answer_cache.invalidate()  # Answers cached before the flush lack these graph entities
 
-        self.vector_db.upsert_documents(all_docs, embeddings)
+        mark_after_graph_flush = False
+        if hierarchical_summary:
+            summary_id = summary_point_id(doc.metadata['parent_id'] for doc in documents)
+            summary_doc = Document(
+                id=summary_id,
+                page_content=hierarchical_summary,
+                metadata={
+                    'type': 'rlm_summary',
+                    'summary_id': summary_id,
+                    'level': 'hierarchical',
+                    'total_items': len(feedback_items),
+                    'themes': rlm_analysis.get('themes', []),
+                    'critical_issues': rlm_analysis.get('critical_issues', []),
+                    'sentiment': rlm_analysis.get('sentiment', 'unknown')
+                }
+            )
+            summary_documents = [summary_doc]
+
+            def store_summary():
+                vector = self.embedder.encode([hierarchical_summary]).tolist()
+                self.vector_db.upsert_documents(summary_documents, vector)
+                self.theme_reports.mark_dirty()  # Global report is now out of date
+
+            follow_ups.append(self.executor.submit(in_current_context(run_stage), "summary_storage", store_summary, lambda _: {"points": 1}))
+
+            # --- LAYER 4: GRAPH STORAGE ---
+            # Extract entities from RLM analysis
+            entities = [
+                {'name': theme, 'type': 'Theme', 'sentiment': 'neutral'}
+                for theme in rlm_analysis.get('themes', [])
+            ] + [
+                {'name': issue, 'type': 'Issue', 'sentiment': 'negative'}
+                for issue in rlm_analysis.get('critical_issues', [])
+            ]
+
+            if entities:
+                print(f"🕸️ Storing RLM insights in graph...")
+                if graph_buffer:
+                    # Buffered summaries reach Neo4j later; the items count as analyzed only then
+                    mark_after_graph_flush = True
+                    store_graph = lambda: graph_buffer.add(
+                        hierarchical_summary, summary_doc.metadata, entities, on_written=on_graph_flushed
+                    )
+                else:
+                    store_graph = lambda: self.graph_db.store_summary_intelligence(
+                        hierarchical_summary, summary_doc.metadata, entities
+                    )
+                follow_ups.append(self.executor.submit(
+                    in_current_context(run_stage),
+                    "graph_storage",
+                    store_graph,
+                    # GraphWriteBuffer.add returns False while the summary waits for a flush
+                    lambda written: {"entities": len(entities), "buffered": written is False}
+                ))
+            # ------------------------------
+
+        # Raw chunk storage must succeed; summary/graph failures are reported but not fatal
+        chunk_future.result()
+        follow_ups_ok = True
+        for future in follow_ups:
+            try:
+                future.result()
+            except Exception as e:
+                follow_ups_ok = False
+                print(f"❌ Post-RLM storage failed: {e}")
+        # Only now do chunks, summary and graph entities all reflect this batch
+        self.answer_cache.invalidate()  # Cached chat answers no longer reflect all feedback
+        if hierarchical_summary and follow_ups_ok and not mark_after_graph_flush:
+            mark_analyzed()
+
+        timings["total"] = round(time.perf_counter() - pipeline_started, 3)
+        print(f"⏱️ Ingest timings (s): {timings}")
         
         return {
             "chunk_count": len(documents),
+            "skipped_items": skipped,
             "summary_count": len(summary_documents),
-            "themes": rlm_analysis.get('themes', []) if 'rlm_analysis' in locals() else [],
-            "critical_issues": rlm_analysis.get('critical_issues', []) if 'rlm_analysis' in locals() else [],
-            "hierarchical_summary": rlm_analysis.get('hierarchical_summary', '') if 'rlm_analysis' in locals() else "",
-            "entities_count": len(entities) if 'entities' in locals() else 0
+            "themes": rlm_analysis.get('themes', []),
+            "critical_issues": rlm_analysis.get('critical_issues', []),
+            "hierarchical_summary": hierarchical_summary,
+            "entities_count": len(entities),
+            "timings": timings
         }
 
-    def search(self, query: str, limit: int = 5):
-        query_vector = self.get_model().encode([query])[0].tolist()
-        return self.vector_db.search(query_vector, limit)
+    @staticmethod
+    def _as_analysis(analysis) -> Dict:
+        # dspy may hand back the analysis as free text instead of a dict
+        return analysis if isinstance(analysis, dict) else {'hierarchical_summary': str(analysis or '')}
+
+    @traced("ingest.raw")
+    def ingest_raw(self, feedback_items: List[NormalizedFeedback]):
+        """
+        Chunk -> Embed -> Upsert only, without RLM analysis or graph writes.
+        Used by the streaming bulk endpoint, which calls it once per window.
+        """
+        feedback_items, skipped = self.drop_existing(feedback_items)
+        documents = self.chunker.chunk_feedback(feedback_items)
+        if not documents:
+            return {"chunk_count": 0, "skipped_items": skipped}
+
+        texts = [doc.page_content for doc in documents]
+        embeddings = self.embedder.encode(texts).tolist()
+        write_stats = self.vector_db.upsert_documents(documents, embeddings)
+        self.answer_cache.invalidate()
+        print(f"Upserted {write_stats['points']} points in {write_stats['batches']} batches ({write_stats['points_per_sec']} points/sec).")
+        return {"chunk_count": len(documents), "skipped_items": skipped}
+
+    def drop_existing(self, feedback_items: List[NormalizedFeedback], analyzed: bool = False):
+        """
+        Removes feedback whose chunks are already in the vector store (and duplicates
+        within the batch). Chunk IDs are content-addressed, so a replayed import only
+        pays for a single point lookup per item.
+
+        With analyzed=True (full ingest), an item is only skipped once its summary
+        and graph rows were written too, so replaying a batch whose RLM, summary or
+        graph stage failed analyzes it again instead of dropping it.
+
+        Returns (new_items, skipped_count).
+        """
+        by_parent = {}
+        for item in feedback_items:
+            by_parent.setdefault(item_parent_id(item), item)
+
+        first_chunk_ids = {chunk_point_id(parent_id, 0): parent_id for parent_id in by_parent}
+        existing = self.vector_db.existing_ids(list(first_chunk_ids), analyzed=analyzed)
+        for point_id in existing:
+            by_parent.pop(first_chunk_ids[point_id], None)
+
+        new_items = list(by_parent.values())
+        skipped = len(feedback_items) - len(new_items)
+        if skipped:
+            print(f"⏭️ Skipping {skipped} feedback items that are already stored.")
+        return new_items, skipped
+
+    def search(self, query: str, limit: int = 5, **filters):
+        query_vector = self.embedder.encode([query])[0].tolist()
+        return self.vector_db.search(query_vector, limit, filters=filters or None)
+
+
+_ingestion_service: Optional[IngestionService] = None
+_ingestion_service_lock = threading.Lock()
+
+
+def get_ingestion_service() -> IngestionService:
+    """Returns the process-wide IngestionService, creating it (and its RLM) on first use."""
+    global _ingestion_service
+    if _ingestion_service is None:
+        with _ingestion_service_lock:
+            if _ingestion_service is None:
+                _ingestion_service = IngestionService()
+    return _ingestion_service
@@ -0,0 +1,213 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import traceback
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.api.schemas import NormalizedFeedback
+from app.telemetry import span
+
+INGEST_STAGES = ["chunking", "embedding", "upsert", "rlm_analysis", "summary_storage", "graph_storage"]
+
+
+class JobQueueFullError(Exception):
+    """Raised when the ingestion queue already holds its maximum number of pending jobs."""
+
+
+class IngestJobQueue:
+    """
+    Background job queue for /ingest.
+
+    Jobs are persisted in SQLite so that queued (or interrupted) batches are picked
+    up again after a restart. A small pool of worker threads drains the queue and
+    records per-stage progress reported by the ingest function.
+    """
+
+    def __init__(
+        self,
+        ingest_fn: Callable[..., Dict[str, Any]],
+        db_path: Optional[str] = None,
+        num_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.ingest_fn = ingest_fn
+        self.db_path = db_path or os.getenv("INGEST_JOBS_DB", "ingest_jobs.db")
+        self.num_workers = num_workers if num_workers is not None else int(os.getenv("INGEST_WORKERS", "1"))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("INGEST_QUEUE_MAX", "100"))
+        self.retain_finished = int(os.getenv("INGEST_JOBS_RETAIN", "500"))
+
+        self._lock = threading.Lock()
+        self._pending: "queue.Queue[str]" = queue.Queue()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+        self._requeue_unfinished()
+
+        self._workers = []
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"ingest-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    # ------------------------------------------------------------------
+    # Store
+    # ------------------------------------------------------------------
+
+    def _create_tables(self):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingest_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    item_count INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def _requeue_unfinished(self):
+        """Jobs left 'running' by a crash are restarted from scratch."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = 'queued', stages = ?, updated_at = ? WHERE status = 'running'",
+                (json.dumps(self._initial_stages()), now),
+            )
+            rows = self._conn.execute(
+                "SELECT id FROM ingest_jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        for row in rows:
+            self._pending.put(row["id"])
+        if rows:
+            print(f"🔁 Re-queued {len(rows)} unfinished ingest jobs.")
+
+    @staticmethod
+    def _initial_stages() -> Dict[str, Dict[str, Any]]:
+        return {stage: {"status": "pending"} for stage in INGEST_STAGES}
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = datetime.now().isoformat()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE ingest_jobs SET {columns} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def _load(self, job_id: str) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute("SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def _prune_finished(self):
+        """Keeps only the most recent `retain_finished` completed/failed jobs."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                DELETE FROM ingest_jobs WHERE status IN ('completed', 'failed') AND id NOT IN (
+                    SELECT id FROM ingest_jobs WHERE status IN ('completed', 'failed')
+                    ORDER BY updated_at DESC LIMIT ?
+                )
+                """,
+                (self.retain_finished,),
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS n FROM ingest_jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()
+        return row["n"]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, items: List[NormalizedFeedback]) -> str:
+        """Persists a batch and schedules it. Returns the job ID."""
+        if self.pending_count() >= self.max_pending:
+            raise JobQueueFullError(f"Ingestion queue is full ({self.max_pending} pending jobs).")
+
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        payload = json.dumps([item.model_dump(mode="json") for item in items])
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO ingest_jobs (id, status, payload, stages, item_count, created_at, updated_at)
+                VALUES (?, 'queued', ?, ?, ?, ?, ?)
+                """,
+                (job_id, payload, json.dumps(self._initial_stages()), len(items), now, now),
+            )
+        self._pending.put(job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the public view of a job (without its payload), or None."""
+        row = self._load(job_id)
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "item_count": row["item_count"],
+            "stages": json.loads(row["stages"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._pending.get()
+            try:
+                self._run_job(job_id)
+            finally:
+                self._pending.task_done()
+
+    def _run_job(self, job_id: str):
+        row = self._load(job_id)
+        if row is None or row["status"] != "queued":
+            return
+
+        stages = json.loads(row["stages"])
+        stages_lock = threading.Lock()  # Ingest stages report from several threads at once
+        self._update(job_id, status="running")
+
+        def on_stage(stage: str, status: str, **info):
+            with stages_lock:
+                entry = stages.setdefault(stage, {})
+                entry["status"] = status
+                entry[f"{status}_at"] = datetime.now().isoformat()
+                entry.update(info)
+                self._update(job_id, stages=json.dumps(stages))
+
+        with span("ingest.job", job_id=job_id) as current:
+            try:
+                items = [NormalizedFeedback(**item) for item in json.loads(row["payload"])]
+                print(f"⚙️ Ingest job {job_id} started ({len(items)} items).")
+                result = self.ingest_fn(items, on_stage=on_stage)
+                if isinstance(result, dict):
+                    result = {**result, "trace_id": current.trace_id}
+                # The payload is no longer needed once the batch is stored
+                self._update(job_id, status="completed", payload="[]", result=json.dumps(result, default=str))
+                print(f"✅ Ingest job {job_id} completed.")
+            except Exception as e:
+                print(f"❌ Ingest job {job_id} failed: {e}")
+                traceback.print_exc()
+                self._update(job_id, status="failed", error=str(e))
+        self._prune_finished()
@@ -0,0 +1,481 @@
+import asyncio
+import heapq
+import itertools
+import json
+import operator
+import os
+import random
+import re
+import threading
+import time
+from functools import reduce
+from typing import Any, Callable, Dict, Optional
+
+import dspy
+from langchain_core.messages import AIMessageChunk, message_to_dict, messages_from_dict
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_groq import ChatGroq
+
+from app.processing.completion_cache import completion_key, get_completion_cache
+from app.telemetry import LLM_QUEUE_SECONDS, LLM_RETRIES, span
+
+# Lower number = served first. Chat requests overtake queued ingest/aggregation work.
+LANES = {"interactive": 0, "batch": 1}
+
+_RETRY_IN_PATTERN = re.compile(r"try again in (?:(\d+)m)?([\d.]+)(ms|s)", re.IGNORECASE)
+
+
+def estimate_tokens(text: str, max_output_tokens: Optional[int] = None) -> int:
+    """Rough request cost: ~4 characters per prompt token plus the output budget."""
+    output = max_output_tokens or int(os.getenv("LLM_GATEWAY_OUTPUT_TOKENS", "512"))
+    return len(text) // 4 + output
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Server-requested delay from a rate-limit error, if it carries one."""
+    hint = getattr(exc, "retry_after", None)
+    if isinstance(hint, (int, float)):
+        return float(hint)
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after") is not None:
+            return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        pass
+    # Groq puts the delay in the message: "Please try again in 1m2.5s"
+    match = _RETRY_IN_PATTERN.search(str(exc))
+    if match:
+        minutes, seconds, unit = match.groups()
+        seconds = float(seconds) / (1000 if unit.lower() == "ms" else 1)
+        return 60 * int(minutes or 0) + seconds
+    return None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    message = str(exc)
+    return status == 429 or "429" in message or "Rate limit" in message or "rate_limit" in message
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return (
+        is_rate_limit_error(exc)
+        or (isinstance(status, int) and status >= 500)
+        or isinstance(exc, (ConnectionError, TimeoutError))
+        or type(exc).__name__ in ("APIConnectionError", "APITimeoutError", "ServiceUnavailableError", "InternalServerError")
+    )
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute / 60` units per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+
+class LLMGateway:
+    """
+    Process-wide scheduler for Groq calls (LangChain agent, dspy RLM, dspy Predict).
+
+    Every call needs one request from a requests-per-minute bucket and its
+    estimated tokens from a tokens-per-minute bucket. Waiting callers are served
+    in priority order: all "interactive" calls before any "batch" call, FIFO
+    within a lane. Rate-limit and transient errors are retried with jittered
+    exponential backoff. A server-sent Retry-After pauses the whole gateway, so
+    other queued callers wait too instead of also being rejected.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.requests = _Bucket(requests_per_minute or float(os.getenv("LLM_GATEWAY_RPM", "30")))
+        self.tokens = _Bucket(tokens_per_minute or float(os.getenv("LLM_GATEWAY_TPM", "6000")))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_GATEWAY_RETRIES", "5"))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._waiting: list = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._metrics = {
+            lane: {"calls": 0, "throttled": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+                   "retries": 0, "rate_limited": 0, "failures": 0}
+            for lane in LANES
+        }
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _try_admit(self, ticket, tokens: float) -> float:
+        """With the lock held: takes capacity for `ticket` and returns 0, or returns seconds to wait."""
+        now = time.monotonic()
+        if self._waiting[0] != ticket:
+            return 0.05  # Someone with higher priority (or who queued earlier) goes first
+        if now < self._paused_until:
+            return self._paused_until - now
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.requests.wait_for(1), self.tokens.wait_for(tokens))
+        if wait > 0:
+            return wait
+        self.requests.level -= 1
+        self.tokens.level -= min(tokens, self.tokens.capacity)
+        heapq.heappop(self._waiting)
+        self._changed.notify_all()
+        return 0.0
+
+    def _enqueue(self, lane: str):
+        ticket = (LANES[lane], next(self._seq))
+        heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _admitted(self, lane: str, waited: float):
+        metrics = self._metrics[lane]
+        metrics["calls"] += 1
+        metrics["wait_seconds"] += waited
+        metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+        if waited > 0.01:
+            metrics["throttled"] += 1
+        LLM_QUEUE_SECONDS.observe(waited, lane=lane)
+
+    def acquire(self, lane: str = "batch", tokens: float = 0):
+        """Blocks until the call may be sent."""
+        started = time.monotonic()
+        with self._lock:
+            ticket = self._enqueue(lane)
+            try:
+                while (wait := self._try_admit(ticket, tokens)) > 0:
+                    self._changed.wait(timeout=wait)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._changed.notify_all()
+                raise
+            self._admitted(lane, time.monotonic() - started)
+
+    async def aacquire(self, lane: str = "batch", tokens: float = 0):
+        """Awaits until the call may be sent, without blocking the event loop."""
+        started = time.monotonic()
+        with self._lock:
+            ticket = self._enqueue(lane)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_admit(ticket, tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, 0.25))
+        except BaseException:
+            with self._lock:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._changed.notify_all()
+            raise
+        with self._lock:
+            self._admitted(lane, time.monotonic() - started)
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def _backoff(self, lane: str, exc: BaseException, attempt: int) -> Optional[float]:
+        """Returns the retry delay for `exc`, or None if it should be raised."""
+        if attempt >= self.max_retries or not is_transient_error(exc):
+            with self._lock:
+                self._metrics[lane]["failures"] += 1
+            return None
+        hint = retry_after_seconds(exc)
+        delay = hint if hint is not None else random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        LLM_RETRIES.inc(lane=lane, reason="rate_limit" if is_rate_limit_error(exc) else "transient")
+        with self._lock:
+            self._metrics[lane]["retries"] += 1
+            if is_rate_limit_error(exc):
+                self._metrics[lane]["rate_limited"] += 1
+                # The quota is shared: hold every queued caller back, not just this one
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._changed.notify_all()
+        print(f"⏳ LLM gateway: {type(exc).__name__} ({lane}), retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+        return delay
+
+    def call(self, fn: Callable[[], Any], lane: str = "batch", tokens: float = 0) -> Any:
+        attempt = 0
+        with span("llm.call", lane=lane) as current:
+            while True:
+                self.acquire(lane, tokens)
+                try:
+                    return fn()
+                except Exception as e:
+                    delay = self._backoff(lane, e, attempt)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    current.set_attribute("retries", attempt)
+
+    async def acall(self, fn: Callable[[], Any], lane: str = "batch", tokens: float = 0) -> Any:
+        """`fn` returns an awaitable."""
+        attempt = 0
+        with span("llm.call", lane=lane) as current:
+            while True:
+                await self.aacquire(lane, tokens)
+                try:
+                    return await fn()
+                except Exception as e:
+                    delay = self._backoff(lane, e, attempt)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    current.set_attribute("retries", attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            lanes = {lane: dict(metrics) for lane, metrics in self._metrics.items()}
+            queued = len(self._waiting)
+            paused = max(0.0, self._paused_until - now)
+        for metrics in lanes.values():
+            metrics["avg_wait_seconds"] = metrics["wait_seconds"] / metrics["calls"] if metrics["calls"] else 0.0
+        return {
+            "lanes": lanes,
+            "queued": queued,
+            "paused_seconds": round(paused, 2),
+            "requests_available": round(self.requests.level, 1),
+            "tokens_available": round(self.tokens.level, 1),
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+        }
+
+
+_llm_gateway: Optional[LLMGateway] = None
+_llm_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Returns the process-wide LLMGateway, creating it on first use."""
+    global _llm_gateway
+    if _llm_gateway is None:
+        with _llm_gateway_lock:
+            if _llm_gateway is None:
+                _llm_gateway = LLMGateway()
+    return _llm_gateway
+
+
+# ----------------------------------------------------------------------
+# Client adapters
+# ----------------------------------------------------------------------
+# Both adapters consult the completion cache before asking the gateway for
+# capacity, so cache hits (and strict replays) never touch the Groq quota.
+
+def _canonical_messages(messages) -> list:
+    """Message fields that determine a completion (no run IDs, timings or usage)."""
+    return [
+        {
+            "type": m.type,
+            "content": m.content,
+            "name": getattr(m, "name", None),
+            "tool_calls": [
+                {"name": c["name"], "args": c["args"], "id": c.get("id")} for c in getattr(m, "tool_calls", None) or []
+            ],
+            "tool_call_id": getattr(m, "tool_call_id", None),
+        }
+        for m in messages
+    ]
+
+
+class GatewayLM(dspy.LM):
+    """dspy.LM whose calls (RLM steps, Predict modules) go through the completion cache and LLM gateway."""
+
+    def __init__(self, model: str, lane: str = "batch", **kwargs):
+        kwargs.setdefault("num_retries", 0)  # The gateway owns retries
+        if get_completion_cache().enabled:
+            kwargs.setdefault("cache", False)  # One cache layer, shared with ChatGroq
+        super().__init__(model, **kwargs)
+        self.lane = lane
+
+    def _tokens(self, prompt, messages) -> int:
+        return estimate_tokens(str(messages or prompt or ""), self.kwargs.get("max_tokens"))
+
+    def _cache_key(self, prompt, messages, kwargs) -> str:
+        params = {k: v for k, v in {**self.kwargs, **kwargs}.items() if k != "api_key"}
+        return completion_key("dspy", {"model": self.model, "prompt": prompt, "messages": messages, "params": params})
+
+    def __call__(self, prompt=None, *, messages=None, **kwargs):
+        cache = get_completion_cache()
+        key = self._cache_key(prompt, messages, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        outputs = get_llm_gateway().call(
+            lambda: super(GatewayLM, self).__call__(prompt, messages=messages, **kwargs),
+            lane=self.lane, tokens=self._tokens(prompt, messages)
+        )
+        cache.put(key, "dspy", outputs)
+        return outputs
+
+    async def acall(self, prompt=None, *, messages=None, **kwargs):
+        cache = get_completion_cache()
+        key = self._cache_key(prompt, messages, kwargs)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+        outputs = await get_llm_gateway().acall(
+            lambda: super(GatewayLM, self).acall(prompt, messages=messages, **kwargs),
+            lane=self.lane, tokens=self._tokens(prompt, messages)
+        )
+        await asyncio.to_thread(cache.put, key, "dspy", outputs)
+        return outputs
+
+
+class GatewayChatGroq(ChatGroq):
+    """ChatGroq whose requests are cached, admitted, prioritized and retried by the LLM gateway."""
+
+    lane: str = "interactive"
+
+    def _tokens(self, messages) -> int:
+        return estimate_tokens("".join(str(m.content) for m in messages), self.max_tokens)
+
+    def _cache_key(self, messages, stop, kwargs) -> str:
+        return completion_key("groq-chat", {
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "messages": _canonical_messages(messages),
+            "stop": stop,
+            "params": kwargs,  # Bound tools and tool_choice arrive here
+        })
+
+    @staticmethod
+    def _encode(message, llm_output=None) -> dict:
+        return {"message": message_to_dict(message), "llm_output": llm_output}
+
+    @staticmethod
+    def _decode_result(cached) -> ChatResult:
+        message = messages_from_dict([cached["message"]])[0]
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=cached.get("llm_output"))
+
+    @staticmethod
+    def _cached_chunk(cached) -> ChatGenerationChunk:
+        """The whole cached answer as one stream chunk."""
+        message = messages_from_dict([cached["message"]])[0]
+        return ChatGenerationChunk(message=AIMessageChunk(
+            content=message.content,
+            id=message.id,
+            response_metadata=message.response_metadata,
+            tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c.get("id"), "index": i}
+                for i, c in enumerate(getattr(message, "tool_calls", None) or [])
+            ],
+        ))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        cache = get_completion_cache()
+        key = self._cache_key(messages, stop, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            return self._decode_result(cached)
+        result = get_llm_gateway().call(
+            lambda: super(GatewayChatGroq, self)._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            lane=self.lane, tokens=self._tokens(messages)
+        )
+        cache.put(key, "groq-chat", self._encode(result.generations[0].message, result.llm_output))
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        cache = get_completion_cache()
+        key = self._cache_key(messages, stop, kwargs)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return self._decode_result(cached)
+        result = await get_llm_gateway().acall(
+            lambda: super(GatewayChatGroq, self)._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            lane=self.lane, tokens=self._tokens(messages)
+        )
+        await asyncio.to_thread(cache.put, key, "groq-chat", self._encode(result.generations[0].message, result.llm_output))
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        cache = get_completion_cache()
+        key = self._cache_key(messages, stop, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            chunk = self._cached_chunk(cached)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+
+        # Only the opening of the stream is retried; a failure mid-answer propagates
+        stream = get_llm_gateway().call(
+            lambda: self._open_stream(super(GatewayChatGroq, self)._stream(messages, stop=stop, run_manager=run_manager, **kwargs)),
+            lane=self.lane, tokens=self._tokens(messages)
+        )
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            cache.put(key, "groq-chat", self._encode(message_chunk_to_message(reduce(operator.add, chunks).message)))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        cache = get_completion_cache()
+        key = self._cache_key(messages, stop, kwargs)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            chunk = self._cached_chunk(cached)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+            return
+
+        async def open_stream():
+            stream = super(GatewayChatGroq, self)._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            try:
+                return await stream.__anext__(), stream
+            except StopAsyncIteration:
+                return None, None
+
+        first, stream = await get_llm_gateway().acall(open_stream, lane=self.lane, tokens=self._tokens(messages))
+        if stream is None:
+            return
+        chunks = [first]
+        yield first
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        message = message_chunk_to_message(reduce(operator.add, chunks).message)
+        await asyncio.to_thread(cache.put, key, "groq-chat", self._encode(message))
+
+    @staticmethod
+    def _open_stream(stream):
+        """Pulls the first chunk so connection/429 errors surface inside the retry loop."""
+        try:
+            first = next(stream)
+        except StopIteration:
+            return iter(())
+        return itertools.chain([first], stream)
@@ -0,0 +1,112 @@
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+
+# Pre-exported ONNX graph that sentence-transformers publishes next to the PyTorch weights
+ONNX_MODEL_FILE = "onnx/model.onnx"
+
+# Where dynamically quantized copies are written (they are built once per model)
+ONNX_CACHE_DIR = os.getenv("EMBED_ONNX_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ai-engine", "onnx"))
+
+
+def hub_repo(model_name: str) -> str:
+    """'all-MiniLM-L6-v2' -> 'sentence-transformers/all-MiniLM-L6-v2' (full repo IDs pass through)."""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def model_file(model_name: str, filename: str) -> str:
+    """Path of `filename` in a local model directory, or downloaded from the hub repo."""
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, filename)
+    from huggingface_hub import hf_hub_download
+    return hf_hub_download(hub_repo(model_name), filename)
+
+
+def quantize_int8(fp32_path: str, model_name: str) -> str:
+    """
+    Dynamic int8 quantization of the fp32 export: weights are stored as int8 and
+    activations are quantized on the fly, so no calibration data is needed.
+    Returns the path of the (cached) quantized model.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"), "model_int8_dynamic.onnx")
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        print(f"⚙️ Quantizing {fp32_path} to int8 -> {target}")
+        partial = target + ".tmp"
+        quantize_dynamic(fp32_path, partial, weight_type=QuantType.QInt8)
+        os.replace(partial, target)  # Concurrent workers never load a half-written file
+    return target
+
+
+class OnnxSentenceEncoder:
+    """
+    SentenceTransformer stand-in that runs the model's ONNX export on ONNX Runtime.
+
+    Reproduces the all-MiniLM-L6-v2 pipeline (tokenize -> transformer -> mean
+    pooling over the attention mask -> L2 normalize) with only onnxruntime,
+    tokenizers and huggingface_hub, so the torch wheel is not needed at runtime.
+    `quantize=True` runs a dynamic int8 copy of the graph instead of fp32.
+    `model_name` may also be a local directory laid out like the hub repo.
+    """
+
+    def __init__(self, model_name: str, quantize: bool = False, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = model_file(model_name, ONNX_MODEL_FILE)
+        if quantize:
+            model_path = quantize_int8(model_path, hub_repo(model_name))
+
+        self.max_seq_length = self._max_seq_length(model_name)
+        self.tokenizer = Tokenizer.from_file(model_file(model_name, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or int(os.getenv("EMBED_ONNX_THREADS", "1"))
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.model_path = model_path
+        self._dimension: Optional[int] = None
+
+    @staticmethod
+    def _max_seq_length(model_name: str) -> int:
+        try:
+            with open(model_file(model_name, "sentence_bert_config.json")) as f:
+                return int(json.load(f).get("max_seq_length", 256))
+        except Exception:
+            return 256
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        if not batches:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+        # Mean pooling over real tokens, then unit length (as the SentenceTransformer pipeline does)
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = int(self._encode_batch(["dimension probe"]).shape[1])
+        return self._dimension
@@ -1,10 +1,17 @@
 import dspy
 from dspy.predict.rlm import RLM
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
 import os
+import threading
+from itertools import islice
+
+from app.memory.vector.client import get_vector_db
+from app.processing.embedder import get_embedding_service
+from app.processing.grouping import group_embeddings
+from app.processing.llm_gateway import GatewayLM
+from app.telemetry import RLM_ITERATIONS, span
 # ========================================================================
 # DSPy Signatures for RLM
 # ========================================================================
@@ -41,21 +48,18 @@ class RLMHelperTools:
     def __init__(self):
         pass
         
-    def _get_embedding_model(self):
-        import torch
-        from sentence_transformers import SentenceTransformer
-        if not hasattr(self, '_embedding_model'):
-            print("⏳ Loading embedding model into memory (RLM_Agent)...")
-            torch.set_num_threads(1)
-            self._embedding_model = SentenceTransformer('all-MiniLM-L6-v2', device='cpu')
-        return self._embedding_model
-    
-    def group_by_similarity(self, texts: List[str], threshold: float = 0.7) -> List[List[str]]:
-        """Group similar texts using hierarchical clustering.
+    def group_by_similarity(
+        self, texts: List[str], threshold: float = 0.7, embeddings: Optional[Any] = None
+    ) -> List[List[str]]:
+        """Group similar texts by average-linkage clustering on cosine similarity.
         
         Args:
             texts: List of text strings to group
             threshold: Similarity threshold (0-1, higher = more similar required)
+            embeddings: Optional vectors for `texts` (row i embeds texts[i]) that
+                the caller already has; otherwise they come from the embedding
+                service, which serves texts embedded earlier (e.g. by this
+                ingest's embedding stage) from its cache without re-encoding
             
         Returns:
             List of groups, where each group is a list of similar texts
@@ -63,27 +67,31 @@ class RLMHelperTools:
         if not texts or len(texts) == 1:
             return [texts]
         
-        # Generate embeddings
-        model = self._get_embedding_model()
-        embeddings = model.encode(texts)
-        
-        # Hierarchical clustering
-        clustering = AgglomerativeClustering(
-            n_clusters=None,
-            distance_threshold=1 - threshold,
-            metric='cosine',
-            linkage='average'
-        )
-        labels = clustering.fit_predict(embeddings)
+        vectors = get_embedding_service().encode(texts) if embeddings is None else embeddings
         
-        # Group texts by cluster
-        groups = {}
-        for idx, label in enumerate(labels):
-            if label not in groups:
-                groups[label] = []
-            groups[label].append(texts[idx])
+        # Exact clustering for small inputs, streaming mini-batch grouping beyond RLM_GROUPING_EXACT_MAX
+        return [[texts[idx] for idx in group] for group in group_embeddings(vectors, threshold)]
+    
+    def group_stored_feedback(
+        self, threshold: float = 0.7, limit: Optional[int] = None, **filters
+    ) -> List[List[str]]:
+        """Group feedback already stored in vector memory, using the stored vectors.
         
-        return list(groups.values())
+        Args:
+            threshold: Similarity threshold (0-1, higher = more similar required)
+            limit: Maximum number of stored chunks to group (all matching by default)
+            **filters: Vector search filters, e.g. source='amazon', max_rating=2, since='7d'
+            
+        Returns:
+            List of groups, where each group is a list of similar texts
+        """
+        texts, vectors = [], []
+        for payload, vector in islice(get_vector_db().iter_with_vectors({"doc_type": "chunk", **filters}), limit):
+            texts.append(payload.get("content", ""))
+            vectors.append(vector)
+        if not texts:
+            return []
+        return self.group_by_similarity(texts, threshold, embeddings=np.asarray(vectors, dtype=np.float32))
     
     def extract_themes(self, texts: List[str], max_themes: int = 5) -> List[str]:
         """Extract common themes from a list of texts using keyword extraction.
@@ -153,8 +161,10 @@ class RLMFeedbackAnalyzer:
             raise ValueError("GROQ_API_KEY not found in environment")
         
         print("🚀 Initializing dspy.LM with Groq...")
-        self.lm = dspy.LM(model=f"groq/{model_name}", api_key=api_key)
-        dspy.settings.configure(lm=self.lm)
+        # Shares the Groq quota with the chat agent through the LLM gateway (batch lane).
+        # Not installed with dspy.configure: only the first thread to call it may ever call it
+        # again, and this object is built on whichever warmup/worker thread gets here first.
+        self.lm = GatewayLM(model=f"groq/{model_name}", api_key=api_key, lane="batch")
         
         # Initialize helper tools
         self.tools = RLMHelperTools()
@@ -163,7 +173,8 @@ class RLMFeedbackAnalyzer:
         print("🧠 Initializing dspy.RLM...")
         self.rlm = RLM(
             signature="feedback_items -> analysis",
-            max_iterations=10
+            max_iters=10,
+            sub_lm=self.lm
         )
     
     def analyze(self, feedback_items: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -177,19 +188,25 @@ class RLMFeedbackAnalyzer:
         """
         print(f"🔍 RLM analyzing {len(feedback_items)} feedback items...")
         
-        try:
-            # RLM will write Python code to analyze the feedback
-            result = self.rlm(feedback_items=feedback_items)
-            
-            print("✅ RLM analysis complete!")
-            print(f"📊 Trajectory: {len(result.trajectory)} steps")
-            
-            return result.analysis
-        
-        except Exception as e:
-            print(f"❌ RLM analysis failed: {e}")
-            # Fallback to simple analysis
-            return self._fallback_analysis(feedback_items)
+        with span("rlm.analyze", items=len(feedback_items)) as current:
+            try:
+                # RLM will write Python code to analyze the feedback. dspy.context works on
+                # any thread and reaches the helper Predict modules the RLM code calls.
+                with dspy.context(lm=self.lm):
+                    result = self.rlm(feedback_items=feedback_items)
+
+                print("✅ RLM analysis complete!")
+                print(f"📊 Trajectory: {len(result.trajectory)} steps")
+                current.set_attribute("iterations", len(result.trajectory))
+                RLM_ITERATIONS.observe(len(result.trajectory))
+
+                return result.analysis
+
+            except Exception as e:
+                print(f"❌ RLM analysis failed: {e}")
+                current.set_attribute("fallback", True)
+                # Fallback to simple analysis
+                return self._fallback_analysis(feedback_items)
     
     def _fallback_analysis(self, feedback_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Fallback analysis if RLM fails."""
@@ -202,3 +219,17 @@ class RLMFeedbackAnalyzer:
             'sentiment': 'mixed',
             'hierarchical_summary': f"Analysis of {len(feedback_items)} items. Top themes: {', '.join(themes[:3])}"
         }
+
+
+_rlm_analyzer: Optional[RLMFeedbackAnalyzer] = None
+_rlm_analyzer_lock = threading.Lock()
+
+
+def get_rlm_analyzer() -> RLMFeedbackAnalyzer:
+    """Returns the process-wide RLMFeedbackAnalyzer shared by ingestion and global aggregation."""
+    global _rlm_analyzer
+    if _rlm_analyzer is None:
+        with _rlm_analyzer_lock:
+            if _rlm_analyzer is None:
+                _rlm_analyzer = RLMFeedbackAnalyzer()
+    return _rlm_analyzer
@@ -0,0 +1,187 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.api.schemas import NormalizedFeedback
+
+# Columns that map onto NormalizedFeedback fields; anything else is kept as metadata.
+CORE_FIELDS = {"source", "content", "rating", "timestamp", "metadata"}
+
+# Guards against a stray quote, or a line that never ends, swallowing the rest of the upload into one record.
+MAX_RECORD_CHARS = 1_000_000
+
+
+class OversizedLine(str):
+    """Yielded by iter_lines in place of a line longer than the cap; its text was discarded."""
+
+
+async def iter_lines(byte_chunks: AsyncIterator[bytes], max_chars: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Re-assembles an async stream of byte chunks into text lines (newline included).
+    Only the current partial line is held in memory, and at most `max_chars` of it:
+    a longer line is dropped up to its newline and reported as an OversizedLine.
+    """
+    max_chars = max_chars or MAX_RECORD_CHARS
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    parts: List[str] = []  # The current partial line
+    size = 0
+    skipping = False  # Inside an oversized line, discarding until its newline
+    async for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if skipping:
+            end = text.find("\n")
+            if end < 0:
+                continue
+            text, skipping = text[end + 1:], False
+        *lines, rest = text.split("\n")
+        for line in lines:
+            parts.append(line)
+            yield "".join(parts) + "\n" if size + len(line) <= max_chars else OversizedLine()
+            parts, size = [], 0
+        parts.append(rest)
+        size += len(rest)
+        if size > max_chars:
+            yield OversizedLine()
+            parts, size, skipping = [], 0, True
+    tail = "".join(parts) + decoder.decode(b"", final=True)
+    if tail and not skipping:
+        yield tail if len(tail) <= max_chars else OversizedLine()
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yields (line_number, record, error) for each non-blank NDJSON line."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if isinstance(line, OversizedLine):
+            yield line_no, None, f"record exceeds {MAX_RECORD_CHARS} characters"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Yields (line_number, record, error) for each CSV row, using the first row as header.
+    Quoted fields may span several lines; a record is parsed once its quotes balance.
+    """
+    header: Optional[List[str]] = None
+    pending: List[str] = []  # Lines of the current record
+    pending_chars = 0
+    quotes = 0  # Quote count so far, kept incrementally instead of rescanning the record
+    line_no = 0
+    start_line = 1
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            start_line = line_no
+        if isinstance(line, OversizedLine):
+            yield start_line, None, f"record exceeds {MAX_RECORD_CHARS} characters"
+            pending, pending_chars, quotes = [], 0, 0
+            continue
+        pending.append(line)
+        pending_chars += len(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            if pending_chars > MAX_RECORD_CHARS:
+                yield start_line, None, f"record exceeds {MAX_RECORD_CHARS} characters"
+                pending, pending_chars, quotes = [], 0, 0
+            continue  # Still inside a quoted field
+
+        row = next(csv.reader(["".join(pending)]), [])
+        pending, pending_chars, quotes = [], 0, 0
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            header = [h.strip() for h in row]
+            continue
+        if len(row) != len(header):
+            yield start_line, None, f"expected {len(header)} columns, got {len(row)}"
+            continue
+        yield start_line, dict(zip(header, row)), None
+
+    if "".join(pending).strip():
+        yield start_line, None, "unterminated quoted field"
+
+
+def normalize_record(record: Dict[str, Any]) -> NormalizedFeedback:
+    """
+    Validates one uploaded row. Mirrors the JSON /ingest defaults, but keeps the
+    row's own timestamp and folds unknown columns into metadata.
+    """
+    content = (record.get("content") or "").strip()
+    if not content:
+        raise ValueError("missing 'content'")
+
+    metadata = record.get("metadata") or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata) if metadata.strip() else {}
+        except json.JSONDecodeError:
+            # Keep malformed export metadata verbatim rather than dropping the feedback
+            metadata = {"raw_metadata": metadata}
+    if not isinstance(metadata, dict):
+        raise ValueError("'metadata' must be a JSON object")
+    metadata.update({k: v for k, v in record.items() if k not in CORE_FIELDS})
+
+    rating = record.get("rating")
+    timestamp = record.get("timestamp")
+
+    return NormalizedFeedback(
+        source=record.get("source") or "stream_upload",
+        content=content,
+        rating=float(rating) if rating not in (None, "") else 3.0,
+        timestamp=timestamp or datetime.now(),
+        timestamp_inferred=not timestamp,
+        metadata=metadata,
+    )
+
+
+async def iter_feedback_windows(
+    records: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+    window_size: int,
+    stats: Dict[str, Any],
+    max_errors: int = 50,
+) -> AsyncIterator[List[NormalizedFeedback]]:
+    """
+    Groups validated rows into fixed-size windows. Row counts are tallied in
+    `stats`; rejected rows are recorded there (up to `max_errors` of them)
+    instead of aborting the upload.
+    """
+    stats.setdefault("rows_received", 0)
+    stats.setdefault("rows_accepted", 0)
+    stats.setdefault("rows_rejected", 0)
+    stats.setdefault("errors", [])
+
+    window: List[NormalizedFeedback] = []
+    async for line_no, record, error in records:
+        stats["rows_received"] += 1
+        if error is None:
+            try:
+                window.append(normalize_record(record))
+            except (ValueError, ValidationError) as e:
+                error = str(e).splitlines()[0]
+        if error is not None:
+            stats["rows_rejected"] += 1
+            if len(stats["errors"]) < max_errors:
+                stats["errors"].append({"line": line_no, "error": error})
+            continue
+        stats["rows_accepted"] += 1
+        if len(window) >= window_size:
+            yield window
+            window = []
+    if window:
+        yield window
@@ -0,0 +1,209 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+
+class ThemeReportStore:
+    """
+    Materialized Global Theme Report.
+
+    Reports are stored as numbered versions in SQLite, so reading one is a single
+    row lookup instead of a Qdrant scroll plus an RLM run. A refresh happens in the
+    background when the latest version is older than `ttl` seconds or when new
+    summaries have been ingested since it was built (`mark_dirty`). Refreshes are
+    single-flight and at least `min_interval` seconds apart, so a burst of ingests
+    costs one aggregation. After a failed build, automatic retries back off from
+    `retry_backoff` seconds, doubling per consecutive failure up to `max_backoff`.
+    """
+
+    def __init__(
+        self,
+        build_report: Optional[Callable[[], str]] = None,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        keep_versions: int = 20,
+        retry_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        self._build_report = build_report
+        self.path = path or os.getenv("THEME_REPORT_DB", "theme_reports.db")
+        self.ttl = ttl if ttl is not None else float(os.getenv("THEME_REPORT_TTL", "3600"))
+        self.min_interval = min_interval if min_interval is not None else float(os.getenv("THEME_REPORT_MIN_INTERVAL", "60"))
+        self.keep_versions = keep_versions
+        self.retry_backoff = retry_backoff if retry_backoff is not None else float(os.getenv("THEME_REPORT_RETRY_BACKOFF", "60"))
+        self.max_backoff = max_backoff if max_backoff is not None else float(os.getenv("THEME_REPORT_MAX_BACKOFF", "3600"))
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._idle = threading.Condition(self._refresh_lock)  # Notified whenever a build ends
+        self._refreshing = False
+        self._failures = 0  # Consecutive failed builds
+        self._dirty = False
+        self._last_refresh_started = 0.0
+        self._timer: Optional[threading.Timer] = None
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS theme_reports (
+                    version INTEGER PRIMARY KEY AUTOINCREMENT,
+                    report TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    build_seconds REAL NOT NULL
+                )
+                """
+            )
+
+    def build_report(self) -> str:
+        if self._build_report is None:
+            # The aggregator (Qdrant client + RLM) is only imported and created once a refresh is needed
+            from app.processing.aggregator import GlobalAggregator
+            self._build_report = GlobalAggregator().run_aggregation
+        return self._build_report()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, report, created_at, build_seconds FROM theme_reports ORDER BY version DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        version, report, created_at, build_seconds = row
+        return {
+            "version": version,
+            "report": report,
+            "created_at": created_at,
+            "age_seconds": round(time.time() - created_at, 1),
+            "build_seconds": build_seconds,
+        }
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Returns the latest report immediately, scheduling a background refresh if
+        it is missing, expired or out of date with respect to ingested summaries.
+        """
+        latest = self.latest()
+        stale = latest is None or self._dirty or latest["age_seconds"] > self.ttl
+        if stale:
+            self.refresh_in_background()
+        result = latest or {"version": None, "report": None, "created_at": None, "age_seconds": None}
+        result.update({"stale": stale, "refreshing": self._refreshing, "failed_refreshes": self._failures})
+        return result
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def mark_dirty(self):
+        """Signals that new summaries were stored; the next read triggers a refresh."""
+        self._dirty = True
+        self.refresh_in_background()
+
+    def refresh_in_background(self) -> bool:
+        """
+        Starts a refresh thread unless one is already running. If the last refresh
+        was less than `min_interval` ago (or less than the retry backoff, after a
+        failure), a single deferred refresh is scheduled.
+        """
+        with self._refresh_lock:
+            if self._refreshing:
+                return False
+            wait = self._retry_interval() - (time.time() - self._last_refresh_started)
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self._deferred_refresh)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return False
+            self._refreshing = True
+            self._last_refresh_started = time.time()
+        threading.Thread(target=self._refresh_guarded, name="theme-report-refresh", daemon=True).start()
+        return True
+
+    def _retry_interval(self) -> float:
+        if not self._failures:
+            return self.min_interval
+        backoff = min(self.retry_backoff * 2 ** (self._failures - 1), self.max_backoff)
+        return max(self.min_interval, backoff)
+
+    def _deferred_refresh(self):
+        with self._refresh_lock:
+            self._timer = None
+        if self._dirty:
+            self.refresh_in_background()
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Builds and stores a new report version synchronously. If a background build
+        is running, waits for it and returns its report instead of aggregating twice
+        (unless it failed or new summaries arrived meanwhile).
+        """
+        with self._idle:
+            joined = self._refreshing
+            failures = self._failures
+            while self._refreshing:
+                self._idle.wait()
+            if joined and self._failures <= failures and not self._dirty:
+                return self.latest()
+            self._refreshing = True
+            self._last_refresh_started = time.time()
+        return self._refresh_guarded(raise_errors=True)
+
+    def _refresh_guarded(self, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+        was_dirty = self._dirty
+        try:
+            # Summaries arriving during the build mark the report dirty again
+            self._dirty = False
+            started = time.perf_counter()
+            report = self.build_report()
+            build_seconds = round(time.perf_counter() - started, 3)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO theme_reports (report, created_at, build_seconds) VALUES (?, ?, ?)",
+                    (report, time.time(), build_seconds),
+                )
+                self._conn.execute(
+                    "DELETE FROM theme_reports WHERE version NOT IN "
+                    "(SELECT version FROM theme_reports ORDER BY version DESC LIMIT ?)",
+                    (self.keep_versions,),
+                )
+            print(f"🌍 Global theme report refreshed in {build_seconds}s.")
+            self._failures = 0
+            return self.latest()
+        except Exception as e:
+            self._dirty = self._dirty or was_dirty
+            self._failures += 1
+            print(f"❌ Global theme report refresh failed ({self._failures} in a row): {e}")
+            if raise_errors:
+                raise
+            return None
+        finally:
+            with self._idle:
+                self._refreshing = False
+                self._idle.notify_all()
+            if self._dirty:
+                # New summaries arrived mid-build (or the build failed): go again, after the backoff if it failed
+                self.refresh_in_background()
+
+
+_theme_report_store: Optional[ThemeReportStore] = None
+_theme_report_store_lock = threading.Lock()
+
+
+def get_theme_report_store() -> ThemeReportStore:
+    """Returns the process-wide ThemeReportStore, creating it on first use."""
+    global _theme_report_store
+    if _theme_report_store is None:
+        with _theme_report_store_lock:
+            if _theme_report_store is None:
+                _theme_report_store = ThemeReportStore()
+    return _theme_report_store
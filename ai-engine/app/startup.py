@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+# Warm every component in the background as soon as the server starts (set STARTUP_WARMUP=0 to load on first use)
+WARMUP_ON_STARTUP = os.getenv("STARTUP_WARMUP", "1") != "0"
+
+# Components that must be warm before /health/ready reports ready; the rest only degrade features
+REQUIRED_COMPONENTS = [
+    name.strip() for name in os.getenv("READINESS_REQUIRED", "vector_db,embedding_model,agent").split(",") if name.strip()
+]
+
+# Failed components are retried in the background, waiting this long (doubling per failure, up to the max)
+WARMUP_RETRY_BACKOFF = float(os.getenv("WARMUP_RETRY_BACKOFF", "2"))
+WARMUP_MAX_BACKOFF = float(os.getenv("WARMUP_MAX_BACKOFF", "60"))
+
+PROCESS_STARTED = time.monotonic()
+
+
+# Loaders import their modules on first call, so importing app.main stays cheap
+# and the heavy imports (torch, dspy, LangGraph, Qdrant) overlap on warmup threads.
+
+def _load_vector_db():
+    from app.memory.vector.client import get_vector_db
+    return get_vector_db()
+
+
+def _load_graph_db():
+    from app.memory.graph.client import get_graph_db
+    return get_graph_db()
+
+
+def _load_embedding_model():
+    from app.processing.embedder import get_embedding_service
+    return get_embedding_service().warmup()
+
+
+def _load_agent():
+    from app.orchestration.graph import app as agent_app
+    return agent_app
+
+
+def _load_ingestion():
+    from app.processing.ingestor import get_ingestion_service
+    return get_ingestion_service()
+
+
+COMPONENTS: Dict[str, Callable[[], Any]] = {
+    "vector_db": _load_vector_db,
+    "graph_db": _load_graph_db,
+    "embedding_model": _load_embedding_model,
+    "agent": _load_agent,
+    "ingestion": _load_ingestion,
+}
+
+
+class Warmup:
+    """
+    Initializes components side by side on background threads and tracks their
+    state (cold -> warming -> ready | failed) for the readiness probe.
+
+    Loaders are the same get_X() accessors the request path uses, so a request
+    that arrives before its component is warm just initializes it on demand (the
+    double-checked locks guarantee a single instance either way).
+
+    A failed component is retried with exponential backoff, so a transient error
+    (e.g. a hub timeout while loading the embedding model) does not keep the
+    readiness probe at 503 for the life of the process. Once a request has loaded
+    the component on demand, the next retry simply picks up that instance.
+    """
+
+    def __init__(
+        self,
+        components: Optional[Dict[str, Callable[[], Any]]] = None,
+        required=None,
+        retry_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ):
+        self.components = dict(components if components is not None else COMPONENTS)
+        self.required = set(required if required is not None else REQUIRED_COMPONENTS) & set(self.components)
+        self.retry_backoff = retry_backoff if retry_backoff is not None else WARMUP_RETRY_BACKOFF
+        self.max_backoff = max_backoff if max_backoff is not None else WARMUP_MAX_BACKOFF
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._first_attempts_left = len(self.components)
+        self._threads = []
+        self._state: Dict[str, Dict[str, Any]] = {name: {"state": "cold"} for name in self.components}
+        self._values: Dict[str, Any] = {}
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+
+    def start(self) -> bool:
+        """Starts warming every component. Returns False if already started."""
+        with self._lock:
+            if self.started_at is not None:
+                return False
+            self.started_at = time.monotonic()
+            self._threads = [
+                threading.Thread(target=self._warm, args=(name,), name=f"warmup-{name}", daemon=True)
+                for name in self.components
+            ]
+        if not self._threads:
+            self._done.set()
+        for thread in self._threads:
+            thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until every component has finished its first attempt (ready or failed)."""
+        return self._done.wait(timeout)
+
+    def value(self, name: str) -> Optional[Any]:
+        """The loaded component, or None while it is not ready."""
+        with self._lock:
+            return self._values.get(name)
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return all(self._state[name]["state"] == "ready" for name in self.required)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            components = {
+                name: {**state, "required": name in self.required} for name, state in self._state.items()
+            }
+            ready = all(components[name]["state"] == "ready" for name in self.required)
+        return {
+            "ready": ready,
+            "uptime_seconds": round(time.monotonic() - PROCESS_STARTED, 2),
+            "ready_after_seconds": round(self.ready_at - PROCESS_STARTED, 2) if self.ready_at else None,
+            "components": components,
+        }
+
+    def _warm(self, name: str):
+        attempt = 1
+        while not self._attempt(name, attempt):
+            if attempt == 1:
+                self._first_attempt_done()
+            delay = min(self.retry_backoff * 2 ** (attempt - 1), self.max_backoff)
+            with self._lock:
+                self._state[name]["retry_in_seconds"] = delay
+            time.sleep(delay)
+            attempt += 1
+        if attempt == 1:
+            self._first_attempt_done()
+
+    def _attempt(self, name: str, attempt: int) -> bool:
+        with self._lock:
+            self._state[name] = {"state": "warming", "attempt": attempt}
+        started = time.perf_counter()
+        try:
+            value = self.components[name]()
+        except Exception as e:
+            print(f"❌ Warmup of {name} failed (attempt {attempt}): {e}")
+            if attempt == 1:
+                traceback.print_exc()
+            with self._lock:
+                self._state[name] = {
+                    "state": "failed", "error": str(e), "attempt": attempt, "seconds": round(time.perf_counter() - started, 2)
+                }
+            return False
+        seconds = round(time.perf_counter() - started, 2)
+        with self._lock:
+            self._values[name] = value
+            self._state[name] = {"state": "ready", "attempt": attempt, "seconds": seconds}
+            if self.ready_at is None and all(self._state[n]["state"] == "ready" for n in self.required):
+                self.ready_at = time.monotonic()
+        print(f"🔥 {name} warm in {seconds}s")
+        return True
+
+    def _first_attempt_done(self):
+        with self._lock:
+            self._first_attempts_left -= 1
+            done = self._first_attempts_left == 0
+        if done:
+            self._done.set()
+
+
+_warmup: Optional[Warmup] = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> Warmup:
+    """Returns the process-wide Warmup tracker."""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = Warmup()
+    return _warmup
@@ -0,0 +1,301 @@
+import asyncio
+import contextvars
+import functools
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets (seconds) wide enough for a 5 ms Qdrant search and a 2 minute RLM run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+# ----------------------------------------------------------------------
+# Metrics (Prometheus text exposition, no client library needed)
+# ----------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(line for key, value in series for line in self._render_series(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+    def _render_series(self, key, value):
+        yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series["count"] if series else 0
+
+    def _render_series(self, key, series):
+        for bound, count in zip(self.buckets, series["buckets"]):
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, (('le', repr(float(bound))),))} {count}"
+        yield f"{self.name}_bucket{_format_labels(self.labelnames, key, (('le', '+Inf'),))} {series['count']}"
+        yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {series['sum']}"
+        yield f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}"
+
+
+class MetricsRegistry:
+    """Process-wide set of counters and histograms, rendered for `/metrics`."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+SPAN_SECONDS = REGISTRY.histogram(
+    "cie_span_duration_seconds", "Duration of instrumented operations (ingest stages, LLM calls, datastore calls, agent tools).",
+    ("span", "status"),
+)
+HTTP_REQUESTS = REGISTRY.counter("cie_http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+HTTP_SECONDS = REGISTRY.histogram("cie_http_request_duration_seconds", "HTTP request latency until the response starts.", ("method", "route"))
+LLM_QUEUE_SECONDS = REGISTRY.histogram("cie_llm_queue_wait_seconds", "Time LLM calls wait for the Groq gateway to admit them.", ("lane",))
+LLM_RETRIES = REGISTRY.counter("cie_llm_retries_total", "LLM calls retried by the gateway, by reason.", ("lane", "reason"))
+RLM_ITERATIONS = REGISTRY.histogram(
+    "cie_rlm_iterations", "dspy.RLM trajectory steps per analysis.", (), buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# ----------------------------------------------------------------------
+# Tracing
+# ----------------------------------------------------------------------
+
+class Span:
+    """One timed operation. Attributes are forwarded to the OpenTelemetry span when exporting."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "_otel")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], otel_span=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = {}
+        self._otel = otel_span
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+        if self._otel is not None:
+            self._otel.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+
+    def rename(self, name: str):
+        """Renames the span before it ends; the duration is recorded under the final name."""
+        self.name = name
+        if self._otel is not None:
+            self._otel.update_name(name)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_tracer = None  # Set by configure_tracing() when OTLP export is available
+
+
+def configure_tracing(service_name: Optional[str] = None) -> bool:
+    """
+    Exports spans over OTLP/HTTP when OTEL_EXPORTER_OTLP_ENDPOINT is set (e.g.
+    http://localhost:4318). Needs opentelemetry-sdk and
+    opentelemetry-exporter-otlp-proto-http; without them, or without the
+    endpoint, spans only feed the /metrics histograms.
+    """
+    global _tracer
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        print(f"⚠️ OTLP export disabled, OpenTelemetry SDK not installed: {e}")
+        return False
+
+    name = service_name or os.getenv("OTEL_SERVICE_NAME", "customer-intelligence-engine")
+    provider = TracerProvider(resource=Resource.create({"service.name": name}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))  # Reads the endpoint from the env
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("app.telemetry")
+    print(f"📡 Exporting traces to {os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')} as '{name}'")
+    return True
+
+
+def _otel_context(headers: Optional[Dict[str, str]]):
+    if _tracer is None or not headers:
+        return None
+    from opentelemetry import propagate
+    return propagate.extract(headers)
+
+
+@contextmanager
+def span(name: str, *, headers: Optional[Dict[str, str]] = None, **attributes) -> Iterator[Span]:
+    """
+    Times the enclosed block as a span named `name` and records it in
+    `cie_span_duration_seconds`. Spans opened inside it (on the same task or
+    thread, or through `in_current_context`) share its trace ID. `headers` lets
+    a root span continue a W3C `traceparent` sent by the caller.
+    """
+    parent = _current_span.get()
+    if _tracer is not None:
+        otel_cm = _tracer.start_as_current_span(name, context=_otel_context(headers) if parent is None else None)
+    else:
+        otel_cm = None
+
+    with (otel_cm if otel_cm is not None else _null()) as otel_span:
+        if otel_span is not None and otel_span.get_span_context().is_valid:
+            trace_id = format(otel_span.get_span_context().trace_id, "032x")
+        elif parent is not None:
+            trace_id = parent.trace_id
+        else:
+            match = TRACEPARENT.match((headers or {}).get("traceparent", ""))
+            trace_id = match.group(1) if match else uuid.uuid4().hex
+        current = Span(name, trace_id, parent.span_id if parent else None, otel_span)
+        for key, value in attributes.items():
+            current.set_attribute(key, value)
+
+        token = _current_span.set(current)
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield current
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            _current_span.reset(token)
+            SPAN_SECONDS.observe(time.perf_counter() - started, span=current.name, status=status)
+
+
+@contextmanager
+def _null():
+    yield None
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of `span` for sync and async functions."""
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current else None
+
+
+def in_current_context(fn: Callable) -> Callable:
+    """
+    Binds `fn` to the caller's context, so spans it opens on an executor thread
+    stay in the caller's trace. Each call runs in its own copy, so the wrapper
+    can be handed to `pool.map`.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
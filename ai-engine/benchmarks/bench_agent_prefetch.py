@@ -0,0 +1,123 @@
+"""
+Benchmark: agent latency with and without the evidence prefetch node.
+
+    python benchmarks/bench_agent_prefetch.py --llm-ms 600 --tool-ms 250 --questions 5
+    python benchmarks/bench_agent_prefetch.py --sync
+
+By default the LLM and tools are stubs with fixed latencies. The stub LLM behaves
+like the agent does on typical questions: without prefetched evidence it spends
+one turn on vector search, one on the theme report, then answers. When the
+evidence is already in its prompt, it answers in the first turn. --sync drives the
+graphs through invoke() (thread-pool prefetch) instead of ainvoke().
+
+With --live (needs GROQ_API_KEY and the configured Qdrant/Neo4j), real questions
+are sent through both graphs, and the LLM turns and wall-clock time are reported.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = [
+    "What are the main issues users are reporting?",
+    "How do people feel about battery life?",
+    "Which features get the most praise?",
+    "Are there complaints about the sync feature?",
+    "What should the team fix first?",
+]
+
+
+def stub_backends(llm_ms: float, tool_ms: float):
+    """Replaces Groq and the three tools with fixed-latency stand-ins."""
+    os.environ.setdefault("GROQ_API_KEY", "bench-key")
+    from stubs import StubChatModel
+    from app.orchestration import graph
+
+    async def slow_tool(*args, **kwargs):
+        await asyncio.sleep(tool_ms / 1000)
+        return "stub evidence"
+
+    def slow_sync_tool(*args, **kwargs):
+        time.sleep(tool_ms / 1000)
+        return "stub evidence"
+
+    def slow_themes():
+        time.sleep(tool_ms / 1000)
+        return "stub theme report"
+
+    llm = StubChatModel(latency_ms=llm_ms)
+    graph.llm_with_tools = llm
+    graph.search_vector_memory.coroutine = slow_tool
+    graph.query_graph_memory.coroutine = slow_tool
+    graph.search_vector_memory.func = slow_sync_tool
+    graph.query_graph_memory.func = slow_sync_tool
+    graph.fetch_global_themes.func = slow_themes
+    return graph, llm
+
+
+async def run(agent, questions, count_turns, sync=False):
+    latencies, turns = [], []
+    for question in questions:
+        before = count_turns()
+        started = time.perf_counter()
+        state = {"messages": [("user", question)], "question": question, "steps": []}
+        if sync:
+            agent.invoke(state)
+        else:
+            await agent.ainvoke(state)
+        latencies.append(time.perf_counter() - started)
+        turns.append(count_turns() - before)
+    return {
+        "mean_ms": round(1000 * statistics.mean(latencies), 1),
+        "p50_ms": round(1000 * statistics.median(latencies), 1),
+        "max_ms": round(1000 * max(latencies), 1),
+        "llm_turns_per_question": round(statistics.mean(turns), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--llm-ms", type=float, default=600, help="Stub latency per LLM turn")
+    parser.add_argument("--tool-ms", type=float, default=250, help="Stub latency per tool call")
+    parser.add_argument("--live", action="store_true", help="Use Groq and the real datastores")
+    parser.add_argument("--sync", action="store_true", help="Use invoke() instead of ainvoke()")
+    args = parser.parse_args()
+
+    questions = (QUESTIONS * (args.questions // len(QUESTIONS) + 1))[:args.questions]
+    if args.live:
+        from langchain_core.callbacks import BaseCallbackHandler
+        from app.orchestration import graph
+
+        class TurnCounter(BaseCallbackHandler):
+            turns = 0
+
+            def on_chat_model_start(self, *args, **kwargs):
+                TurnCounter.turns += 1
+
+        graph.llm_with_tools = graph.llm_with_tools.with_config(callbacks=[TurnCounter()])
+        count_turns = lambda: TurnCounter.turns
+        results = {"mode": "live"}
+    else:
+        graph, llm = stub_backends(args.llm_ms, args.tool_ms)
+        count_turns = lambda: len(llm.turns)
+        results = {"mode": "stub", "llm_ms": args.llm_ms, "tool_ms": args.tool_ms}
+
+    results["questions"] = len(questions)
+    results["path"] = "sync" if args.sync else "async"
+    for name, prefetch in [("sequential_tools", False), ("prefetch", True)]:
+        results[name] = asyncio.run(run(graph.build_graph(prefetch=prefetch), questions, count_turns, sync=args.sync))
+    results["speedup"] = round(results["sequential_tools"]["mean_ms"] / results["prefetch"]["mean_ms"], 2)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Benchmark: end-to-end ingest + chat pipeline, fully offline and reproducible.
+
+    python benchmarks/bench_e2e.py --scale 500 --batch-size 50 --questions 20 --output bench.json
+    python benchmarks/bench_e2e.py --compare before.json --output after.json
+
+The real pipeline code runs: chunker, micro-batching EmbeddingService, VectorDatabase
+and the ingest stages, plus the theme report store, the agent graph and its tools.
+Only the external services are replaced, each with a fixed latency:
+
+    Qdrant      -> in-memory VectorDatabase
+    Neo4j       -> FakeGraphBackend (benchmarks/stubs.py)
+    Embeddings  -> StubSentenceModel, a deterministic hash-seeded vector per text
+    Groq        -> StubRLM for ingest and aggregation, StubChatModel for the agent
+
+test_data/*.csv is scaled up to --scale items with deterministic variants (--seed),
+so every run ingests exactly the same corpus. Reported as JSON: p50/p95 per ingest
+stage and per chat question, throughput, and the peak RSS of the process.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import csv
+import glob
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+TEST_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'test_data'))
+
+QUESTIONS = [
+    "What are the main issues users are reporting?",
+    "How do people feel about battery life?",
+    "Which features get the most praise?",
+    "Are there complaints about the sync feature?",
+    "What should the team fix first?",
+]
+
+OPENERS = ["", "Update: ", "Honestly, ", "After two weeks: ", "Second purchase. ", "Long-time user here. "]
+CLOSERS = [
+    "", " Would not recommend.", " Support never replied.", " Still using it daily.",
+    " Hoping the next update fixes this.", " Five stars for the packaging though.",
+]
+SOURCES = ["amazon", "reddit", "app_store", "play_store", "twitter", "support_ticket"]
+
+
+def isolate_environment(workdir: str):
+    """Points every external service and on-disk store at offline stand-ins."""
+    # Empty values also stop load_dotenv from filling these in from a local .env
+    for name in ("QDRANT_URL_ENDPOINT", "QDRANT_API_KEY", "NEO4J_URL_ENDPOINT", "NEO4J_USERNAME", "NEO4J_PASSWORD"):
+        os.environ[name] = ""
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["LLM_CACHE_MODE"] = "off"
+    os.environ["LLM_CACHE_PATH"] = ""
+    os.environ["EMBED_CACHE_PATH"] = os.path.join(workdir, "embeddings.db")
+    os.environ["THEME_REPORT_DB"] = os.path.join(workdir, "theme_reports.db")
+    os.environ["INGEST_JOBS_DB"] = os.path.join(workdir, "ingest_jobs.db")
+
+
+def load_rows() -> List[Dict[str, str]]:
+    rows = []
+    for path in sorted(glob.glob(os.path.join(TEST_DATA, "*.csv"))):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def synthesize(rows: List[Dict[str, str]], count: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    Scales the sample rows up to `count` records. The first pass keeps the rows
+    verbatim; later passes vary wording, source, rating and timestamp. A running
+    order number keeps every content string (and so every point ID) unique.
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        base = rows[i % len(rows)]
+        record = dict(base)
+        if i >= len(rows):
+            record["content"] = f"{rng.choice(OPENERS)}{base['content']}{rng.choice(CLOSERS)} (order #{100000 + i})"
+            record["source"] = rng.choice(SOURCES)
+            rating = float(base["rating"] or 3) + rng.choice([-1, -0.5, 0, 0.5, 1])
+            record["rating"] = str(min(5.0, max(1.0, rating)))
+            timestamp = datetime.fromisoformat(base["timestamp"].replace("Z", "+00:00"))
+            record["timestamp"] = (timestamp + timedelta(hours=rng.randint(1, 24 * 90))).isoformat()
+        records.append(record)
+    return records
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95 (plus mean and max) in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def rank(q):
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(1000 * rank(0.50), 1),
+        "p95_ms": round(1000 * rank(0.95), 1),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 1),
+        "max_ms": round(1000 * ordered[-1], 1),
+    }
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_backends(args, workdir: str):
+    """Creates the pipeline objects and installs them as the process-wide singletons."""
+    from stubs import FakeGraphBackend, StubChatModel, StubRLM, StubSentenceModel
+    from app.memory.graph import client as graph_client
+    from app.memory.vector import client as vector_client
+    from app.memory.vector.client import VectorDatabase
+    from app.orchestration import graph
+    from app.orchestration.answer_cache import AnswerCache
+    from app.processing import embedder as embedder_module, theme_report
+    from app.processing.aggregator import GlobalAggregator
+    from app.processing.chunker import FeedbackChunker
+    from app.processing.embedder import EmbeddingService
+    from app.processing.ingestor import IngestionService
+    from app.processing.theme_report import ThemeReportStore
+    from concurrent.futures import ThreadPoolExecutor
+
+    embedding_service = EmbeddingService("bench-stub", cache=None)
+    embedding_service._model = StubSentenceModel(args.embed_ms_batch, args.embed_ms_text)
+    vector_db = VectorDatabase(collection_name="bench_e2e")
+    graph_backend = FakeGraphBackend(latency_ms=args.graph_ms)
+    rlm = StubRLM(latency_ms=args.llm_ms)
+    reports = ThemeReportStore(
+        build_report=GlobalAggregator(vector_db=vector_db, rlm=rlm).run_aggregation,
+        path=os.path.join(workdir, "theme_reports.db"),
+    )
+
+    service = IngestionService.__new__(IngestionService)
+    service.chunker = FeedbackChunker()
+    service.vector_db = vector_db
+    service.rlm = rlm
+    service.graph_db = graph_backend
+    service.embedder = embedding_service
+    service.theme_reports = reports
+    service.answer_cache = AnswerCache(encode=embedding_service.encode)
+    service.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ingest-stage")
+
+    embedder_module._embedding_service = embedding_service
+    theme_report._theme_report_store = reports
+    vector_client._vector_db = vector_db
+    graph_client._graph_db = graph_backend
+    chat_model = StubChatModel(latency_ms=args.llm_ms)
+    graph.llm_with_tools = chat_model
+    return service, graph, chat_model
+
+
+def run_ingest(service, records, batch_size: int) -> Dict[str, Any]:
+    from app.processing.streaming import normalize_record
+
+    items = [normalize_record(record) for record in records]
+    stages: Dict[str, List[float]] = {}
+    chunks = 0
+
+    def on_stage(stage, status, **info):
+        if status == "completed":
+            stages.setdefault(stage, []).append(info["seconds"])
+
+    started = time.perf_counter()
+    for offset in range(0, len(items), batch_size):
+        result = service.ingest(items[offset:offset + batch_size], on_stage=on_stage)
+        chunks += result["chunk_count"]
+        stages.setdefault("batch_total", []).append(result["timings"]["total"])
+    elapsed = time.perf_counter() - started
+
+    refresh_started = time.perf_counter()
+    service.theme_reports.refresh()
+    stages["theme_report_refresh"] = [time.perf_counter() - refresh_started]
+
+    return {
+        "items": len(items),
+        "chunks": chunks,
+        "batches": len(stages.get("batch_total", [])),
+        "seconds": round(elapsed, 2),
+        "items_per_sec": round(len(items) / elapsed, 1),
+        "chunks_per_sec": round(chunks / elapsed, 1),
+        "stages": {stage: percentiles(values) for stage, values in stages.items()},
+    }
+
+
+async def run_chat(graph, chat_model, questions: List[str], prefetch: bool, concurrency: int) -> Dict[str, Any]:
+    agent = graph.build_graph(prefetch=prefetch)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def ask(question):
+        async with semaphore:
+            started = time.perf_counter()
+            await agent.ainvoke({"messages": [("user", question)], "question": question, "steps": []})
+            latencies.append(time.perf_counter() - started)
+
+    turns_before = len(chat_model.turns)
+    started = time.perf_counter()
+    await asyncio.gather(*(ask(q) for q in questions))
+    elapsed = time.perf_counter() - started
+    return {
+        "questions": len(questions),
+        "prefetch": prefetch,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "questions_per_sec": round(len(questions) / elapsed, 2),
+        "llm_turns_per_question": round((len(chat_model.turns) - turns_before) / len(questions), 2),
+        "latency": percentiles(latencies),
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Ratio current/previous for every p50/p95 and throughput figure both runs report."""
+    deltas = {}
+
+    def walk(before, after, path):
+        for key, value in after.items():
+            if key not in before:
+                continue
+            if isinstance(value, dict) and isinstance(before[key], dict):
+                walk(before[key], value, path + [key])
+            elif key in ("p50_ms", "p95_ms", "items_per_sec", "questions_per_sec", "peak_rss_mb") and before[key]:
+                deltas[".".join(path + [key])] = round(value / before[key], 3)
+
+    walk(previous, current, [])
+    return deltas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=300, help="Number of feedback items to ingest")
+    parser.add_argument("--batch-size", type=int, default=50, help="Items per ingest() call")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4, help="Chat questions in flight at once")
+    parser.add_argument("--no-prefetch", action="store_true", help="Run the agent without the prefetch node")
+    parser.add_argument("--llm-ms", type=float, default=300, help="Stub latency per LLM call")
+    parser.add_argument("--embed-ms-batch", type=float, default=5, help="Stub embedding cost per model call")
+    parser.add_argument("--embed-ms-text", type=float, default=0.5, help="Stub embedding cost per text")
+    parser.add_argument("--graph-ms", type=float, default=5, help="Stub latency per graph round trip")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Previous JSON report to compute ratios against")
+    args = parser.parse_args()
+
+    # Pipeline progress goes to stderr so stdout is just the JSON report
+    with tempfile.TemporaryDirectory(prefix="bench_e2e_") as workdir, contextlib.redirect_stdout(sys.stderr):
+        isolate_environment(workdir)
+        service, graph, chat_model = build_backends(args, workdir)
+
+        records = synthesize(load_rows(), args.scale, args.seed)
+        questions = (QUESTIONS * (args.questions // len(QUESTIONS) + 1))[:args.questions]
+
+        results: Dict[str, Any] = {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        }
+        results["ingest"] = run_ingest(service, records, args.batch_size)
+        results["chat"] = asyncio.run(run_chat(graph, chat_model, questions, not args.no_prefetch, args.concurrency))
+        results["embedding"] = service.embedder.stats()
+        results["peak_rss_mb"] = peak_rss_mb()
+
+    if args.compare:
+        with open(args.compare) as f:
+            results["ratios_vs_previous"] = compare(json.load(f), results)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: embedding backends (PyTorch vs ONNX Runtime fp32 vs dynamic int8).
+
+    python benchmarks/bench_embeddings.py --sentences 2000 --batch-size 64
+    python benchmarks/bench_embeddings.py --backends onnx onnx-int8
+
+Each backend runs in its own process so peak RSS is measured in isolation.
+The input is test_data/*.csv, repeated up to --sentences. Reported per backend:
+model load time, sentences/sec, peak RSS, and cosine agreement with the torch
+vectors (when torch is among the backends).
+"""
+import sys
+import os
+import argparse
+import csv
+import glob
+import json
+import resource
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'test_data'))
+
+
+def sentences(count: int):
+    texts = []
+    for path in sorted(glob.glob(os.path.join(TEST_DATA, "*.csv"))):
+        with open(path, newline="", encoding="utf-8") as f:
+            texts.extend(row["content"] for row in csv.DictReader(f))
+    return [texts[i % len(texts)] + ("" if i < len(texts) else f" ({i})") for i in range(count)]
+
+
+def worker(backend: str, count: int, batch_size: int, output: str):
+    """Runs inside the child process: load, warm up, time the encode, save the vectors."""
+    from app.processing.embedder import EmbeddingService
+
+    texts = sentences(count)
+    service = EmbeddingService(backend=backend)
+    started = time.perf_counter()
+    model = service.warmup().get_model()
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size)
+    seconds = time.perf_counter() - started
+    np.save(output, np.asarray(vectors, dtype=np.float32))
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "load_seconds": round(load_seconds, 2),
+        "encode_seconds": round(seconds, 2),
+        "sentences_per_sec": round(len(texts) / seconds, 1),
+        "peak_rss_mb": round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--sentences", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.sentences, args.batch_size, args.vectors)
+        return
+
+    results = {"sentences": args.sentences, "batch_size": args.batch_size, "backends": {}}
+    with tempfile.TemporaryDirectory(prefix="bench_embeddings_") as workdir:
+        vectors = {}
+        for backend in args.backends:
+            path = os.path.join(workdir, f"{backend}.npy")
+            run = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", backend, "--vectors", path,
+                 "--sentences", str(args.sentences), "--batch-size", str(args.batch_size)],
+                capture_output=True, text=True,
+            )
+            if run.returncode != 0:
+                results["backends"][backend] = {"error": run.stderr.strip().splitlines()[-1] if run.stderr.strip() else "failed"}
+                continue
+            results["backends"][backend] = json.loads(run.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(path)
+
+        if "torch" in vectors:
+            reference = vectors["torch"]
+            for backend, matrix in vectors.items():
+                cosines = np.sum(matrix * reference, axis=1) / (
+                    np.linalg.norm(matrix, axis=1) * np.linalg.norm(reference, axis=1)
+                )
+                results["backends"][backend]["cosine_vs_torch"] = {
+                    "min": round(float(cosines.min()), 5), "mean": round(float(cosines.mean()), 5)
+                }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark: Neo4j summary writes, legacy per-entity statements vs UNWIND batches.
+
+    python benchmarks/bench_graph_writes.py --summaries 50 --entities 8
+
+Round trips are always counted. Wall-clock time is measured only when
+NEO4J_URL_ENDPOINT / NEO4J_USERNAME / NEO4J_PASSWORD point at a database;
+benchmark nodes use a `bench_` ID prefix and are deleted afterwards.
+"""
+import sys
+import os
+import argparse
+import json
+import time
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.memory.graph.client import Neo4jClient, ALLOWED_ENTITY_LABELS
+
+LABELS = ["Issue", "Feature", "Product", "Theme"]
+
+
+class CountingTx:
+    """Counts tx.run round trips, forwarding to a real transaction when one is given."""
+    def __init__(self, tx=None):
+        self.tx = tx
+        self.round_trips = 0
+
+    def run(self, query, **params):
+        self.round_trips += 1
+        if self.tx is not None:
+            return self.tx.run(query, **params)
+
+
+def legacy_write(tx, summary_text, metadata, entities):
+    """The pre-UNWIND write path: 2 statements for the summary + 2 per entity."""
+    user_id = metadata.get("user") or "Anonymous"
+    summary_id = metadata["summary_id"]
+    tx.run("MERGE (u:User {id: $user_id})", user_id=user_id)
+    tx.run(
+        """
+        MATCH (u:User {id: $user_id})
+        MERGE (s:Summary {id: $summary_id})
+        ON CREATE SET s.text = $text
+        MERGE (u)-[:WROTE]->(s)
+        """,
+        user_id=user_id, summary_id=summary_id, text=summary_text
+    )
+    for entity in entities:
+        label = entity["type"] if entity["type"] in ALLOWED_ENTITY_LABELS else "Entity"
+        tx.run(f"MERGE (e:{label} {{name: $name}})", name=entity["name"])
+        tx.run(
+            f"""
+            MATCH (s:Summary {{id: $summary_id}})
+            MATCH (e:{label} {{name: $name}})
+            MERGE (s)-[:MENTIONS {{sentiment: $sentiment}}]->(e)
+            """,
+            summary_id=summary_id, name=entity["name"], sentiment=entity["sentiment"]
+        )
+
+
+def make_summaries(n, k, tag):
+    return [
+        (
+            f"Benchmark summary {i}",
+            {"summary_id": f"bench_{tag}_{i}", "user": "bench_user"},
+            [
+                {"name": f"bench entity {j % 20}", "type": LABELS[j % len(LABELS)], "sentiment": "negative"}
+                for j in range(k)
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def run_legacy(driver, summaries):
+    """One transaction per summary, as store_summary_intelligence used to do."""
+    round_trips = 0
+    started = time.perf_counter()
+    for summary in summaries:
+        counter = CountingTx()
+        if driver:
+            with driver.session() as session:
+                def work(tx):
+                    counter.tx = tx
+                    legacy_write(counter, *summary)
+                session.execute_write(work)
+        else:
+            legacy_write(counter, *summary)
+        round_trips += counter.round_trips
+    return round_trips, time.perf_counter() - started
+
+
+def run_unwind(driver, summaries, batch_size):
+    round_trips = 0
+    started = time.perf_counter()
+    for start in range(0, len(summaries), batch_size):
+        rows, mentions = Neo4jClient.build_write_rows(summaries[start:start + batch_size])
+        counter = CountingTx()
+        if driver:
+            with driver.session() as session:
+                def work(tx):
+                    counter.tx = tx
+                    Neo4jClient._write_summaries(counter, rows, mentions)
+                session.execute_write(work)
+        else:
+            Neo4jClient._write_summaries(counter, rows, mentions)
+        round_trips += counter.round_trips
+    return round_trips, time.perf_counter() - started
+
+
+def cleanup(driver):
+    with driver.session() as session:
+        session.run("MATCH (s:Summary) WHERE s.id STARTS WITH 'bench_' DETACH DELETE s")
+        session.run("MATCH (e) WHERE e.name STARTS WITH 'bench entity' DETACH DELETE e")
+        session.run("MATCH (u:User {id: 'bench_user'}) DETACH DELETE u")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=50)
+    parser.add_argument("--entities", type=int, default=8, help="Entities per summary")
+    parser.add_argument("--batch-size", type=int, default=20, help="Summaries per UNWIND transaction")
+    args = parser.parse_args()
+
+    driver = Neo4jClient().driver
+    results = {"summaries": args.summaries, "entities_per_summary": args.entities, "live": driver is not None}
+
+    for name, runner in [
+        ("legacy", lambda s: run_legacy(driver, s)),
+        ("unwind_single", lambda s: run_unwind(driver, s, batch_size=1)),
+        ("unwind_batched", lambda s: run_unwind(driver, s, batch_size=args.batch_size)),
+    ]:
+        round_trips, seconds = runner(make_summaries(args.summaries, args.entities, name))
+        results[name] = {
+            "round_trips": round_trips,
+            "round_trips_per_summary": round(round_trips / args.summaries, 2),
+        }
+        if driver:
+            results[name]["ms_per_summary"] = round(1000 * seconds / args.summaries, 2)
+
+    if driver:
+        cleanup(driver)
+        driver.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: similarity grouping, exact agglomerative vs streaming mini-batch.
+
+    python benchmarks/bench_grouping.py --sizes 2000 5000 20000 50000 100000
+    python benchmarks/bench_grouping.py --topics 500 --noise 0.03 --exact-max 5000
+    python benchmarks/bench_grouping.py --max-clusters 4096
+
+Inputs are synthetic 384-dim unit vectors scattered around --topics directions
+(the embeddings of feedback about distinct issues). For every size, each engine
+reports seconds, peak traced memory, the number of groups, and the adjusted
+Rand index against the true topics. Where both engines run, their agreement is
+reported too. The exact engine is skipped above --exact-max because its n x n
+distance matrix is what exhausts memory. `scaling_exponent` is the log-log
+slope of time vs size, where 1.0 means linear.
+
+The low-cohesion case times the streaming engine on structureless random unit
+vectors, where no two items reach the threshold. Without the cluster limit
+(--max-clusters) every item would open its own cluster and the cost would grow
+quadratically; `low_cohesion.scaling_exponent` should stay near 1.0.
+"""
+import sys
+import os
+import argparse
+import json
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.processing.grouping import agglomerative_groups, streaming_groups
+
+
+def synthesize(n: int, topics: int, noise: float, seed: int):
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(topics, 384))
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    labels = rng.integers(0, topics, n)
+    vectors = centroids[labels] + rng.normal(scale=noise, size=(n, 384))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32), labels
+
+
+def random_unit(n: int, seed: int):
+    vectors = np.random.default_rng(seed).normal(size=(n, 384))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def scaling_exponent(sizes, seconds):
+    """Log-log slope of time vs size; 1.0 means linear."""
+    if len(sizes) < 2:
+        return None
+    return round(float(np.polyfit(np.log(sizes), np.log(np.maximum(seconds, 1e-4)), 1)[0]), 2)
+
+
+def as_labels(groups, n):
+    labels = np.empty(n, dtype=np.int64)
+    for label, group in enumerate(groups):
+        labels[group] = label
+    return labels
+
+
+def measure(engine, vectors, threshold):
+    tracemalloc.start()
+    started = time.perf_counter()
+    groups = engine(vectors, threshold)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return groups, {"seconds": round(seconds, 3), "peak_mb": round(peak / (1024 * 1024), 1), "groups": len(groups)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 5000, 10000, 20000, 50000])
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.03, help="Per-dimension noise around each topic")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--exact-max", type=int, default=5000)
+    parser.add_argument("--max-clusters", type=int, default=None, help="Streaming cluster limit (RLM_GROUPING_MAX_CLUSTERS)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    streaming = partial(streaming_groups, max_clusters=args.max_clusters)
+
+    # sklearn's first import is slow; keep it out of the timings
+    from sklearn.metrics import adjusted_rand_score
+
+    runs = []
+    for n in args.sizes:
+        vectors, topics = synthesize(n, args.topics, args.noise, args.seed)
+        run = {"items": n}
+        streamed, run["streaming"] = measure(streaming, vectors, args.threshold)
+        streamed_labels = as_labels(streamed, n)
+        run["streaming"]["ari_vs_topics"] = round(adjusted_rand_score(topics, streamed_labels), 4)
+        if n <= args.exact_max:
+            exact, run["exact"] = measure(agglomerative_groups, vectors, args.threshold)
+            run["exact"]["ari_vs_topics"] = round(adjusted_rand_score(topics, as_labels(exact, n)), 4)
+            run["ari_streaming_vs_exact"] = round(adjusted_rand_score(as_labels(exact, n), streamed_labels), 4)
+        runs.append(run)
+        print(f"{n} items: {json.dumps(run)}", file=sys.stderr)
+
+    low_cohesion = []
+    for n in args.sizes:
+        _, run = measure(streaming, random_unit(n, args.seed), args.threshold)
+        low_cohesion.append({"items": n, "streaming": run})
+        print(f"{n} random items: {json.dumps(run)}", file=sys.stderr)
+
+    sizes = [run["items"] for run in runs]
+    print(json.dumps({
+        "topics": args.topics, "noise": args.noise, "threshold": args.threshold,
+        "scaling_exponent": scaling_exponent(sizes, [run["streaming"]["seconds"] for run in runs]),
+        "runs": runs,
+        "low_cohesion": {
+            "scaling_exponent": scaling_exponent(sizes, [run["streaming"]["seconds"] for run in low_cohesion]),
+            "runs": low_cohesion,
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
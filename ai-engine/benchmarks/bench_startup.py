@@ -0,0 +1,120 @@
+"""
+Benchmark: cold start of the API server.
+
+    python benchmarks/bench_startup.py --runs 3 --timeout 300
+
+Each run launches `uvicorn app.main:app` in a fresh process and reports:
+
+    import_seconds   `import app.main` alone, in a separate interpreter
+    live_seconds     until GET /health/live answers (the platform health check)
+    ready_seconds    until GET /health/ready returns 200 (required components warm)
+
+plus the per-component warmup times from the readiness report. Use --env KEY=VALUE
+to point the server at real services or to change READINESS_REQUIRED.
+"""
+import sys
+import os
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+ENGINE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url: str):
+    """Returns (status, json body), or (None, None) while the server is not listening."""
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def time_import(env) -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ENGINE_DIR, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_server(env, timeout: float):
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ENGINE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    live = ready = None
+    report = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if live is None and get(f"{base}/health/live")[0] == 200:
+                live = time.perf_counter() - started
+            if live is not None:
+                status, report = get(f"{base}/health/ready")
+                if status == 200:
+                    ready = time.perf_counter() - started
+                    break
+                if report and all(c["state"] in ("ready", "failed") for c in report["components"].values()):
+                    break  # A required component failed; it will not become ready
+            if server.poll() is not None:
+                break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    components = {name: {k: c.get(k) for k in ("state", "seconds", "error") if c.get(k) is not None}
+                  for name, c in (report or {}).get("components", {}).items()}
+    return live, ready, components
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"median": round(statistics.median(values), 2), "min": round(min(values), 2), "max": round(max(values), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300, help="Give up on readiness after this many seconds")
+    parser.add_argument("--env", action="append", default=[], help="Extra KEY=VALUE for the server process")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "bench-key")
+    env.update(pair.split("=", 1) for pair in args.env)
+
+    imports, lives, readies, runs = [], [], [], []
+    for _ in range(args.runs):
+        imports.append(time_import(env))
+        live, ready, components = time_server(env, args.timeout)
+        lives.append(live)
+        readies.append(ready)
+        runs.append({"live_seconds": live and round(live, 2), "ready_seconds": ready and round(ready, 2), "components": components})
+
+    print(json.dumps({
+        "runs": args.runs,
+        "import_seconds": summarize(imports),
+        "live_seconds": summarize(lives),
+        "ready_seconds": summarize(readies),
+        "per_run": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
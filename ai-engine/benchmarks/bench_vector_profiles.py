@@ -0,0 +1,137 @@
+"""
+Benchmark: Qdrant collection profiles, recall@k vs search latency vs memory.
+
+    python benchmarks/bench_vector_profiles.py --points 50000 --queries 200 --k 10
+    python benchmarks/bench_vector_profiles.py --profiles default quantized --hnsw-ef 64 128
+
+Synthetic 384-dim vectors (unit-length points scattered around topic centroids,
+like chunk embeddings) are loaded into one `bench_profile_<name>` collection per
+profile. Every query is then run for each hnsw_ef (and, on quantized profiles,
+each oversampling factor) and compared with exact top-k from numpy.
+
+Recall and latency need a Qdrant server (QDRANT_URL_ENDPOINT / QDRANT_API_KEY):
+the in-memory client always searches exactly. Without one, only the estimated
+RAM per profile is reported. Collections are dropped afterwards unless --keep.
+"""
+import sys
+import os
+import argparse
+import json
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.memory.vector.client import VectorDatabase, COLLECTION_PROFILES, EMBEDDING_DIMENSION
+
+
+def synthesize(points: int, queries: int, topics: int, seed: int):
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(topics, EMBEDDING_DIMENSION))
+    def around(n):
+        vectors = centroids[rng.integers(0, topics, n)] + rng.normal(scale=0.6, size=(n, EMBEDDING_DIMENSION))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    return around(points), around(queries)
+
+
+def exact_top_k(data: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ data.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+
+
+def estimated_ram_mb(profile: dict, points: int) -> float:
+    """Vectors held in RAM plus HNSW level-0 links (2*m neighbours, 4-byte IDs)."""
+    vector_bytes = EMBEDDING_DIMENSION * (1 if profile["quantization"] else 4)
+    if not profile["on_disk"] and profile["quantization"]:
+        vector_bytes += EMBEDDING_DIMENSION * 4  # Originals stay in RAM too
+    m = profile["hnsw"].m if profile["hnsw"] else 16
+    return round(points * (vector_bytes + 2 * m * 4) / (1024 * 1024), 1)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def load(db: VectorDatabase, data: np.ndarray, timeout: float):
+    documents = [Document(page_content=f"bench point {i}", metadata={"type": "bench", "bench_index": i}) for i in range(len(data))]
+    stats = db.upsert_documents(documents, data.tolist())
+    # Wait for the optimizer to build the HNSW graph (and quantized copies) before timing searches
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        info = db.client.get_collection(db.collection_name)
+        if info.status == "green" and (info.indexed_vectors_count or 0) >= 0.99 * len(data):
+            break
+        time.sleep(1)
+    stats["index_seconds"] = round(time.perf_counter() - started, 1)
+    return stats
+
+
+def measure(db: VectorDatabase, queries: np.ndarray, truth: np.ndarray, k: int, **params):
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = db.search(query.tolist(), limit=k, **params)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = {hit["metadata"]["bench_index"] for hit in hits}
+        recalls.append(len(found & set(expected.tolist())) / k)
+    return {
+        **{name: value for name, value in params.items() if value},
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(COLLECTION_PROFILES), choices=list(COLLECTION_PROFILES))
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, nargs="+", default=[32, 64, 128, 256])
+    parser.add_argument("--oversampling", type=float, nargs="+", default=[1.0, 2.0, 3.0])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--index-timeout", type=float, default=600)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    args = parser.parse_args()
+
+    results = {
+        "points": args.points, "queries": args.queries, "k": args.k,
+        "profiles": {name: {"estimated_ram_mb": estimated_ram_mb(COLLECTION_PROFILES[name], args.points)} for name in args.profiles},
+    }
+    if not (os.getenv("QDRANT_URL_ENDPOINT") and os.getenv("QDRANT_API_KEY")):
+        results["note"] = "No Qdrant server configured; the in-memory client searches exactly, so only RAM estimates are reported."
+        print(json.dumps(results, indent=2))
+        return
+
+    data, queries = synthesize(args.points, args.queries, args.topics, args.seed)
+    truth = exact_top_k(data, queries, args.k)
+
+    for name in args.profiles:
+        db = VectorDatabase(collection_name=f"bench_profile_{name}", profile=name)
+        if not db.is_remote:
+            sys.exit("Could not reach the Qdrant server.")
+        try:
+            report = results["profiles"][name]
+            report["load"] = load(db, data, args.index_timeout)
+            report["exact"] = measure(db, queries, truth, args.k, exact=True)
+            oversampling = args.oversampling if COLLECTION_PROFILES[name]["quantization"] else [None]
+            report["runs"] = [
+                measure(db, queries, truth, args.k, hnsw_ef=ef, oversampling=factor, rescore=True if factor else None)
+                for ef in args.hnsw_ef for factor in oversampling
+            ]
+        finally:
+            if not args.keep:
+                db.client.delete_collection(db.collection_name)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
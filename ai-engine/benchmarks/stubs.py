@@ -0,0 +1,138 @@
+"""
+Deterministic stand-ins for the external services, shared by the benchmarks.
+
+Each stub has a configurable latency, so pipeline and agent overheads can be
+measured offline and compared across commits without Groq, Hugging Face or Neo4j.
+"""
+import asyncio
+import hashlib
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.processing.rlm_agent import RLMHelperTools
+
+EMBEDDING_DIM = 384
+
+
+class StubSentenceModel:
+    """
+    Drop-in for SentenceTransformer: every text maps to a fixed pseudo-random unit
+    vector seeded by its hash. Costs `ms_per_batch + ms_per_text * len(texts)`.
+    """
+
+    def __init__(self, ms_per_batch: float = 5.0, ms_per_text: float = 0.5):
+        self.ms_per_batch = ms_per_batch
+        self.ms_per_text = ms_per_text
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        time.sleep((self.ms_per_batch + self.ms_per_text * len(texts)) / 1000)
+        vectors = np.stack([self._vector(t) for t in texts]) if texts else np.zeros((0, EMBEDDING_DIM))
+        return vectors.astype(np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return EMBEDDING_DIM
+
+    @staticmethod
+    def _vector(text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM)
+        return vector / np.linalg.norm(vector)
+
+
+class StubRLM:
+    """Stands in for RLMFeedbackAnalyzer: keyword themes after a fixed LLM delay."""
+
+    def __init__(self, latency_ms: float = 800):
+        self.latency_ms = latency_ms
+        self.tools = RLMHelperTools()
+        self.calls = 0
+
+    def analyze(self, feedback_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        time.sleep(self.latency_ms / 1000)
+        self.calls += 1
+        texts = [item.get("content", "") for item in feedback_items]
+        themes = self.tools.extract_themes(texts)
+        low = [t for t, item in zip(texts, feedback_items) if (item.get("rating") or 3) <= 2]
+        return {
+            "themes": themes,
+            "critical_issues": self.tools.extract_themes(low, max_themes=3) if low else [],
+            "sentiment": "negative" if len(low) * 2 > len(texts) else "mixed",
+            "hierarchical_summary": f"{len(texts)} items. Top themes: {', '.join(themes)}",
+        }
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Scripted agent LLM. Without prefetched evidence in the system prompt it calls
+    each tool in `plan` on successive turns and then answers; with evidence it
+    answers in its first turn. Every turn costs `latency_ms`.
+    """
+
+    latency_ms: float = 600
+    plan: List[str] = ["search_vector_memory", "fetch_global_themes"]
+    turns: List[int] = []
+
+    @property
+    def _llm_type(self):
+        return "stub"
+
+    def _respond(self, messages) -> ChatResult:
+        self.turns.append(1)
+        prefetched = any("already retrieved" in str(m.content) for m in messages if m.type == "system")
+        tool_results = sum(1 for m in messages if m.type == "tool")
+        plan = [] if prefetched else self.plan
+        if tool_results < len(plan):
+            name = plan[tool_results]
+            question = next((m.content for m in reversed(messages) if m.type == "human"), "")
+            args = {"query": question} if name == "search_vector_memory" else {}
+            message = AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{tool_results}"}])
+        else:
+            evidence = sum(len(str(m.content)) for m in messages if m.type in ("tool", "system"))
+            message = AIMessage(content=f"Answer based on {evidence} characters of evidence.")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._respond(messages)
+
+
+class FakeGraphBackend:
+    """
+    In-memory replacement for Neo4jClient covering the calls the pipeline and
+    agent make: summary writes, and the top-entities aggregate used by the tools.
+    """
+
+    def __init__(self, latency_ms: float = 5):
+        self.latency_ms = latency_ms
+        self.driver = object()  # Tools only check that a driver exists
+        self.mentions: Counter = Counter()
+        self.summaries = 0
+
+    def store_summaries(self, summaries):
+        time.sleep(self.latency_ms / 1000)
+        for _text, _metadata, entities in summaries:
+            self.summaries += 1
+            self.mentions.update((entity["type"], entity["name"]) for entity in entities)
+
+    def store_summary_intelligence(self, summary_text, metadata, entities):
+        self.store_summaries([(summary_text, metadata, entities)])
+
+    def _top(self) -> List[Dict[str, Any]]:
+        return [
+            {"type": label, "name": name, "mentions": count}
+            for (label, name), count in self.mentions.most_common(10)
+        ]
+
+    async def arun_query(self, cypher_query: str, **params):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._top()
@@ -0,0 +1,91 @@
+import sys
+import os
+import asyncio
+import time
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage
+
+from app.orchestration import prefetch
+
+DELAY = 0.3
+
+def _slow_tools(monkeypatch):
+    async def slow_search(query, **filters):
+        await asyncio.sleep(DELAY)
+        return f"evidence for {query}"
+
+    async def slow_graph(cypher_query):
+        await asyncio.sleep(DELAY)
+        return "[{'name': 'Battery', 'mentions': 12}]"
+
+    def slow_themes():
+        time.sleep(DELAY)
+        return "Battery drain dominates."
+
+    monkeypatch.setattr(prefetch.search_vector_memory, "coroutine", slow_search)
+    monkeypatch.setattr(prefetch.query_graph_memory, "coroutine", slow_graph)
+    monkeypatch.setattr(prefetch.fetch_global_themes, "func", slow_themes)
+
+def test_prefetch_runs_lookups_concurrently(monkeypatch):
+    print("\n--- Testing Parallel Evidence Prefetch ---")
+    _slow_tools(monkeypatch)
+    state = {"messages": [HumanMessage(content="How is the battery?")]}
+
+    started = time.perf_counter()
+    evidence = asyncio.run(prefetch.aprefetch_node(state))
+    elapsed = time.perf_counter() - started
+    print(f"Prefetch took {elapsed:.2f}s for three {DELAY}s lookups")
+
+    assert elapsed < 2 * DELAY
+    assert evidence["vector_evidence"] == "evidence for How is the battery?"
+    assert evidence["global_themes"] == "Battery drain dominates."
+    assert "Battery" in evidence["graph_evidence"]
+
+    prompt = prefetch.format_evidence(evidence)
+    assert "Battery drain dominates." in prompt and "evidence for" in prompt
+    assert prefetch.format_evidence({}) == ""
+    print("✅ Vector, theme and graph lookups overlapped and were rendered into the prompt.")
+
+def test_sync_prefetch_runs_lookups_concurrently(monkeypatch):
+    print("\n--- Testing Parallel Evidence Prefetch (sync path) ---")
+    _slow_tools(monkeypatch)
+
+    def slow_search(query, **filters):
+        time.sleep(DELAY)
+        return f"evidence for {query}"
+
+    def slow_graph(cypher_query):
+        time.sleep(DELAY)
+        return "[{'name': 'Battery', 'mentions': 12}]"
+
+    monkeypatch.setattr(prefetch.search_vector_memory, "func", slow_search)
+    monkeypatch.setattr(prefetch.query_graph_memory, "func", slow_graph)
+
+    started = time.perf_counter()
+    evidence = prefetch.prefetch_node({"question": "battery?"})
+    elapsed = time.perf_counter() - started
+    assert elapsed < 2 * DELAY
+    assert evidence == {
+        "vector_evidence": "evidence for battery?",
+        "global_themes": "Battery drain dominates.",
+        "graph_evidence": "[{'name': 'Battery', 'mentions': 12}]",
+    }
+    print("✅ The thread-pool prefetch overlapped the three lookups.")
+
+def test_failed_lookup_does_not_block_the_rest(monkeypatch):
+    _slow_tools(monkeypatch)
+
+    async def broken_search(query, **filters):
+        raise ConnectionError("qdrant down")
+
+    monkeypatch.setattr(prefetch.search_vector_memory, "coroutine", broken_search)
+    evidence = asyncio.run(prefetch.aprefetch_node({"question": "battery?"}))
+    assert evidence["vector_evidence"].startswith("Unavailable")
+    assert evidence["global_themes"] == "Battery drain dominates."
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+
+import numpy as np
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.orchestration.answer_cache import AnswerCache
+
+# Paraphrases share a direction; unrelated questions are orthogonal
+VECTORS = {
+    "What are users saying about battery life?": [1.0, 0.0, 0.0],
+    "what do users say about the battery life": [0.98, 0.2, 0.0],
+    "Which features do people like?": [0.0, 0.0, 1.0],
+}
+
+def _encode(texts):
+    return np.array([VECTORS[t] for t in texts], dtype=np.float32)
+
+def test_paraphrase_hits_and_unrelated_misses():
+    print("\n--- Testing Semantic Answer Cache ---")
+    cache = AnswerCache(encode=_encode, threshold=0.9, ttl=60)
+
+    hit, vector, generation = cache.lookup("What are users saying about battery life?")
+    assert hit is None
+    assert cache.store("What are users saying about battery life?", vector, "Battery drains fast.", ["trace"], generation)
+
+    hit, _, _ = cache.lookup("what do users say about the battery life")
+    assert hit is not None and hit["answer"] == "Battery drains fast." and hit["trace"] == ["trace"]
+    assert hit["matched_question"] == "What are users saying about battery life?"
+
+    hit, _, _ = cache.lookup("Which features do people like?")
+    assert hit is None
+
+    stats = cache.stats()
+    print(f"Cache stats: {stats}")
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["entries"] == 1
+    print("✅ Reworded question was served from cache; unrelated one went to the agent.")
+
+def test_ingest_invalidates_and_ttl_expires():
+    print("\n--- Testing Answer Cache Invalidation ---")
+    cache = AnswerCache(encode=_encode, threshold=0.9, ttl=60)
+    question = "What are users saying about battery life?"
+
+    # An answer computed before an ingest finished must not be cached
+    _, vector, generation = cache.lookup(question)
+    cache.invalidate()
+    assert not cache.store(question, vector, "stale answer", [], generation)
+    assert cache.lookup(question)[0] is None
+
+    _, vector, generation = cache.lookup(question)
+    cache.store(question, vector, "fresh answer", [], generation)
+    cache.ttl = 0.05
+    time.sleep(0.1)
+    assert cache.lookup(question)[0] is None
+    assert cache.stats()["expired"] == 1
+    print("✅ Invalidated and expired answers were not served.")
+
+if __name__ == "__main__":
+    test_paraphrase_hits_and_unrelated_misses()
+    test_ingest_invalidates_and_ttl_expires()
@@ -0,0 +1,55 @@
+import sys
+import os
+import asyncio
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.orchestration.answer_cache import AnswerCache
+from tests.test_chat_stream import ScriptedModel
+
+class AsyncOnlyModel(ScriptedModel):
+    """ScriptedModel that fails if the agent falls back to a blocking LLM call."""
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise AssertionError("blocking LLM call on the async path")
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+def test_ainvoke_uses_async_llm_and_tools(monkeypatch):
+    print("\n--- Testing Async Agent Path ---")
+    # The graph module refuses to load without a key; scoped so live tests stay skipped
+    monkeypatch.setenv("GROQ_API_KEY", os.getenv("GROQ_API_KEY", "test-key"))
+    from app.orchestration import graph
+
+    llm = AsyncOnlyModel(script=[
+        AIMessage(content="", tool_calls=[{"name": "query_graph_memory", "args": {"cypher_query": "RETURN 1"}, "id": "call_1"}]),
+        AIMessage(content="The graph is offline."),
+    ])
+    monkeypatch.setattr(graph, "llm_with_tools", llm)
+
+    def blocking_tool(cypher_query):
+        raise AssertionError("blocking tool call on the async path")
+    monkeypatch.setattr(graph.query_graph_memory, "func", blocking_tool)
+
+    agent = graph.build_graph(prefetch=False)
+    result = asyncio.run(agent.ainvoke({"messages": [HumanMessage(content="Any graph issues?")], "question": "Any graph issues?", "steps": []}))
+    tool_output = [m.content for m in result["messages"] if getattr(m, "type", "") == "tool"]
+    print(f"Tool output: {tool_output}")
+    assert tool_output == ["Graph DB not connected"]
+    assert result["messages"][-1].content == "The graph is offline."
+    print("✅ LLM and tool calls went through their async implementations.")
+
+def test_answer_cache_async_lookup():
+    cache = AnswerCache(encode=lambda texts: np.ones((len(texts), 3), dtype=np.float32), threshold=0.9)
+    hit, vector, generation = asyncio.run(cache.alookup("anything"))
+    assert hit is None
+    cache.store("anything", vector, "answer", [], generation)
+    assert asyncio.run(cache.alookup("anything else"))[0]["answer"] == "answer"
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
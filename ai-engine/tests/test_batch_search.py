@@ -0,0 +1,106 @@
+import sys
+import os
+import asyncio
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.memory.vector import client as vector_client
+from app.memory.vector.client import VectorDatabase
+from app.processing import embedder
+
+TOPICS = ["battery", "screen", "shipping"]
+
+def _vector(topic):
+    vector = np.zeros(384)
+    vector[TOPICS.index(topic)] = 1.0
+    return vector.tolist()
+
+class _CountingEncoder:
+    """Maps each topic word to its own axis and counts model calls."""
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        return np.array([_vector(next(t for t in TOPICS if t in text)) for text in texts])
+
+    async def aencode(self, texts, **kwargs):
+        return self.encode(texts)
+
+def _store():
+    docs, vectors = [], []
+    for topic in TOPICS:
+        for source in ("amazon", "reddit"):
+            docs.append(Document(page_content=f"{source} {topic} complaint", metadata={"type": "chunk", "source": source}))
+            vectors.append(_vector(topic))
+    db = VectorDatabase(collection_name="test_batch_search")
+    db.upsert_documents(docs, vectors)
+    return db
+
+def _count_round_trips(db):
+    calls = {"query_points": 0, "query_batch_points": 0}
+    for name in calls:
+        real = getattr(db.client, name)
+        def counted(*args, _real=real, _name=name, **kwargs):
+            calls[_name] += 1
+            return _real(*args, **kwargs)
+        setattr(db.client, name, counted)
+    return calls
+
+def test_search_batch_matches_individual_searches():
+    print("\n--- Testing Batched Vector Search ---")
+    db = _store()
+    vectors = [_vector(topic) for topic in TOPICS]
+    expected = [db.search(vector, limit=2) for vector in vectors]
+
+    calls = _count_round_trips(db)
+    results = db.search_batch(vectors, limit=2)
+    assert calls == {"query_points": 0, "query_batch_points": 1}
+    assert [[hit["content"] for hit in hits] for hits in results] == [[hit["content"] for hit in hits] for hits in expected]
+    assert asyncio.run(db.asearch_batch(vectors, limit=2)) == results
+
+    # One filter for all queries, or one per query
+    shared = db.search_batch(vectors, limit=5, filters={"source": "reddit"})
+    assert all(hit["metadata"]["source"] == "reddit" for hits in shared for hit in hits)
+    per_query = db.search_batch(vectors[:2], limit=5, filters=[{"source": "amazon"}, None])
+    assert {hit["metadata"]["source"] for hit in per_query[0]} == {"amazon"}
+    assert {hit["metadata"]["source"] for hit in per_query[1]} == {"amazon", "reddit"}
+
+    assert db.search_batch([]) == []
+    try:
+        db.search_batch(vectors, filters=[{"source": "amazon"}])
+        assert False, "a filter list must have one entry per query"
+    except ValueError:
+        pass
+    print("✅ N queries went out as one batch request with the same hits as N searches.")
+
+def test_batch_tool_encodes_once(monkeypatch):
+    print("\n--- Testing search_vector_memory_batch ---")
+    from app.abilities.tools import search_vector_memory_batch
+
+    db = _store()
+    encoder = _CountingEncoder()
+    monkeypatch.setattr(vector_client, "_vector_db", db)
+    monkeypatch.setattr(embedder, "_embedding_service", encoder)
+    calls = _count_round_trips(db)
+
+    args = {"queries": ["battery life?", "screen glare?", "shipping delays?"], "source": "amazon"}
+    output = search_vector_memory_batch.invoke(args)
+    print(output)
+    assert encoder.calls == 1 and calls == {"query_points": 0, "query_batch_points": 1}
+    for query, topic in zip(args["queries"], TOPICS):
+        # Each group starts with its own best match
+        assert f"Query: {query}\n['amazon {topic} complaint'" in output
+    assert "reddit" not in output
+
+    assert asyncio.run(search_vector_memory_batch.ainvoke(args)) == output
+    assert encoder.calls == 2
+    print("✅ One encode and one Qdrant request served three sub-questions.")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,85 @@
+import sys
+import os
+import asyncio
+from typing import Any, List
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import tool
+from langgraph.graph import StateGraph, MessagesState
+from langgraph.prebuilt import ToolNode, tools_condition
+
+from app.orchestration.streaming import stream_agent_events, format_sse
+
+@tool
+def search_vector_memory(query: str) -> str:
+    """Search for semantically similar feedback."""
+    return "Battery drains fast."
+
+class ScriptedModel(BaseChatModel):
+    """Replays canned AI messages, streaming answers word by word like ChatGroq."""
+    script: List[Any]
+
+    @property
+    def _llm_type(self):
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=self.script.pop(0))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self.script.pop(0)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": c["name"], "args": '{"query": "battery"}', "id": c["id"], "index": 0}
+                for c in message.tool_calls
+            ]))
+            return
+        for word in message.content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+def _agent():
+    llm = ScriptedModel(script=[
+        AIMessage(content="", tool_calls=[{"name": "search_vector_memory", "args": {"query": "battery"}, "id": "call_1"}]),
+        AIMessage(content="Users report battery drain."),
+    ])
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("agent", lambda state: {"messages": [llm.invoke(state["messages"])]})
+    workflow.add_node("tools", ToolNode([search_vector_memory]))
+    workflow.set_entry_point("agent")
+    workflow.add_conditional_edges("agent", tools_condition)
+    workflow.add_edge("tools", "agent")
+    return workflow.compile()
+
+def test_agent_events_stream_in_order():
+    print("\n--- Testing Streaming Chat Events ---")
+
+    async def collect():
+        return [e async for e in stream_agent_events(_agent(), {"messages": [HumanMessage(content="battery?")]})]
+
+    events = asyncio.run(collect())
+    kinds = [kind for kind, _ in events]
+    print(f"Events: {kinds}")
+
+    # Tool activity is visible before the answer, and answer tokens arrive incrementally
+    assert kinds[:2] == ["tool_call", "tool_result"]
+    assert events[0][1] == {"name": "search_vector_memory", "input": {"query": "battery"}}
+    assert events[1][1]["output"] == "Battery drains fast."
+    assert kinds.count("token") == 4
+    assert kinds[-1] == "final"
+    assert events[-1][1]["answer"].strip() == "Users report battery drain."
+    print("✅ Tool calls, tool results and tokens were emitted as they happened.")
+
+def test_sse_framing():
+    assert format_sse("token", {"text": "hi"}) == 'event: token\ndata: {"text": "hi"}\n\n'
+
+if __name__ == "__main__":
+    test_agent_events_stream_in_order()
+    test_sse_framing()
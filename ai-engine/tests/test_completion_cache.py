@@ -0,0 +1,90 @@
+import sys
+import os
+import asyncio
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_groq import ChatGroq
+
+from app.processing import completion_cache, llm_gateway
+from app.processing.completion_cache import CompletionCache, CompletionCacheMiss, completion_key
+from app.processing.llm_gateway import GatewayChatGroq, GatewayLM, LLMGateway
+import dspy
+
+def test_size_based_eviction_keeps_recent_entries(tmp_path):
+    print("\n--- Testing Completion Cache Eviction ---")
+    cache = CompletionCache(path=str(tmp_path / "llm_cache.db"), max_bytes=2000)
+    payload = "x" * 400
+    keys = [completion_key("test", {"prompt": i}) for i in range(8)]
+    for i, key in enumerate(keys):
+        cache.put(key, "test", payload)
+        cache.get(keys[0])  # Keep the first entry hot
+
+    stats = cache.stats()
+    print(f"Cache stats: {stats}")
+    assert stats["bytes"] <= 2000 and stats["evictions"] > 0
+    assert cache.get(keys[0]) == payload
+    assert cache.get(keys[-1]) == payload
+    assert cache.get(keys[1]) is None
+
+    # Entries survive a restart
+    reopened = CompletionCache(path=str(tmp_path / "llm_cache.db"))
+    assert reopened.get(keys[-1]) == payload
+    print("✅ Least recently used completions were evicted once over budget.")
+
+def test_record_then_replay_chat(tmp_path, monkeypatch):
+    print("\n--- Testing ChatGroq Record/Replay ---")
+    path = str(tmp_path / "llm_cache.db")
+    monkeypatch.setattr(llm_gateway, "_llm_gateway", LLMGateway(requests_per_minute=600, tokens_per_minute=100000))
+    calls = []
+
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        calls.append(messages[-1].content)
+        message = AIMessage(content=f"Answer to: {messages[-1].content}", id=f"run-{len(calls)}")
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"token_usage": {"total_tokens": 12}, "model_name": "llama"})
+
+    monkeypatch.setattr(ChatGroq, "_agenerate", fake_agenerate)
+    llm = GatewayChatGroq(model_name="llama-3.1-8b-instant", api_key="test-key", max_retries=0, temperature=0)
+
+    monkeypatch.setattr(completion_cache, "_completion_cache", CompletionCache(path=path, mode="record"))
+    recorded = asyncio.run(llm.ainvoke([HumanMessage(content="battery?")]))
+    assert calls == ["battery?"]
+
+    # Replay serves the recording without calling Groq; unseen prompts fail loudly
+    monkeypatch.setattr(completion_cache, "_completion_cache", CompletionCache(path=path, mode="replay"))
+    replayed = asyncio.run(llm.ainvoke([HumanMessage(content="battery?")]))
+    assert replayed.content == recorded.content and calls == ["battery?"]
+    try:
+        asyncio.run(llm.ainvoke([HumanMessage(content="something new")]))
+        assert False, "expected a replay miss"
+    except CompletionCacheMiss:
+        pass
+    assert calls == ["battery?"]
+
+    # Streaming replays the same completion as a single chunk
+    chunks = list(llm.stream([HumanMessage(content="battery?")]))
+    assert "".join(c.content for c in chunks) == recorded.content
+    print("✅ Recorded completions replayed offline for invoke and stream.")
+
+def test_dspy_calls_share_the_cache(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "_llm_gateway", LLMGateway(requests_per_minute=600, tokens_per_minute=100000))
+    monkeypatch.setattr(completion_cache, "_completion_cache", CompletionCache(path=""))
+    calls = []
+
+    def fake_call(self, prompt=None, *, messages=None, **kwargs):
+        calls.append(messages)
+        return ["Battery drain is the top theme."]
+
+    monkeypatch.setattr(dspy.LM, "__call__", fake_call)
+    lm = GatewayLM("groq/llama-3.1-8b-instant", api_key="secret")
+    messages = [{"role": "user", "content": "Summarize: battery drains."}]
+    assert lm(messages=messages) == lm(messages=messages) == ["Battery drain is the top theme."]
+    assert len(calls) == 1
+    assert completion_cache.get_completion_cache().stats()["hits"] == 1
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,64 @@
+import sys
+import os
+import threading
+
+import numpy as np
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.processing.embedder import EmbeddingService
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer: embeds a text as [len(text), 1.0]."""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def encode(self, texts, batch_size=32):
+        self.batch_sizes.append(len(texts))
+        assert [len(t) for t in texts] == sorted(len(t) for t in texts), "inputs should be length-sorted"
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+def test_concurrent_encodes_are_coalesced():
+    print("\n--- Testing Shared Embedding Service Micro-Batching ---")
+    service = EmbeddingService(max_batch_size=64, max_wait_ms=50)
+    service._model = FakeModel()
+
+    queries = [f"query {'x' * (i % 7)} {i}" for i in range(20)]
+    results = {}
+
+    def worker(i):
+        results[i] = service.encode([queries[i]])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(queries))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every caller gets its own embedding back, in order
+    for i, query in enumerate(queries):
+        assert results[i].shape == (1, 2)
+        assert results[i][0][0] == len(query)
+
+    stats = service.stats()
+    print(f"Batches: {service._model.batch_sizes} | Stats: {stats}")
+    assert stats["requests"] == len(queries)
+    assert stats["batches"] < len(queries)
+    print("✅ Concurrent encode calls were coalesced into micro-batches.")
+
+def test_multi_text_request_keeps_order():
+    service = EmbeddingService(max_wait_ms=0)
+    service._model = FakeModel()
+
+    texts = ["a much longer piece of feedback", "short", "medium text"]
+    embeddings = service.encode(texts)
+    assert [row[0] for row in embeddings] == [len(t) for t in texts]
+    assert service.encode([]).shape == (0, 2)
+
+if __name__ == "__main__":
+    test_concurrent_encodes_are_coalesced()
+    test_multi_text_request_keeps_order()
@@ -0,0 +1,56 @@
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.processing.embedding_cache import EmbeddingCache, cache_key
+from app.processing.embedder import EmbeddingService
+from tests.test_embedder import FakeModel
+
+def test_cache_persists_and_evicts():
+    print("\n--- Testing Persistent Embedding Cache ---")
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    cache = EmbeddingCache(path=path, memory_items=2, disk_items=3)
+
+    vectors = {cache_key("m", f"text {i}"): np.full(4, i, dtype=np.float32) for i in range(5)}
+    for key, vector in vectors.items():
+        cache.put_many({key: vector})
+
+    # Only the 2 most recent vectors stay in memory; the disk tier was trimmed back under its limit
+    assert cache.stats()["memory_items"] == 2
+    assert cache.stats()["evictions"] > 0
+
+    # A fresh process sees what was written to disk
+    reopened = EmbeddingCache(path=path, memory_items=2, disk_items=3)
+    last_key = cache_key("m", "text 4")
+    found = reopened.get_many([last_key, cache_key("m", "never stored")])
+    assert np.array_equal(found[last_key], vectors[last_key])
+    stats = reopened.stats()
+    print(f"Stats: {stats}")
+    assert stats["disk_hits"] == 1 and stats["misses"] == 1
+    print("✅ Cache survives restarts and respects its size limits.")
+
+def test_cache_key_normalizes_text():
+    assert cache_key("m", "Battery  dies\nfast ") == cache_key("m", "Battery dies fast")
+    assert cache_key("m", "Battery dies fast") != cache_key("other-model", "Battery dies fast")
+
+def test_service_skips_model_for_cached_texts():
+    service = EmbeddingService(max_wait_ms=0, cache=EmbeddingCache(path=""))
+    service._model = FakeModel()
+
+    first = service.encode(["battery drain", "camera crash", "battery drain"])
+    second = service.encode(["camera crash", "battery  drain"])
+
+    assert service._model.batch_sizes == [2]  # Only the two distinct texts were ever encoded
+    assert np.array_equal(first[0], first[2])
+    assert np.array_equal(second[0], first[1]) and np.array_equal(second[1], first[0])
+    assert service.stats()["cache"]["memory_hits"] == 2
+
+if __name__ == "__main__":
+    test_cache_persists_and_evicts()
+    test_cache_key_normalizes_text()
+    test_service_skips_model_for_cached_texts()
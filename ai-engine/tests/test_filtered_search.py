@@ -0,0 +1,111 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.routes.ingest import normalize_items
+from app.api.schemas import NormalizedFeedback
+from app.memory.vector import client as vector_client
+from app.memory.vector.client import VectorDatabase, build_filter
+from app.processing import embedder
+from app.processing.chunker import FeedbackChunker
+from app.processing.ingestor import IngestionService
+
+NOW = datetime.now(timezone.utc)
+VECTOR = [1.0] + [0.0] * 383  # Every point is equally similar; only the filter decides
+
+class _ConstantEncoder:
+    def encode(self, texts, **kwargs):
+        return np.array([VECTOR] * len(texts))
+
+    async def aencode(self, texts, **kwargs):
+        return self.encode(texts)
+
+def _store():
+    feedback = [
+        NormalizedFeedback(source="amazon", content="Battery died in a day.", rating=1.0, timestamp=NOW - timedelta(days=2)),
+        NormalizedFeedback(source="amazon", content="Battery is fine, love it.", rating=5.0, timestamp=NOW - timedelta(days=3)),
+        NormalizedFeedback(source="amazon", content="Old complaint about battery.", rating=1.0, timestamp=NOW - timedelta(days=40)),
+        NormalizedFeedback(source="reddit", content="Battery terrible, 1 star.", rating=1.0, timestamp=NOW - timedelta(days=1)),
+    ]
+    docs = FeedbackChunker().chunk_feedback(feedback)
+    # A chunk stored before raw chunks carried a type still counts as a chunk
+    untyped = Document(page_content="Legacy chunk.", metadata={"source": "amazon", "rating": 1.0})
+    summary = Document(page_content="Summary: battery complaints.", metadata={"type": "rlm_summary"})
+    db = VectorDatabase(collection_name="test_filtered_search")
+    db.upsert_documents(docs + [untyped, summary], [VECTOR] * (len(docs) + 2))
+    return db
+
+def test_search_filters():
+    print("\n--- Testing Filtered Vector Search ---")
+    db = _store()
+
+    def contents(**filters):
+        return sorted(hit["content"] for hit in db.search(VECTOR, limit=10, filters=filters))
+
+    assert contents(source="amazon", max_rating=1, since="7d") == ["Battery died in a day."]
+    assert contents(source=["amazon", "reddit"], max_rating=1, since=(NOW - timedelta(days=7)).isoformat()) == [
+        "Battery died in a day.", "Battery terrible, 1 star."
+    ]
+    assert contents(min_rating=4) == ["Battery is fine, love it."]
+    assert contents(until="30d") == ["Old complaint about battery."]
+    assert contents(doc_type="rlm_summary") == ["Summary: battery complaints."]
+    assert "Legacy chunk." in contents(doc_type="chunk")
+    assert "Summary: battery complaints." not in contents(doc_type="chunk")
+
+    parent_id = db.search(VECTOR, limit=10, filters={"source": "reddit"})[0]["metadata"]["parent_id"]
+    assert contents(parent_id=parent_id) == ["Battery terrible, 1 star."]
+
+    assert build_filter() is None
+    print("✅ Source, rating, time range, type and parent_id filters select the right points.")
+
+class _NoAnswerCache:
+    def invalidate(self):
+        pass
+
+def test_json_upload_timestamps_drive_time_filters():
+    print("\n--- Testing Time Filters on JSON /ingest Items ---")
+    service = IngestionService.__new__(IngestionService)
+    service.chunker = FeedbackChunker()
+    service.vector_db = VectorDatabase(collection_name="test_filtered_json_upload")
+    service.embedder = _ConstantEncoder()
+    service.answer_cache = _NoAnswerCache()
+
+    items = normalize_items([
+        {"source": "amazon", "content": "Screen cracked this week.", "timestamp": (NOW - timedelta(days=2)).isoformat()},
+        {"source": "amazon", "content": "Screen cracked last quarter.", "timestamp": (NOW - timedelta(days=90)).isoformat()},
+        {"source": "amazon", "content": "Screen cracked, no date."},
+        {"source": "amazon", "content": "Screen cracked, bad date.", "timestamp": "sometime in May"},
+    ])
+    assert [item.timestamp_inferred for item in items] == [False, False, True, True]
+    service.ingest_raw(items)
+
+    recent = service.vector_db.search(VECTOR, limit=10, filters={"since": "7d"})
+    # The 90-day-old review keeps its own date; items without a usable one count as just received
+    assert sorted(hit["content"] for hit in recent) == [
+        "Screen cracked this week.", "Screen cracked, bad date.", "Screen cracked, no date."
+    ]
+    print("✅ Client timestamps survived normalize_items and ingest into the time filters.")
+
+def test_search_tool_passes_filters(monkeypatch):
+    print("\n--- Testing search_vector_memory Filters ---")
+    from app.abilities.tools import search_vector_memory
+
+    monkeypatch.setattr(vector_client, "_vector_db", _store())
+    monkeypatch.setattr(embedder, "_embedding_service", _ConstantEncoder())
+
+    args = {"query": "battery", "source": "amazon", "max_rating": 1, "since": "7d", "doc_type": "", "until": None}
+    assert search_vector_memory.invoke(args) == str(["Battery died in a day."])
+    assert asyncio.run(search_vector_memory.ainvoke(args)) == str(["Battery died in a day."])
+    assert search_vector_memory.invoke({"query": "battery", "since": "last week"}).startswith("Invalid search filter")
+    print("✅ The agent tool forwards filters (sync and async) and reports bad ones.")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -9,6 +9,119 @@ from app.memory.vector.client import VectorDatabase
 from langchain_core.documents import Document
 from sentence_transformers import SentenceTransformer
 import time
+import random
+import threading
+
+class TreeRLM:
+    """Stands in for RLMFeedbackAnalyzer and records the size of every call."""
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def analyze(self, feedback_items):
+        with self.lock:
+            self.calls.append(len(feedback_items))
+        return {
+            'themes': ['battery'],
+            'critical_issues': [],
+            'sentiment': 'negative',
+            'hierarchical_summary': f"merged {len(feedback_items)}"
+        }
+
+def test_map_reduce_covers_full_corpus():
+    print("\n--- Testing Map-Reduce Global Aggregation ---")
+    vector_db = VectorDatabase(collection_name="test_global_map_reduce")
+    docs = [
+        Document(page_content=f"Summary {i}: battery drains.", metadata={"type": "rlm_summary" if i % 2 else "summary"})
+        for i in range(250)
+    ]
+    noise = [Document(page_content="A raw chunk.", metadata={"type": "chunk"})]
+    vectors = [[random.random() for _ in range(384)] for _ in range(len(docs) + 1)]
+    vector_db.upsert_documents(docs + noise, vectors)
+
+    # Pagination goes past the old 100-point cap and ignores other point types
+    payloads = list(vector_db.iter_by_metadata("type", ["rlm_summary", "summary"], page_size=64))
+    assert len(payloads) == 250
+
+    rlm = TreeRLM()
+    aggregator = GlobalAggregator(vector_db=vector_db, rlm=rlm, group_size=10, max_concurrency=4)
+    report = aggregator.run_aggregation()
+
+    # 250 summaries -> 25 groups -> 3 groups -> 1 report
+    assert sorted(rlm.calls) == sorted([10] * 25 + [10, 10, 5] + [3])
+    assert report == "merged 3"
+    print("✅ Every summary reached the reduce tree in log-depth levels.")
+
+class FlakyRLM(TreeRLM):
+    """Fails the group that contains a poisoned summary."""
+    def analyze(self, feedback_items):
+        if any("poisoned" in item['content'] for item in feedback_items):
+            raise RuntimeError("rlm timed out")
+        return super().analyze(feedback_items)
+
+def test_failed_group_falls_back_to_partials():
+    print("\n--- Testing Aggregation With a Failing Group ---")
+    items = [{'content': f"Summary {i}", 'rating': None, 'source': 'test', 'timestamp': None} for i in range(9)]
+    items[4]['content'] = "Summary 4 (poisoned)"
+    rlm = FlakyRLM()
+    report = GlobalAggregator(vector_db=object(), rlm=rlm, group_size=3).reduce(items)
+
+    # Groups 1 and 3 merged; group 2 reached the top level as its raw summaries, which then fail again
+    assert rlm.calls == [3, 3]
+    assert "Summary 3" in report and "Summary 5" in report and "merged 3" in report
+    print("✅ The failed group's inputs were carried up instead of aborting the report.")
+
+def test_group_size_below_two_is_rejected():
+    for size in (0, 1):
+        try:
+            GlobalAggregator(vector_db=object(), rlm=TreeRLM(), group_size=size)
+            assert False, "group sizes below 2 never finish reducing"
+        except ValueError:
+            pass
+
+class _Trajectory:
+    def __init__(self, lm):
+        self.trajectory = [{"lm": lm}]
+        self.analysis = {"themes": [], "critical_issues": [], "sentiment": "mixed", "hierarchical_summary": "ok"}
+
+def test_ingestion_and_aggregation_built_on_different_threads(monkeypatch):
+    print("\n--- Testing RLM Setup Across Threads ---")
+    import dspy
+    from app.processing import ingestor, rlm_agent
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(rlm_agent, "_rlm_analyzer", None)
+    monkeypatch.setattr(ingestor, "get_vector_db", lambda: VectorDatabase(collection_name="test_rlm_threads"))
+    monkeypatch.setattr(ingestor, "get_graph_db", lambda: None)
+    monkeypatch.setattr(ingestor, "get_embedding_service", lambda: None)
+    monkeypatch.setattr(ingestor, "get_theme_report_store", lambda: None)
+
+    # The ingestion service warms on one thread, the theme report refresh builds its aggregator on another
+    built, errors = {}, []
+    def build(name, factory):
+        try:
+            built[name] = factory()
+        except Exception as e:
+            errors.append(e)
+    threads = [
+        threading.Thread(target=build, args=("ingestion", ingestor.IngestionService)),
+        threading.Thread(target=build, args=("aggregation", lambda: GlobalAggregator(vector_db=object()))),
+    ]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    assert not errors, errors
+    analyzer = built["ingestion"].rlm
+    assert built["aggregation"].rlm is analyzer  # One analyzer and LM per process
+
+    # Analysis on a third thread runs against the analyzer's LM without touching dspy.configure
+    seen = []
+    analyzer.rlm = lambda feedback_items: _Trajectory(seen.append(dspy.settings.lm) or dspy.settings.lm)
+    worker = threading.Thread(target=lambda: analyzer.analyze([{"content": "Battery drains."}]))
+    worker.start()
+    worker.join()
+    assert seen == [analyzer.lm]
+    print("✅ Both paths share one RLM analyzer, whichever thread built it.")
 
 def test_global_aggregation_live():
     print("\n--- Testing Layer 3 Level 2: Global Aggregation (Live) ---")
@@ -60,4 +173,7 @@ def test_global_aggregation_live():
          pass
 
 if __name__ == "__main__":
+    test_map_reduce_covers_full_corpus()
+    test_failed_group_falls_back_to_partials()
+    test_group_size_below_two_is_rejected()
     test_global_aggregation_live()
@@ -0,0 +1,113 @@
+import sys
+import os
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.memory.vector import client as vector_client
+from app.memory.vector.client import VectorDatabase
+from app.processing import embedder, grouping
+from app.processing.grouping import agglomerative_groups, group_embeddings, streaming_groups
+
+THRESHOLD = 0.7
+
+def _topics(n, topics=12, noise=0.03, seed=3):
+    """Unit vectors scattered tightly around `topics` random directions (like feedback about distinct issues)."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(topics, 384))
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    labels = rng.integers(0, topics, n)
+    vectors = centroids[labels] + rng.normal(scale=noise, size=(n, 384))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32), labels
+
+def _partition(groups):
+    return sorted(sorted(group) for group in groups)
+
+class _RefusingEncoder:
+    def encode(self, texts, **kwargs):
+        raise AssertionError("stored or supplied vectors should have been reused")
+
+def test_streaming_grouping_matches_agglomerative():
+    print("\n--- Testing Streaming Similarity Grouping ---")
+    vectors, labels = _topics(1500)
+
+    exact = agglomerative_groups(vectors, THRESHOLD)
+    streamed = streaming_groups(vectors, THRESHOLD, batch_size=128)
+    print(f"Agglomerative: {len(exact)} groups, streaming: {len(streamed)} groups")
+    assert _partition(streamed) == _partition(exact)
+    assert _partition(streamed) == _partition([np.flatnonzero(labels == t).tolist() for t in set(labels)])
+
+    # Same threshold semantics: no two final groups are similar enough to merge
+    means = np.stack([vectors[group].mean(axis=0) for group in streamed])
+    average_link = means @ means.T
+    np.fill_diagonal(average_link, -1)
+    assert average_link.max() < THRESHOLD
+
+    # Unrelated items stay apart, and the dispatcher switches engines by size
+    noise = np.random.default_rng(0).normal(size=(50, 384))
+    assert len(streaming_groups(noise, THRESHOLD)) == 50
+    assert _partition(group_embeddings(vectors, THRESHOLD, exact_max=0)) == _partition(exact)
+    assert group_embeddings(vectors[:1], THRESHOLD) == [[0]]
+    print("✅ Streaming grouping reproduced the agglomerative groups without an n x n matrix.")
+
+def test_streaming_grouping_caps_clusters_on_low_cohesion_input(monkeypatch):
+    print("\n--- Testing the Streaming Cluster Limit ---")
+    merge = grouping._merge_clusters
+    sizes = []
+
+    def recording_merge(sums, counts, *args):
+        sizes.append(len(counts))
+        return merge(sums, counts, *args)
+
+    monkeypatch.setattr(grouping, "_merge_clusters", recording_merge)
+
+    # Random vectors: no pair reaches the threshold, so without a limit every item is its own cluster
+    noise = np.random.default_rng(1).normal(size=(1000, 384))
+    groups = streaming_groups(noise, THRESHOLD, batch_size=100, max_clusters=64)
+    assert len(groups) == 64
+    assert sorted(idx for group in groups for idx in group) == list(range(1000))
+    # Each batch is compared with at most limit + batch clusters, however many items came before
+    assert sizes and max(sizes) <= 64 + 100
+
+    # Real topics below the limit are not affected by it
+    vectors, labels = _topics(800)
+    assert _partition(streaming_groups(vectors, THRESHOLD, batch_size=100, max_clusters=64)) == _partition(
+        [np.flatnonzero(labels == t).tolist() for t in set(labels)]
+    )
+    print("✅ Low-cohesion input was merged down to the cluster limit instead of growing quadratically.")
+
+def test_group_by_similarity_reuses_vectors(monkeypatch):
+    print("\n--- Testing Embedding Reuse in group_by_similarity ---")
+    from app.processing.rlm_agent import RLMHelperTools
+
+    vectors, labels = _topics(60, topics=3)
+    texts = [f"topic {label} feedback {i}" for i, label in enumerate(labels)]
+    monkeypatch.setattr(embedder, "_embedding_service", _RefusingEncoder())
+    tools = RLMHelperTools()
+
+    groups = tools.group_by_similarity(texts, THRESHOLD, embeddings=vectors)
+    assert len(groups) == 3
+    assert all(len({text.split()[1] for text in group}) == 1 for group in groups)
+
+    # Stored chunks are grouped with the vectors Qdrant already holds
+    db = VectorDatabase(collection_name="test_grouping_stored")
+    docs = [
+        Document(page_content=text, metadata={"type": "chunk", "source": "amazon" if i % 2 else "reddit"})
+        for i, text in enumerate(texts)
+    ]
+    db.upsert_documents(docs + [Document(page_content="A summary.", metadata={"type": "rlm_summary"})],
+                        vectors.tolist() + [vectors[0].tolist()])
+    monkeypatch.setattr(vector_client, "_vector_db", db)
+
+    stored = tools.group_stored_feedback(THRESHOLD)
+    assert _partition(stored) == _partition(groups)
+    amazon = tools.group_stored_feedback(THRESHOLD, source="amazon")
+    assert sum(len(group) for group in amazon) == 30 and len(amazon) == 3
+    print("✅ Groups were built from supplied and stored vectors with no re-encoding.")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,132 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.processing.ingestor import IngestionService
+from app.orchestration.answer_cache import AnswerCache
+from app.processing.chunker import FeedbackChunker
+from app.memory.vector.client import VectorDatabase
+from app.api.schemas import NormalizedFeedback
+from datetime import datetime
+
+STAGE_DELAY = 0.3
+
+class SlowEmbedder:
+    def encode(self, texts):
+        time.sleep(STAGE_DELAY)
+        return np.random.rand(len(texts), 384).astype(np.float32)
+
+class SlowRLM:
+    def analyze(self, feedback_data):
+        time.sleep(STAGE_DELAY)
+        return {
+            "themes": ["battery"],
+            "critical_issues": ["battery drain"],
+            "sentiment": "negative",
+            "hierarchical_summary": "Battery drain dominates the feedback."
+        }
+
+class FakeGraph:
+    def __init__(self):
+        self.calls = []
+
+    def store_summary_intelligence(self, summary_text, metadata, entities):
+        self.calls.append((summary_text, metadata["summary_id"], len(entities)))
+
+class FakeThemeReports:
+    def __init__(self):
+        self.dirty = 0
+
+    def mark_dirty(self):
+        self.dirty += 1
+
+def _service():
+    service = IngestionService.__new__(IngestionService)  # Stub out LLM, model and graph
+    service.chunker = FeedbackChunker()
+    service.vector_db = VectorDatabase(collection_name="test_ingest_pipeline")
+    service.rlm = SlowRLM()
+    service.graph_db = FakeGraph()
+    service.embedder = SlowEmbedder()
+    service.theme_reports = FakeThemeReports()
+    service.answer_cache = AnswerCache(encode=lambda texts: None)
+    service.executor = ThreadPoolExecutor(max_workers=4)
+    return service
+
+def test_chunk_storage_overlaps_rlm_analysis():
+    print("\n--- Testing Concurrent Ingest Pipeline ---")
+    service = _service()
+    items = [
+        NormalizedFeedback(source="amazon", content=f"Battery complaint number {i}.", timestamp=datetime.now(), rating=1.0)
+        for i in range(5)
+    ]
+    events = []
+    result = service.ingest(items, on_stage=lambda stage, status, **info: events.append((stage, status)))
+
+    timings = result["timings"]
+    print(f"Timings: {timings}")
+
+    # Sequential would be embed + RLM + summary embed = 3 delays; overlapped is ~2
+    assert timings["total"] < 2.7 * STAGE_DELAY
+    assert result["chunk_count"] == 5 and result["summary_count"] == 1
+    for stage in ["chunking", "embedding", "upsert", "rlm_analysis", "summary_storage", "graph_storage"]:
+        assert (stage, "completed") in events, stage
+        assert stage in timings
+    assert service.graph_db.calls[0][2] == 2
+    assert service.theme_reports.dirty == 1  # New summary invalidates the global report
+    assert service.answer_cache.stats()["invalidations"] == 1  # New feedback invalidates cached chat answers
+    assert service.vector_db.client.count(service.vector_db.collection_name).count == 6
+    print("✅ Chunk embedding/upsert ran while RLM analysis was in flight.")
+
+class StageAwareCache(AnswerCache):
+    """Records which stages had completed whenever the cache was invalidated."""
+    def __init__(self, events):
+        super().__init__(encode=lambda texts: None)
+        self.events = events
+        self.seen = []
+
+    def invalidate(self):
+        self.seen.append({stage for stage, status in self.events if status == "completed"})
+        super().invalidate()
+
+def test_answer_cache_invalidated_after_follow_ups():
+    print("\n--- Testing Answer Cache Invalidation Timing ---")
+    service = _service()
+    service.vector_db = VectorDatabase(collection_name="test_ingest_cache_timing")
+    events = []
+    service.answer_cache = StageAwareCache(events)
+    items = [NormalizedFeedback(source="amazon", content="Battery dies by noon.", timestamp=datetime.now())]
+    service.ingest(items, on_stage=lambda stage, status, **info: events.append((stage, status)))
+
+    # An answer cached before the summary and graph rows land would never be invalidated again
+    assert len(service.answer_cache.seen) == 1
+    assert {"upsert", "summary_storage", "graph_storage"} <= service.answer_cache.seen[0]
+    print("✅ Cached answers were dropped once the summary and graph writes had finished.")
+
+class TextRLM:
+    def analyze(self, feedback_data):
+        return "Battery drain dominates the feedback."  # dspy handed back free text
+
+def test_non_dict_analysis_does_not_leave_stage_running():
+    print("\n--- Testing Free-Text RLM Result ---")
+    service = _service()
+    service.vector_db = VectorDatabase(collection_name="test_ingest_text_rlm")
+    service.rlm = TextRLM()
+    items = [NormalizedFeedback(source="amazon", content="Battery dies by noon.", timestamp=datetime.now())]
+    states = {}
+    result = service.ingest(items, on_stage=lambda stage, status, **info: states.__setitem__(stage, status))
+
+    assert "running" not in states.values(), states
+    assert states["rlm_analysis"] == "completed" and states["summary_storage"] == "completed"
+    assert result["hierarchical_summary"] == "Battery drain dominates the feedback."
+    print("✅ The text result was normalized and every stage finished.")
+
+if __name__ == "__main__":
+    test_chunk_storage_overlaps_rlm_analysis()
+    test_answer_cache_invalidated_after_follow_ups()
+    test_non_dict_analysis_does_not_leave_stage_running()
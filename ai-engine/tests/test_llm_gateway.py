@@ -0,0 +1,127 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_groq import ChatGroq
+
+from app.processing import llm_gateway, completion_cache
+from app.processing.completion_cache import CompletionCache
+from app.processing.llm_gateway import LLMGateway, GatewayChatGroq, retry_after_seconds
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def test_interactive_lane_jumps_the_queue():
+    print("\n--- Testing LLM Gateway Priority Lanes ---")
+    gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=100000)  # 10 requests/sec
+    gateway.requests.level = 0  # Quota exhausted: everyone has to queue
+    order = []
+
+    def caller(lane, name):
+        gateway.call(lambda: order.append(name), lane=lane)
+
+    threads = [threading.Thread(target=caller, args=("batch", f"batch-{i}")) for i in range(3)]
+    for t in threads:
+        t.start()
+        time.sleep(0.01)  # Queue the batch calls in a known order
+    time.sleep(0.03)  # Batch work is already waiting when the chat request arrives
+    chat = threading.Thread(target=caller, args=("interactive", "chat"))
+    chat.start()
+    for t in threads + [chat]:
+        t.join()
+
+    print(f"Admission order: {order}")
+    assert order[0] == "chat"
+    assert order[1:] == ["batch-0", "batch-1", "batch-2"]
+    stats = gateway.stats()
+    assert stats["lanes"]["batch"]["throttled"] == 3 and stats["queued"] == 0
+    print("✅ The interactive call was admitted ahead of queued batch calls.")
+
+def test_rate_limit_is_retried_after_server_delay():
+    print("\n--- Testing LLM Gateway Retry-After ---")
+    gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=100000)
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise FakeRateLimitError("Rate limit reached", retry_after=0.2)
+        return "ok"
+
+    assert gateway.call(flaky, lane="interactive") == "ok"
+    assert attempts[1] - attempts[0] >= 0.2
+    lane = gateway.stats()["lanes"]["interactive"]
+    assert lane["retries"] == 1 and lane["rate_limited"] == 1 and lane["failures"] == 0
+    print("✅ The 429 was queued for the server-requested delay instead of failing.")
+
+def test_non_transient_errors_are_not_retried():
+    gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=100000)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    try:
+        gateway.call(broken)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert len(calls) == 1
+    assert gateway.stats()["lanes"]["batch"]["failures"] == 1
+
+def test_async_calls_share_the_budget():
+    gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=100000, max_retries=2)
+    gateway.requests.level = 0
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FakeRateLimitError("429 Too Many Requests", retry_after=0.05)
+        return "done"
+
+    started = time.monotonic()
+    assert asyncio.run(gateway.acall(flaky, lane="interactive")) == "done"
+    assert time.monotonic() - started >= 0.15  # Waited for a request token, then the Retry-After
+
+def test_chat_groq_goes_through_gateway(monkeypatch):
+    gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=100000)
+    monkeypatch.setattr(llm_gateway, "_llm_gateway", gateway)
+    monkeypatch.setattr(completion_cache, "_completion_cache", CompletionCache(path="", mode="off"))
+    responses = [FakeRateLimitError("429", retry_after=0.01), "Battery drain."]
+
+    async def fake_agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=response))])
+
+    monkeypatch.setattr(ChatGroq, "_agenerate", fake_agenerate)
+    llm = GatewayChatGroq(model_name="llama-3.1-8b-instant", api_key="test-key", max_retries=0)
+    assert asyncio.run(llm.ainvoke("What do users say?")).content == "Battery drain."
+    lane = gateway.stats()["lanes"]["interactive"]
+    assert lane["calls"] == 2 and lane["rate_limited"] == 1
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(Exception("Rate limit reached. Please try again in 1m2.5s.")) == 62.5
+    assert retry_after_seconds(Exception("Please try again in 450ms")) == 0.45
+    assert retry_after_seconds(Exception("no hint")) is None
+
+if __name__ == "__main__":
+    test_interactive_lane_jumps_the_queue()
+    test_rate_limit_is_retried_after_server_delay()
+    test_non_transient_errors_are_not_retried()
+    test_async_calls_share_the_budget()
+    test_retry_after_parsing()
@@ -0,0 +1,146 @@
+import sys
+import os
+import csv
+import glob
+
+import json
+
+import numpy as np
+import pytest
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.processing import onnx_encoder
+from app.processing.embedder import EmbeddingService, DEFAULT_EMBEDDING_MODEL
+
+TEST_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'test_data'))
+
+# Minimum per-sentence cosine between each ONNX backend and the PyTorch SentenceTransformer
+PARITY = {"onnx": 0.9999, "onnx-int8": 0.98}
+
+def _sentences():
+    texts = []
+    for path in sorted(glob.glob(os.path.join(TEST_DATA, "*.csv"))):
+        with open(path, newline="", encoding="utf-8") as f:
+            texts.extend(row["content"] for row in csv.DictReader(f))
+    return texts
+
+def test_backend_setting_and_cache_namespaces():
+    print("\n--- Testing Embedding Backend Selection ---")
+    assert EmbeddingService(backend="torch").cache_namespace == DEFAULT_EMBEDDING_MODEL
+    # fp32 ONNX reproduces the PyTorch vectors, so it can reuse their cache entries; int8 can't
+    assert EmbeddingService(backend="onnx").cache_namespace == DEFAULT_EMBEDDING_MODEL
+    assert EmbeddingService(backend="onnx-int8").cache_namespace != DEFAULT_EMBEDDING_MODEL
+    try:
+        EmbeddingService(backend="tensorrt")
+        assert False, "unknown backends should be rejected"
+    except ValueError:
+        pass
+    print("✅ Backends are validated and int8 vectors are cached separately.")
+
+WORDS = "the battery life is terrible camera quality amazing app crashes on sync love it".split()
+
+def _tiny_model(directory):
+    """
+    Writes a toy encoder (token embedding -> dense -> tanh) in the hub repo layout
+    and returns its weights, so the expected sentence vectors can be computed in numpy.
+    """
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers
+    from tokenizers.processors import TemplateProcessing
+
+    vocab = {token: i for i, token in enumerate(["[PAD]", "[UNK]", "[CLS]", "[SEP]"] + WORDS)}
+    tokenizer = Tokenizer(models.WordPiece(vocab, unk_token="[UNK]"))
+    tokenizer.normalizer = normalizers.BertNormalizer(lowercase=True)
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.post_processor = TemplateProcessing(single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)])
+    os.makedirs(os.path.join(directory, "onnx"))
+    tokenizer.save(os.path.join(directory, "tokenizer.json"))
+    with open(os.path.join(directory, "sentence_bert_config.json"), "w") as f:
+        json.dump({"max_seq_length": 16}, f)
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(len(vocab), 32)).astype(np.float32)
+    dense = rng.normal(scale=0.3, size=(32, 32)).astype(np.float32)
+    inputs = [
+        helper.make_tensor_value_info(name, TensorProto.INT64, ["batch", "sequence"])
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+    ]
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["embeddings", "input_ids"], ["tokens"]),
+            helper.make_node("MatMul", ["tokens", "dense"], ["hidden"]),
+            helper.make_node("Tanh", ["hidden"], ["last_hidden_state"]),
+        ],
+        "tiny_encoder",
+        inputs,
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", 32])],
+        initializer=[numpy_helper.from_array(embeddings, "embeddings"), numpy_helper.from_array(dense, "dense")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, os.path.join(directory, onnx_encoder.ONNX_MODEL_FILE))
+    return tokenizer, embeddings, dense
+
+def test_onnx_encoder_pools_and_normalizes_tiny_model(tmp_path, monkeypatch):
+    print("\n--- Testing ONNX Encoder on a Local Tiny Model ---")
+    pytest.importorskip("onnxruntime")
+    directory = str(tmp_path / "tiny-encoder")
+    tokenizer, embeddings, dense = _tiny_model(directory)
+    monkeypatch.setattr(onnx_encoder, "ONNX_CACHE_DIR", str(tmp_path / "cache"))
+
+    texts = ["The battery life is terrible", "love it", "app crashes on sync", "camera quality amazing"]
+    expected = []
+    for text in texts:
+        pooled = np.tanh(embeddings[tokenizer.encode(text).ids] @ dense).mean(axis=0)
+        expected.append(pooled / np.linalg.norm(pooled))
+    expected = np.stack(expected)
+
+    encoder = onnx_encoder.OnnxSentenceEncoder(directory)
+    assert encoder.max_seq_length == 16 and encoder.get_sentence_embedding_dimension() == 32
+
+    # Batches of 3 pad short sentences; padding must not leak into the mean
+    vectors = encoder.encode(texts, batch_size=3)
+    assert vectors.shape == (4, 32) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(vectors, expected, atol=1e-5)
+    assert np.allclose(encoder.encode("love it"), expected[1:2], atol=1e-5)
+    assert encoder.encode([]).shape == (0, 32)
+
+    quantized = onnx_encoder.OnnxSentenceEncoder(directory, quantize=True)
+    assert quantized.model_path.startswith(str(tmp_path / "cache"))
+    cosines = np.sum(quantized.encode(texts) * expected, axis=1)
+    print(f"int8 cosine vs fp32: min {cosines.min():.5f}")
+    assert cosines.min() >= 0.99
+    print("✅ Mean pooling over the attention mask and L2 normalization match numpy.")
+
+def test_onnx_matches_sentence_transformer_on_test_data():
+    print("\n--- Testing ONNX Embedding Parity (test_data) ---")
+    pytest.importorskip("onnxruntime")
+
+    texts = _sentences()
+    try:
+        reference = EmbeddingService(backend="torch").get_model().encode(texts, batch_size=32)
+        backends = {name: EmbeddingService(backend=name).get_model() for name in PARITY}
+    except Exception as e:
+        pytest.skip(f"Could not load {DEFAULT_EMBEDDING_MODEL} (offline?): {e}")
+
+    for name, model in backends.items():
+        vectors = model.encode(texts, batch_size=32)
+        assert vectors.shape == reference.shape
+        cosines = np.sum(vectors * reference, axis=1) / (
+            np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1)
+        )
+        print(f"{name}: min cosine {cosines.min():.5f}, mean {cosines.mean():.5f} over {len(texts)} sentences")
+        assert cosines.min() >= PARITY[name]
+
+        # Retrieval must not change: every sentence keeps the same nearest neighbour
+        same = (vectors @ vectors.T - 2 * np.eye(len(texts))).argmax(axis=1)
+        expected = (reference @ reference.T - 2 * np.eye(len(texts))).argmax(axis=1)
+        assert (same == expected).mean() >= 0.9
+    print("✅ ONNX fp32 and int8 embeddings agree with the PyTorch model.")
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q", "-s"])
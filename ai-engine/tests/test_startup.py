@@ -0,0 +1,138 @@
+import sys
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import startup
+from app.startup import Warmup
+
+def _slow(seconds, value="ok"):
+    def load():
+        time.sleep(seconds)
+        return value
+    return load
+
+def _broken():
+    raise RuntimeError("no credentials")
+
+def test_components_warm_in_parallel_and_failures_are_reported():
+    print("\n--- Testing Parallel Warmup ---")
+    warmup = Warmup(
+        components={"vector_db": _slow(0.3), "agent": _slow(0.3), "embedding_model": _slow(0.3), "graph_db": _broken},
+        required=["vector_db", "agent", "embedding_model"],
+    )
+    assert not warmup.ready and warmup.status()["components"]["agent"]["state"] == "cold"
+
+    started = time.perf_counter()
+    assert warmup.start() and not warmup.start()
+    assert warmup.wait(timeout=5)
+    elapsed = time.perf_counter() - started
+
+    status = warmup.status()
+    print(f"Warmed 3 x 0.3s components in {elapsed:.2f}s: {status['components']}")
+    assert elapsed < 0.6  # Side by side, not 0.9s in sequence
+    assert status["ready"] and status["ready_after_seconds"] is not None
+    assert status["components"]["graph_db"]["state"] == "failed"
+    assert "no credentials" in status["components"]["graph_db"]["error"]
+    assert not status["components"]["graph_db"]["required"]
+    assert warmup.value("agent") == "ok" and warmup.value("graph_db") is None
+    print("✅ Components warmed concurrently; an optional failure did not block readiness.")
+
+def test_failed_component_is_retried_until_ready():
+    print("\n--- Testing Warmup Retry After a Transient Failure ---")
+    attempts = []
+
+    def flaky_model():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise TimeoutError("huggingface.co timed out")
+        return "model"
+
+    warmup = Warmup(components={"embedding_model": flaky_model}, required=["embedding_model"], retry_backoff=0.05)
+    warmup.start()
+    assert warmup.wait(timeout=5)
+    status = warmup.status()
+    assert not status["ready"] and status["components"]["embedding_model"]["state"] in ("failed", "warming")
+
+    deadline = time.time() + 5
+    while not warmup.ready and time.time() < deadline:
+        time.sleep(0.01)
+    assert warmup.ready and warmup.value("embedding_model") == "model"
+    assert warmup.status()["components"]["embedding_model"]["attempt"] == 3
+    print(f"✅ Readiness recovered after {len(attempts)} attempts.")
+
+def test_liveness_and_readiness_probes():
+    print("\n--- Testing Health Probes ---")
+    from app.api.routes import health
+
+    api = FastAPI()
+    api.include_router(health.router)
+    client = TestClient(api)
+
+    previous = startup._warmup
+    startup._warmup = Warmup(components={"vector_db": _slow(0.2), "graph_db": _broken}, required=["vector_db"])
+    try:
+        assert client.get("/health/live").json() == {"status": "ok"}
+        response = client.get("/health/ready")
+        assert response.status_code == 503 and not response.json()["ready"]
+
+        startup._warmup.start()
+        startup._warmup.wait(timeout=5)
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["components"]["vector_db"]["state"] == "ready"
+
+        # /health reports a failed graph client without trying to connect again
+        body = client.get("/health").json()
+        assert body["neo4j"] == {"connected": None, "state": "failed"}
+    finally:
+        startup._warmup = previous
+    print("✅ Liveness answered immediately; readiness flipped to 200 once warm.")
+
+def test_shutdown_closes_async_clients(monkeypatch):
+    print("\n--- Testing Async Client Shutdown ---")
+    import app.main as main
+    from app.memory.graph import client as graph_client
+    from app.memory.vector import client as vector_client
+
+    closed = []
+
+    class _Client:
+        def __init__(self, name):
+            self.name = name
+
+        async def aclose(self):
+            closed.append(self.name)
+
+    monkeypatch.setattr(main, "WARMUP_ON_STARTUP", False)
+    monkeypatch.setattr(vector_client, "_vector_db", _Client("qdrant"))
+    monkeypatch.setattr(graph_client, "_graph_db", _Client("neo4j"))
+    with TestClient(main.app) as client:
+        assert client.get("/health/live").status_code == 200
+        assert closed == []
+    assert closed == ["qdrant", "neo4j"]
+    print("✅ The AsyncQdrantClient and the async Neo4j driver were closed on shutdown.")
+
+def test_job_queue_opens_on_first_use(monkeypatch, tmp_path):
+    print("\n--- Testing Lazy Ingest Job Queue ---")
+    import app.main as main
+    from app.api.routes import ingest
+
+    monkeypatch.setenv("INGEST_JOBS_DB", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(ingest, "_job_queue", None)
+    monkeypatch.setattr(main, "WARMUP_ON_STARTUP", False)
+
+    with TestClient(main.app) as client:
+        assert ingest._job_queue is None and not (tmp_path / "jobs.db").exists()  # Startup touched neither
+        assert client.get("/ingest/jobs/unknown").status_code == 404
+    assert ingest._job_queue is not None and (tmp_path / "jobs.db").exists()
+    print("✅ The jobs database and workers were created by the first request, not at import.")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
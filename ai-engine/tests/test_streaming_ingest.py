@@ -0,0 +1,150 @@
+import sys
+import os
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.routes import ingest as ingest_routes
+from app.memory.graph.client import GraphWriteBuffer
+from app.processing import streaming
+from app.processing.streaming import iter_lines, iter_csv_records, iter_ndjson_records, iter_feedback_windows
+
+TEST_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'test_data'))
+
+async def _byte_stream(data: bytes, chunk_size: int):
+    # Tiny chunks force lines, quoted fields and UTF-8 characters to straddle chunk boundaries
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+async def _collect(data: bytes, fmt: str, window_size: int, chunk_size: int = 7):
+    stats = {}
+    lines = iter_lines(_byte_stream(data, chunk_size))
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+    windows = [w async for w in iter_feedback_windows(records, window_size, stats)]
+    return windows, stats
+
+def test_stream_csv_windows():
+    print("\n--- Testing Streaming CSV Ingest Parsing ---")
+    with open(os.path.join(TEST_DATA, "feedback_batch_1.csv"), "rb") as f:
+        data = f.read()
+
+    windows, stats = asyncio.run(_collect(data, "csv", window_size=4))
+    print(f"Windows: {[len(w) for w in windows]} | Stats: {stats}")
+
+    assert [len(w) for w in windows] == [4, 4, 2]
+    assert stats["rows_accepted"] == 10 and stats["rows_rejected"] == 0
+    first = windows[0][0]
+    assert first.source == "amazon"
+    assert first.rating == 2.0
+    assert first.metadata["verified_purchase"] is True
+    print("✅ CSV rows parsed incrementally into fixed-size windows.")
+
+def test_stream_ndjson_rejects_bad_rows():
+    print("\n--- Testing Streaming NDJSON Validation ---")
+    data = "\n".join([
+        '{"source": "reddit", "content": "Battery drains overnight — annoying", "rating": 1}',
+        'not json',
+        '{"source": "amazon", "content": ""}',
+        '{"content": "Great camera", "Region": "EU"}',
+    ]).encode("utf-8")
+
+    windows, stats = asyncio.run(_collect(data, "ndjson", window_size=10, chunk_size=3))
+    items = [item for w in windows for item in w]
+    print(f"Accepted: {len(items)} | Errors: {stats['errors']}")
+
+    assert len(items) == 2
+    assert "—" in items[0].content
+    assert items[1].metadata == {"Region": "EU"}
+    assert [e["line"] for e in stats["errors"]] == [2, 3]
+    print("✅ Invalid rows were rejected without aborting the stream.")
+
+def test_stream_oversized_records_are_rejected(monkeypatch):
+    print("\n--- Testing Oversized Streaming Records ---")
+    monkeypatch.setattr(streaming, "MAX_RECORD_CHARS", 100)
+    huge = '{"content": "' + "x" * 500 + '"}'
+
+    # A huge NDJSON line is dropped and reported; the lines around it still parse
+    data = "\n".join(['{"content": "before"}', huge, '{"content": "after"}']).encode("utf-8")
+    windows, stats = asyncio.run(_collect(data, "ndjson", window_size=10))
+    assert [item.content for w in windows for item in w] == ["before", "after"]
+    assert stats["rows_rejected"] == 1 and stats["errors"][0]["line"] == 2
+    assert "exceeds 100 characters" in stats["errors"][0]["error"]
+
+    # A final line without a newline is capped too
+    windows, stats = asyncio.run(_collect(b'{"content": "ok"}\n' + huge.encode("utf-8"), "ndjson", window_size=10))
+    assert [item.content for w in windows for item in w] == ["ok"]
+    assert stats["rows_rejected"] == 1
+
+    # Same for CSV: a long line, and a quoted field that never closes
+    data = ("content,rating\nshort,4\n" + "y" * 500 + ",1\nfine,5\n").encode("utf-8")
+    windows, stats = asyncio.run(_collect(data, "csv", window_size=10))
+    assert [item.content for w in windows for item in w] == ["short", "fine"]
+    assert [e["line"] for e in stats["errors"]] == [3]
+
+    data = ("content,rating\nshort,4\n\"open" + "\nz" * 200).encode("utf-8")
+    windows, stats = asyncio.run(_collect(data, "csv", window_size=10))
+    assert [item.content for w in windows for item in w] == ["short"]
+    assert stats["rows_rejected"] >= 1 and stats["errors"][0]["line"] == 3
+    print("✅ Oversized records were rejected and counted in the stream stats.")
+
+def test_stream_csv_multiline_quoted_field():
+    print("\n--- Testing Multi-line Quoted CSV Fields ---")
+    body = "\n".join(f'line {i} said ""hi""' for i in range(50))
+    data = f'content,rating\n"{body}",3\nnext,4\n'.encode("utf-8")
+    windows, stats = asyncio.run(_collect(data, "csv", window_size=10))
+    items = [item for w in windows for item in w]
+    assert [item.rating for item in items] == [3.0, 4.0]
+    assert items[0].content.count('"hi"') == 50 and stats["rows_rejected"] == 0
+    print("✅ Quoted fields spanning many lines were reassembled.")
+
+class _BrokenGraph:
+    def store_summaries(self, batch):
+        if batch:
+            raise ConnectionError("neo4j unavailable")
+
+class _BufferingIngestor:
+    """Stores every window and buffers one summary per window, failing on the window after `fail_after`."""
+    def __init__(self, fail_after=None):
+        self.graph_db = _BrokenGraph()
+        self.fail_after = fail_after
+        self.windows = 0
+
+    def ingest(self, items, graph_buffer: GraphWriteBuffer = None):
+        self.windows += 1
+        if self.fail_after is not None and self.windows > self.fail_after:
+            raise RuntimeError("Rate limit reached (429)")
+        graph_buffer.add("summary", {"summary_id": str(self.windows)}, [])
+        return {"chunk_count": len(items)}
+
+def _stream_client(monkeypatch, ingestor):
+    monkeypatch.setattr(ingest_routes, "get_ingestor", lambda: ingestor)
+    app = FastAPI()
+    app.include_router(ingest_routes.router)
+    return TestClient(app)
+
+def test_stream_flush_failures_keep_stats(monkeypatch):
+    print("\n--- Testing Graph Flush Failures in Streaming Ingest ---")
+    data = "\n".join(f'{{"content": "Battery complaint {i}"}}' for i in range(6)).encode("utf-8")
+
+    # Every window succeeded, but the final flush failed: a 500 that still carries the stats
+    client = _stream_client(monkeypatch, _BufferingIngestor())
+    response = client.post("/ingest/stream?format=ndjson&window_size=2&analyze=true", content=data)
+    detail = response.json()["detail"]
+    assert response.status_code == 500 and "neo4j unavailable" in detail["error"]
+    assert detail["windows"] == 3 and detail["chunks_stored"] == 6 and detail["graph_flushed"] is False
+
+    # A failing window is reported as itself, not masked by the flush that follows it
+    client = _stream_client(monkeypatch, _BufferingIngestor(fail_after=1))
+    response = client.post("/ingest/stream?format=ndjson&window_size=2&analyze=true", content=data)
+    detail = response.json()["detail"]
+    assert response.status_code == 429 and "Rate limit" in detail["error"]
+    assert detail["windows"] == 1 and detail["graph_flushed"] is False
+    print("✅ Flush errors were reported with the window and chunk stats.")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
@@ -0,0 +1,96 @@
+import sys
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import telemetry
+from app.api.middleware import trace_requests
+from app.telemetry import MetricsRegistry, SPAN_SECONDS, current_trace_id, in_current_context, span, traced
+
+def test_spans_share_trace_across_threads_and_tasks():
+    print("\n--- Testing Span Propagation ---")
+    pool = ThreadPoolExecutor(max_workers=2)
+
+    @traced("test.async_child")
+    async def async_child():
+        return current_trace_id()
+
+    with span("test.root") as root:
+        with span("test.child") as child:
+            assert child.trace_id == root.trace_id and child.parent_id == root.span_id
+        in_thread = pool.submit(in_current_context(current_trace_id)).result()
+        unbound = pool.submit(current_trace_id).result()
+        in_task = asyncio.run(async_child())
+
+    assert in_thread == root.trace_id and in_task == root.trace_id
+    assert unbound is None
+    assert current_trace_id() is None
+    assert SPAN_SECONDS.count(span="test.async_child", status="ok") >= 1
+    print("✅ Child spans, executor threads and coroutines joined the caller's trace.")
+
+def test_failed_span_is_counted_as_error():
+    before = SPAN_SECONDS.count(span="test.failing", status="error")
+    try:
+        with span("test.failing"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert SPAN_SECONDS.count(span="test.failing", status="error") == before + 1
+
+def test_prometheus_exposition():
+    print("\n--- Testing /metrics Rendering ---")
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests.", ("route",))
+    latency = registry.histogram("demo_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(route='/chat"x')
+    latency.observe(0.05, route="/chat")
+    latency.observe(0.5, route="/chat")
+
+    text = registry.render()
+    assert '# TYPE demo_requests_total counter' in text
+    assert 'demo_requests_total{route="/chat\\"x"} 1' in text
+    assert 'demo_seconds_bucket{route="/chat",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/chat",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{route="/chat",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{route="/chat"} 2' in text
+    print("✅ Counters and cumulative histogram buckets render in the text format.")
+
+def test_middleware_returns_trace_id_and_continues_traceparent():
+    print("\n--- Testing Request Tracing Middleware ---")
+    app = FastAPI()
+    app.middleware("http")(trace_requests)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with span("test.handler"):
+            return {"item": item_id, "trace_id": current_trace_id()}
+
+    client = TestClient(app)
+    response = client.get("/items/1")
+    assert response.headers["X-Trace-Id"] == response.json()["trace_id"]
+    assert len(response.headers["X-Trace-Id"]) == 32
+
+    incoming = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = client.get("/items/2", headers={"traceparent": f"00-{incoming}-00f067aa0ba902b7-01"})
+    assert response.headers["X-Trace-Id"] == incoming
+
+    # Metrics are keyed by route template, not by the raw path
+    assert telemetry.HTTP_REQUESTS.value(method="GET", route="/items/{item_id}", status=200) >= 2
+    client.get("/items/3")
+    client.get("/probe/admin.php")
+    spans = {key[0] for key in SPAN_SECONDS._series}
+    assert "GET /items/{item_id}" in spans and "GET unmatched" in spans
+    assert not any(name.startswith(("GET /items/1", "GET /items/3", "GET /probe")) for name in spans)
+    print("✅ Responses carry the trace ID and honor an incoming traceparent.")
+
+if __name__ == "__main__":
+    test_spans_share_trace_across_threads_and_tasks()
+    test_failed_span_is_counted_as_error()
+    test_prometheus_exposition()
+    test_middleware_returns_trace_id_and_continues_traceparent()
@@ -0,0 +1,139 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.processing.theme_report import ThemeReportStore
+
+class CountingAggregator:
+    def __init__(self):
+        self.runs = 0
+
+    def run_aggregation(self):
+        self.runs += 1
+        time.sleep(0.05)
+        return f"Report #{self.runs}: battery drain dominates."
+
+def _wait_for_refresh(store, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and store._refreshing:
+        time.sleep(0.01)
+
+def _store(aggregator, **kwargs):
+    path = os.path.join(tempfile.mkdtemp(), "reports.db")
+    return ThemeReportStore(aggregator.run_aggregation, path=path, **kwargs)
+
+def test_report_is_served_from_store():
+    print("\n--- Testing Materialized Global Theme Report ---")
+    aggregator = CountingAggregator()
+    store = _store(aggregator, ttl=3600, min_interval=0)
+
+    first = store.get()  # Nothing materialized yet: returns immediately and builds in the background
+    assert first["report"] is None and first["stale"]
+    _wait_for_refresh(store)
+
+    started = time.perf_counter()
+    for _ in range(50):
+        cached = store.get()
+    elapsed_ms = 1000 * (time.perf_counter() - started) / 50
+    print(f"Cached read: {elapsed_ms:.3f} ms | {cached}")
+    assert cached["report"].startswith("Report #1") and not cached["stale"]
+    assert cached["age_seconds"] is not None
+    assert aggregator.runs == 1
+    print("✅ Tool reads no longer re-run the aggregation.")
+
+class GatedAggregator:
+    """Blocks each build until released, and records how many ran at once."""
+    def __init__(self):
+        self.runs = 0
+        self.running = 0
+        self.max_running = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def run_aggregation(self):
+        self.runs += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.entered.set()
+        self.release.wait(2.0)
+        self.running -= 1
+        return f"Report #{self.runs}: battery drain dominates."
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline and not condition():
+        time.sleep(0.01)
+    return condition()
+
+def test_new_summaries_trigger_one_follow_up_refresh():
+    aggregator = GatedAggregator()
+    aggregator.release.set()
+    store = _store(aggregator, ttl=3600, min_interval=0)
+    store.refresh()
+
+    # A burst of ingests while a refresh is running coalesces into one follow-up build
+    aggregator.release.clear()
+    aggregator.entered.clear()
+    store.mark_dirty()
+    assert aggregator.entered.wait(2.0)
+    for _ in range(4):
+        store.mark_dirty()
+    aggregator.release.set()
+    assert _wait_for(lambda: aggregator.runs == 3 and not store._refreshing)
+    time.sleep(0.1)
+    assert aggregator.runs == 3 and aggregator.max_running == 1
+    assert store.get()["version"] == 3
+
+def test_sync_refresh_joins_running_build():
+    print("\n--- Testing Refresh During a Background Build ---")
+    aggregator = GatedAggregator()
+    store = _store(aggregator, ttl=3600, min_interval=0)
+    assert store.refresh_in_background()
+    assert aggregator.entered.wait(2.0)
+
+    result = {}
+    caller = threading.Thread(target=lambda: result.update(store.refresh()))
+    caller.start()
+    time.sleep(0.1)
+    aggregator.release.set()
+    caller.join(2.0)
+
+    assert aggregator.runs == 1 and aggregator.max_running == 1
+    assert result["version"] == 1 and not store._refreshing
+    print("✅ refresh() waited for the running build instead of starting a second one.")
+
+class FailingAggregator:
+    def __init__(self):
+        self.runs = 0
+        self.failing = True
+
+    def run_aggregation(self):
+        self.runs += 1
+        if self.failing:
+            raise RuntimeError("groq unavailable")
+        return "Report: battery drain dominates."
+
+def test_failed_builds_back_off():
+    print("\n--- Testing Theme Report Retry Backoff ---")
+    aggregator = FailingAggregator()
+    store = _store(aggregator, ttl=3600, min_interval=0, retry_backoff=0.3, max_backoff=0.6)
+    store.mark_dirty()
+
+    # Without backoff a dirty store would rebuild immediately after every failure
+    time.sleep(0.15)
+    assert aggregator.runs == 1 and store.get()["failed_refreshes"] == 1
+    assert _wait_for(lambda: store._failures == 2) and aggregator.runs == 2
+    assert store._retry_interval() == 0.6  # Doubled, and capped by max_backoff
+    aggregator.failing = False  # Let the pending retry succeed so no timer outlives the test
+    print("✅ Consecutive failures retried after a growing delay.")
+
+if __name__ == "__main__":
+    test_report_is_served_from_store()
+    test_new_summaries_trigger_one_follow_up_refresh()
+    test_sync_refresh_joins_running_build()
+    test_failed_builds_back_off()
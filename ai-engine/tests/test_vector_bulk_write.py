@@ -0,0 +1,57 @@
+import sys
+import os
+import random
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.memory.vector.client import VectorDatabase
+from app.processing.chunker import FeedbackChunker
+from app.api.schemas import NormalizedFeedback
+from datetime import datetime
+
+def _documents(n):
+    items = [
+        NormalizedFeedback(source="amazon", content=f"Feedback number {i}: battery drains.", timestamp=datetime.now())
+        for i in range(n)
+    ]
+    return FeedbackChunker().chunk_feedback(items)
+
+def _vectors(n):
+    return [[random.random() for _ in range(384)] for _ in range(n)]
+
+def test_upsert_is_batched():
+    print("\n--- Testing Batched Qdrant Writes ---")
+    vector_db = VectorDatabase(collection_name="test_bulk_write")
+    docs = _documents(25)
+
+    stats = vector_db.upsert_documents(docs, _vectors(len(docs)), batch_size=10)
+    print(f"Write stats: {stats}")
+    assert stats["points"] == 25 and stats["batches"] == 3
+    assert vector_db.client.count(vector_db.collection_name).count == 25
+    print("✅ Points were written in fixed-size batches.")
+
+def test_failed_batch_is_retried():
+    print("\n--- Testing Per-Batch Retry ---")
+    vector_db = VectorDatabase(collection_name="test_bulk_retry")
+    vector_db.upsert_retries = 2
+    real_upsert = vector_db.client.upsert
+    calls = {"n": 0}
+
+    def flaky_upsert(**kwargs):
+        calls["n"] += 1
+        if calls["n"] == 2:  # Second batch fails once
+            raise ConnectionError("transient network error")
+        return real_upsert(**kwargs)
+
+    vector_db.client.upsert = flaky_upsert
+    docs = _documents(4)
+    stats = vector_db.upsert_documents(docs, _vectors(len(docs)), batch_size=2, wait=False)
+
+    assert stats["retries"] == 1
+    assert vector_db.client.count(vector_db.collection_name).count == 4
+    print("✅ Only the failed batch was re-sent, and the barrier saw every write.")
+
+if __name__ == "__main__":
+    test_upsert_is_batched()
+    test_failed_batch_is_retried()
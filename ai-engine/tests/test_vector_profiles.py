@@ -0,0 +1,62 @@
+import sys
+import os
+
+from qdrant_client.http import models
+
+# Ensure app imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.memory.vector.client import VectorDatabase, COLLECTION_PROFILES
+
+def test_profiles_and_search_params(monkeypatch):
+    print("\n--- Testing Qdrant Collection Profiles ---")
+    for name in ("QDRANT_HNSW_EF", "QDRANT_OVERSAMPLING", "QDRANT_RESCORE"):
+        monkeypatch.delenv(name, raising=False)
+
+    # The default profile sends no search parameters, exactly as before
+    assert VectorDatabase(collection_name="test_profile_default").search_params() is None
+
+    db = VectorDatabase(collection_name="test_profile_quantized", profile="quantized")
+    params = db.search_params()
+    assert params.hnsw_ef == 128
+    assert params.quantization.rescore and params.quantization.oversampling == 2.0
+
+    # Per-call arguments override the profile, and env settings override it at startup
+    params = db.search_params(hnsw_ef=512, oversampling=4.0, rescore=False)
+    assert params.hnsw_ef == 512 and params.quantization.oversampling == 4.0 and not params.quantization.rescore
+    monkeypatch.setenv("QDRANT_HNSW_EF", "64")
+    assert VectorDatabase(collection_name="test_profile_quantized", profile="quantized").search_params().hnsw_ef == 64
+
+    # The in-memory client searches exactly, so searches still work without parameters
+    db.upsert_documents([], [])
+    assert db.search([0.1] * 384, limit=3, hnsw_ef=256) == []
+
+    try:
+        VectorDatabase(collection_name="test_profile_bad", profile="binary")
+        assert False, "unknown profiles should be rejected"
+    except ValueError:
+        pass
+    print("✅ Profile search defaults apply and can be overridden per call.")
+
+def test_existing_collection_is_migrated_in_place():
+    print("\n--- Testing Collection Profile Migration ---")
+    db = VectorDatabase(collection_name="test_profile_migrate")  # Created with the default profile
+    db.profile_name, db.profile = "quantized", COLLECTION_PROFILES["quantized"]
+
+    drift = db.profile_drift()
+    print(f"Drift: {drift}")
+    assert drift["quantization"] == {"current": None, "wanted": "int8"}
+    assert drift["hnsw_ef_construct"]["wanted"] == 200
+
+    updates = []
+    db.client.update_collection = lambda **kwargs: updates.append(kwargs) or True
+    assert db.apply_profile() == drift
+    update = updates[0]
+    assert update["vectors_config"][""].on_disk is True
+    assert isinstance(update["quantization_config"], models.ScalarQuantization)
+    assert update["hnsw_config"].m == 16 and update["hnsw_config"].ef_construct == 200
+    print("✅ Drift was detected and fixed with one update_collection call (no re-upload).")
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q", "-s"])
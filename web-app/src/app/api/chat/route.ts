@@ -5,8 +5,10 @@ const BACKEND_URL = process.env.AI_ENGINE_URL || "http://127.0.0.1:8000";
 export async function POST(request: Request) {
     try {
         const body = await request.json();
+        // Clients asking for an event stream get the agent's SSE events relayed as they arrive
+        const wantsStream = (request.headers.get("accept") || "").includes("text/event-stream");
 
-        const res = await fetch(`${BACKEND_URL}/chat`, {
+        const res = await fetch(`${BACKEND_URL}/chat${wantsStream ? "/stream" : ""}`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify(body),
@@ -17,6 +19,19 @@ export async function POST(request: Request) {
             return NextResponse.json(errorData, { status: res.status });
         }
 
+        if (wantsStream && res.body) {
+            // Pass the body through untouched so each event is flushed to the browser immediately
+            return new Response(res.body, {
+                status: res.status,
+                headers: {
+                    "Content-Type": "text/event-stream",
+                    "Cache-Control": "no-cache, no-transform",
+                    "Connection": "keep-alive",
+                    "X-Accel-Buffering": "no",
+                },
+            });
+        }
+
         const data = await res.json();
         return NextResponse.json(data);
     } catch (error) {
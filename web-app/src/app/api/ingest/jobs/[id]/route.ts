@@ -0,0 +1,24 @@
+import { NextResponse } from "next/server";
+
+const BACKEND_URL = process.env.AI_ENGINE_URL || "http://127.0.0.1:8000";
+
+export async function GET(request: Request, { params }: { params: Promise<{ id: string }> }) {
+    try {
+        const { id } = await params;
+
+        const res = await fetch(`${BACKEND_URL}/ingest/jobs/${encodeURIComponent(id)}`, {
+            cache: "no-store",
+        });
+
+        if (!res.ok) {
+            const errorData = await res.json().catch(() => ({}));
+            return NextResponse.json(errorData, { status: res.status });
+        }
+
+        const data = await res.json();
+        return NextResponse.json(data);
+    } catch (error) {
+        console.error("Ingest Job Proxy Error:", error);
+        return NextResponse.json({ error: "Failed to connect to AI Engine" }, { status: 500 });
+    }
+}
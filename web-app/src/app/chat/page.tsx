@@ -2,7 +2,7 @@
 
 import { useState, useRef, useEffect } from "react";
 import { useMutation } from "@tanstack/react-query";
-import { chatWithAgent, ingestFeedback } from "@/services/api";
+import { streamChatWithAgent, ingestFeedback, ChatStreamEvent } from "@/services/api";
 import { Send, User, Bot, Loader2, Paperclip, FileText } from "lucide-react";
 import ReactMarkdown from "react-markdown";
 import { cn } from "@/lib/utils";
@@ -14,6 +14,9 @@ import ProgressIndicator from "@/components/ProgressIndicator";
 export default function ChatPage() {
     const [input, setInput] = useState("");
     const [uploadProgress, setUploadProgress] = useState<number | null>(null);
+    // Live agent progress while a streamed answer is being produced
+    const [streamStatus, setStreamStatus] = useState("Thinking...");
+    const [streamedText, setStreamedText] = useState("");
     const fileInputRef = useRef<HTMLInputElement>(null);
 
     const {
@@ -50,8 +53,24 @@ export default function ChatPage() {
     };
 
     // Chat Mutation with retry logic
+    const handleStreamEvent = ({ event, data }: ChatStreamEvent) => {
+        if (event === "tool_call") {
+            // Text before a tool call was the model thinking out loud, not the answer
+            setStreamedText("");
+            setStreamStatus(`Running ${data.name}...`);
+        } else if (event === "tool_result") {
+            setStreamStatus("Thinking...");
+        } else if (event === "token") {
+            setStreamedText((prev) => prev + data.text);
+        }
+    };
+
     const chatMutation = useMutation({
-        mutationFn: chatWithAgent,
+        mutationFn: (question: string) => {
+            setStreamStatus("Thinking...");
+            setStreamedText("");
+            return streamChatWithAgent(question, handleStreamEvent);
+        },
         retry: 2,
         retryDelay: (attemptIndex) => Math.min(1000 * 2 ** attemptIndex, 3000),
         onSuccess: (data) => {
@@ -200,10 +219,18 @@ export default function ChatPage() {
                             <div className="flex h-8 w-8 shrink-0 items-center justify-center rounded-full bg-emerald-600 text-white">
                                 <Bot className="h-4 w-4" />
                             </div>
-                            <div className="flex items-center gap-2 text-slate-400">
-                                <Loader2 className="h-4 w-4 animate-spin" />
-                                <span className="text-sm">Thinking...</span>
-                            </div>
+                            {streamedText ? (
+                                <div className="rounded-lg px-4 py-2 max-w-[80%] bg-slate-800 text-slate-100">
+                                    <div className="prose prose-sm prose-invert max-w-none">
+                                        <ReactMarkdown>{streamedText}</ReactMarkdown>
+                                    </div>
+                                </div>
+                            ) : (
+                                <div className="flex items-center gap-2 text-slate-400">
+                                    <Loader2 className="h-4 w-4 animate-spin" />
+                                    <span className="text-sm">{streamStatus}</span>
+                                </div>
+                            )}
                         </div>
                     )}
                 </div>
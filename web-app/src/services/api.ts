@@ -17,14 +17,92 @@ export interface FeedbackItem {
     metadata?: any;
 }
 
-export const ingestFeedback = async (items: FeedbackItem[]) => {
-    const response = await api.post("/ingest", { items });
+export const getIngestJob = async (jobId: string, signal?: AbortSignal) => {
+    const response = await api.get(`/ingest/jobs/${jobId}`, { signal });
     return response.data;
 };
 
+// Give up on a job after this long (e.g. one left "running" by a worker restart)
+const INGEST_TIMEOUT_MS = 10 * 60 * 1000;
+
+const sleep = (ms: number, signal?: AbortSignal) => new Promise<void>((resolve, reject) => {
+    const timer = setTimeout(resolve, ms);
+    signal?.addEventListener("abort", () => {
+        clearTimeout(timer);
+        reject(signal.reason ?? new Error("Aborted"));
+    }, { once: true });
+});
+
+// Queues the batch, then polls the background job until it finishes, times out or is aborted.
+export const ingestFeedback = async (
+    items: FeedbackItem[],
+    pollIntervalMs = 1500,
+    timeoutMs = INGEST_TIMEOUT_MS,
+    signal?: AbortSignal,
+) => {
+    const response = await api.post("/ingest", { items }, { signal });
+    const { job_id } = response.data;
+    const deadline = Date.now() + timeoutMs;
+
+    while (true) {
+        const job = await getIngestJob(job_id, signal);
+        if (job.status === "completed") {
+            return job.result;
+        }
+        if (job.status === "failed") {
+            throw new Error(job.error || "Ingestion failed");
+        }
+        if (Date.now() + pollIntervalMs > deadline) {
+            throw new Error(`Ingestion job ${job_id} still ${job.status} after ${Math.round(timeoutMs / 1000)}s`);
+        }
+        await sleep(pollIntervalMs, signal);
+    }
+};
+
 export const chatWithAgent = async (question: string) => {
     const response = await api.post("/chat", { question });
     return response.data;
 };
 
 
+export interface ChatStreamEvent {
+    event: "token" | "tool_call" | "tool_result" | "final" | "error";
+    data: any;
+}
+
+// Streams agent progress over SSE; resolves with the final answer payload.
+export const streamChatWithAgent = async (question: string, onEvent?: (event: ChatStreamEvent) => void) => {
+    const response = await fetch(`${API_URL}/chat`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+        body: JSON.stringify({ question }),
+    });
+    if (!response.ok || !response.body) {
+        throw Object.assign(new Error("Chat stream failed"), { response: { status: response.status } });
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    let final: any = null;
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+        const frames = buffer.split("\n\n");
+        buffer = frames.pop() || "";
+        for (const frame of frames) {
+            const lines = frame.split("\n");
+            const name = lines.find(l => l.startsWith("event: "))?.slice(7);
+            const data = lines.filter(l => l.startsWith("data: ")).map(l => l.slice(6)).join("\n");
+            if (!name || !data) continue;
+            const event = { event: name, data: JSON.parse(data) } as ChatStreamEvent;
+            onEvent?.(event);
+            if (event.event === "error") {
+                throw Object.assign(new Error(event.data.detail), { response: { status: event.data.status } });
+            }
+            if (event.event === "final") final = event.data;
+        }
+    }
+    if (!final) throw new Error("Chat stream ended without an answer");
+    return final;
+};